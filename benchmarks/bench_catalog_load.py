@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+from benchmarks.bench_workers import write_synthetic_catalog, valid_tools
+from benchmarks.servers import ROOT
+from benchmarks.report import summarize, save_results
+
+# ================= CATALOG LOAD TIME =================
+#
+#   python -m benchmarks.bench_catalog_load --rows 100000 --dim 128
+#
+# Writes a synthetic catalog, compiles it with src.compile_catalog, then
+# times load_snapshot() in fresh processes from the JSON files and from
+# the compiled catalog (with and without the checksum pass), plus the
+# first filter + BM25 query on the loaded snapshot.
+
+LOAD_SCRIPT = """
+import json, time, resource
+started = time.perf_counter()
+from src import catalog
+snapshot = catalog.load_snapshot()
+loaded = time.perf_counter()
+intent = {"domain": "Text", "action": "generate", "constraints": {"pricing": "any"}}
+rows = snapshot.columns.rows(intent)
+snapshot.lexical.search("w1 w2 w3", 5, rows)
+snapshot.payloads[int(rows[0])].result(1.0)
+print(json.dumps({
+    "type": type(snapshot).__name__,
+    "load_ms": (loaded - started) * 1000,
+    "first_query_ms": (time.perf_counter() - loaded) * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}))
+"""
+
+def run_load(env):
+    output = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    catalog_dir = tempfile.mkdtemp(prefix="bench-catalog-")
+    print(f"🔧 Writing synthetic catalog: {args.rows} x {args.dim}")
+    write_synthetic_catalog(catalog_dir, args.rows, args.dim, valid_tools)
+
+    snapshot_file = os.path.join(catalog_dir, "catalog.snap")
+    env = dict(os.environ, CATALOG_DIR=catalog_dir, LOG_LEVEL="WARNING")
+
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.compile_catalog", "--output", snapshot_file],
+        cwd=ROOT, env=env, check=True, capture_output=True
+    )
+    metrics = {"compile": summarize([(time.perf_counter() - started) * 1000])}
+
+    modes = {
+        "json": dict(env, CATALOG_SNAPSHOT=""),
+        "compiled": dict(env, CATALOG_SNAPSHOT=snapshot_file),
+        "compiled no-verify": dict(env, CATALOG_SNAPSHOT=snapshot_file, CATALOG_SNAPSHOT_VERIFY="0")
+    }
+
+    # Builds tool_index.bin for the JSON path, so no run pays for it
+    run_load(modes["json"])
+
+    print(f"\n{'mode':<22}{'load ms':>10}{'query ms':>10}{'RSS MB':>9}")
+    for name, mode_env in modes.items():
+        runs = [run_load(mode_env) for _ in range(args.repeat)]
+        load = summarize([r["load_ms"] for r in runs])
+        load["max_rss_mb"] = round(float(np.median([r["max_rss_mb"] for r in runs])), 1)
+        query = summarize([r["first_query_ms"] for r in runs])
+        metrics[f"load[{name}]"] = load
+        metrics[f"first_query[{name}]"] = query
+
+        print(f"{name:<22}{load['p50_ms']:>10.1f}{query['p50_ms']:>10.2f}{load['max_rss_mb']:>9.0f}")
+
+    save_results("catalog_load", vars(args), metrics, args.output)
+
+if __name__ == "__main__":
+    main()
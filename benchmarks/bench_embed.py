@@ -0,0 +1,136 @@
+import os
+import time
+import asyncio
+import argparse
+import httpx
+
+from src import ollama_client, generate_embeddings
+from benchmarks.servers import FAKE_OLLAMA_APP, free_port, wait_ready, uvicorn
+from benchmarks.report import summarize, save_results
+
+# ================= EMBEDDING THROUGHPUT =================
+#
+#   python -m benchmarks.bench_embed
+#   python -m benchmarks.bench_embed --url http://localhost:11434
+#
+# Online: --requests concurrent single-text embeddings, sent one call each
+# to /api/embeddings (the old client) vs micro-batched into /api/embed
+# calls by ollama_client.embed. Offline: generate_embeddings.embed_batch
+# over --texts texts at several batch sizes.
+#
+# Without --url the fake Ollama is started with a cost model of a CPU-only
+# server: a fixed cost per call (--call-ms), a cost per text (--item-ms)
+# and one call processed at a time (--parallel 1).
+
+def configure_client(url, window_ms, max_queue):
+    # ollama_client reads its settings at import; point it at this run
+    # (generate_embeddings calls through it too)
+    ollama_client.OLLAMA_URL = url
+    ollama_client.EMBED_BATCH_WINDOW_MS = window_ms
+    ollama_client.EMBED_BATCHER.window = window_ms / 1000
+    ollama_client.MAX_QUEUE = max_queue
+
+def make_texts(n, prefix):
+    return [f"{prefix} text number {i} about tools" for i in range(n)]
+
+async def run_concurrent(fn, texts, concurrency):
+    queue = list(texts)
+    latencies = []
+
+    async def worker():
+        while queue:
+            text = queue.pop()
+            start = time.perf_counter()
+            await fn(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, time.perf_counter() - start
+
+async def bench_legacy(url, texts, concurrency):
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        async def one(text):
+            response = await client.post(
+                "/api/embeddings",
+                json={"model": ollama_client.EMBED_MODEL, "prompt": text}
+            )
+            response.raise_for_status()
+            return response.json()["embedding"]
+
+        return await run_concurrent(one, texts, concurrency)
+
+async def bench_batched(texts, concurrency):
+    try:
+        return await run_concurrent(ollama_client.embed, texts, concurrency)
+    finally:
+        await ollama_client.close_client()
+
+def bench_offline(texts, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        generate_embeddings.embed_batch(texts[i:i + batch_size])
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--window-ms", type=float, default=5)
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-sizes", default="1,8,16,32")
+    parser.add_argument("--call-ms", type=float, default=20)
+    parser.add_argument("--item-ms", type=float, default=2)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    fake = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        env = dict(os.environ)
+        env.update({
+            "FAKE_OLLAMA_DELAY_MS": str(args.call_ms),
+            "FAKE_OLLAMA_ITEM_DELAY_MS": str(args.item_ms),
+            "FAKE_OLLAMA_PARALLEL": str(args.parallel)
+        })
+        fake = uvicorn(FAKE_OLLAMA_APP, port, env)
+
+    configure_client(url, args.window_ms, args.concurrency)
+
+    metrics = {}
+
+    def record(name, latencies, elapsed, texts):
+        metrics[name] = summarize(latencies) | {"texts_per_sec": round(texts / elapsed, 1)}
+        print(f"{name:<32}{texts / elapsed:>10.1f} texts/s")
+
+    try:
+        if fake is not None:
+            wait_ready(url)
+
+        online = make_texts(args.requests, "online")
+        print(f"🔧 {args.requests} embeddings, concurrency {args.concurrency}")
+
+        latencies, elapsed = asyncio.run(bench_legacy(url, online, args.concurrency))
+        record("online /api/embeddings", latencies, elapsed, len(online))
+
+        online = make_texts(args.requests, "batched")
+        latencies, elapsed = asyncio.run(bench_batched(online, args.concurrency))
+        record(f"online /api/embed window={args.window_ms:g}ms", latencies, elapsed, len(online))
+
+        print(f"🔧 offline build of {args.texts} texts")
+        for size in [int(s) for s in args.batch_sizes.split(",")]:
+            elapsed = bench_offline(make_texts(args.texts, f"offline {size}"), size)
+            record(f"offline batch={size}", [elapsed * 1000], elapsed, args.texts)
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait(timeout=10)
+
+    save_results("embed", vars(args), metrics, args.output)
+
+if __name__ == "__main__":
+    main()
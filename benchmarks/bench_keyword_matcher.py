@@ -0,0 +1,178 @@
+import re
+import time
+import random
+
+from src.keywords import (
+    DOMAIN_KEYWORDS, ACTION_KEYWORDS, PRICING_KEYWORDS,
+    BANNED_KEYWORDS, REWRITE_RULES
+)
+from src.keyword_matcher import MATCHER, scan
+from src.moderation import is_safe
+from src.prompt_rewriter import rule_based_rewrite
+from src.intent_extractor import extract_intent
+
+# ================= LEGACY IMPLEMENTATION =================
+# The per-call substring scans the matcher replaced, kept as the baseline
+
+LEGACY_RULES = [
+    (r"(awaaz|voice|audio|speech|bol).*?(text|likh|likho|text mein|words)",
+     "Convert my voice recording into text"),
+    (r"(letter|email|mail|application|resume|cv)", "Write a letter or email using AI"),
+    (r"(logo|design|creative|poster|image|photo)", "Create a professional logo or image"),
+    (r"(code|coding|program|python|java|c\+\+)", "Write code using AI"),
+    (r"(video|reel|short|youtube|instagram)", "Create short videos or reels using AI"),
+    (r"(summarize|summary|research|paper|notes)", "Summarize a document or research paper"),
+]
+
+def legacy_is_safe(prompt):
+    p = prompt.lower()
+    return not any(word in p for word in [
+        "hack", "crack", "piracy", "illegal",
+        "porn", "nsfw", "sexual", "violence",
+        "drugs", "weapon", "bomb"
+    ])
+
+def legacy_rule_based_rewrite(prompt):
+    text = prompt.lower()
+    for pattern, normalized in LEGACY_RULES:
+        if re.search(pattern, text):
+            return normalized
+    return None
+
+def legacy_extract_intent(prompt):
+    p = prompt.lower()
+
+    if any(w in p for w in [
+        "logo", "image", "photo", "design", "art", "poster",
+        "banner", "thumbnail", "illustration", "graphic", "branding"
+    ]):
+        domain = "Image"
+    elif any(w in p for w in [
+        "video", "reel", "clip", "movie", "animation",
+        "short", "youtube", "instagram"
+    ]):
+        domain = "Video"
+    elif any(w in p for w in [
+        "audio", "voice", "speech", "song", "music",
+        "podcast", "narration"
+    ]):
+        domain = "Audio"
+    elif any(w in p for w in [
+        "code", "coding", "program", "python", "java",
+        "javascript", "website", "app", "software", "api"
+    ]):
+        domain = "Code"
+    else:
+        domain = "Text"
+
+    if any(w in p for w in ["summarize", "summary", "shorten"]):
+        action = "summarize"
+    elif any(w in p for w in ["analyze", "analysis", "explain", "review"]):
+        action = "analyze"
+    elif any(w in p for w in ["translate"]):
+        action = "translate"
+    elif any(w in p for w in [
+        "convert", "transcribe", "speech to text", "audio to text"
+    ]):
+        action = "convert"
+    else:
+        action = "generate"
+
+    if "free" in p:
+        pricing = "free"
+    elif "paid" in p or "premium" in p:
+        pricing = "paid"
+    else:
+        pricing = "any"
+
+    return domain, action, pricing
+
+def legacy_pipeline(prompt):
+    return legacy_is_safe(prompt), legacy_rule_based_rewrite(prompt), legacy_extract_intent(prompt)
+
+def compiled_pipeline(prompt):
+    intent = extract_intent(prompt)
+    return (
+        is_safe(prompt),
+        rule_based_rewrite(prompt),
+        (intent["domain"], intent["action"], intent["constraints"]["pricing"])
+    )
+
+# ================= INPUTS =================
+
+FILLER = (
+    "i would really like some help with a long document for my team that "
+    "describes our quarterly goals and the things we want to achieve next "
+    "year including hiring plans budget and general strategy so please"
+).split()
+
+def all_keywords():
+    words = [w for _, ws in DOMAIN_KEYWORDS + ACTION_KEYWORDS + PRICING_KEYWORDS for w in ws]
+    words += BANNED_KEYWORDS
+    words += [w for groups, _ in REWRITE_RULES for ws in groups for w in ws]
+    return sorted(set(words))
+
+def make_prompt(rng, n_words, n_keywords, keywords):
+    words = [rng.choice(FILLER) for _ in range(n_words)]
+    for _ in range(n_keywords):
+        words[rng.randrange(n_words)] = rng.choice(keywords)
+    return " ".join(words)
+
+def fuzz_prompt(rng, keywords):
+    # Glued keywords, odd casing, punctuation and newlines
+    alphabet = keywords + FILLER + [" ", "\n", ".", "s", "ing", "+", "-", "TEXT", "Voice"]
+    return "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 30)))
+
+# ================= BENCHMARK =================
+
+def timeit(fn, prompts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for prompt in prompts:
+            fn(prompt)
+    return (time.perf_counter() - start) / (repeat * len(prompts))
+
+def main():
+    rng = random.Random(0)
+    keywords = all_keywords()
+
+    # ---------- CORRECTNESS ----------
+    checked = 0
+    for _ in range(20000):
+        prompt = fuzz_prompt(rng, keywords)
+        assert legacy_pipeline(prompt) == compiled_pipeline(prompt), prompt
+        checked += 1
+    print(f"✅ {checked} fuzzed prompts classified identically")
+
+    # ---------- SPEED ----------
+    print(f"{'prompt':<18}{'legacy (us)':>14}{'compiled (us)':>16}{'speedup':>10}")
+
+    for label, n_words, n_keywords in [
+        ("short (8 words)", 8, 1),
+        ("medium (60)", 60, 3),
+        ("long (400)", 400, 6),
+        ("very long (2000)", 2000, 12)
+    ]:
+        prompts = [make_prompt(rng, n_words, n_keywords, keywords) for _ in range(50)]
+        repeat = max(1, 4000 // n_words)
+
+        legacy = timeit(legacy_pipeline, prompts, repeat)
+
+        # Clear the per-text scan cache before every prompt so it only
+        # saves work within one request (the token memo stays warm, as it
+        # does in a long-running worker)
+        MATCHER.memo.clear()
+
+        def cold(prompt):
+            scan.cache_clear()
+            return compiled_pipeline(prompt)
+
+        compiled = timeit(cold, prompts, repeat)
+
+        print(
+            f"{label:<18}{legacy * 1e6:>14.1f}{compiled * 1e6:>16.1f}"
+            f"{legacy / compiled:>9.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
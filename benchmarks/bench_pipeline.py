@@ -0,0 +1,234 @@
+import time
+import random
+import argparse
+import numpy as np
+
+from src.intent_extractor import extract_intent
+from src.actions import ACTION_ALIASES
+from src.filter_tools import filter_tools
+from src.semantic_search_numpy import cosine_similarity
+from src.vector_index import ExactIndex
+from src.lexical import LexicalIndex
+from src.columnar import ColumnarCatalog
+from benchmarks.bench_keyword_matcher import all_keywords, make_prompt, legacy_extract_intent
+from benchmarks.bench_vector_index import synthetic_catalog, make_queries
+from benchmarks.report import summarize, time_calls, save_results, print_table
+
+# ================= MICRO-BENCHMARKS =================
+#
+#   python -m benchmarks.bench_pipeline
+#   python -m benchmarks.bench_pipeline --sizes 1000000 --dim 128
+#
+# Per-call latency of intent extraction, candidate filtering (linear scan
+# vs columnar masks), facet counts, cosine scoring and BM25 ranking
+# over synthetic catalogs. Scoring is skipped for
+# sizes whose float32 matrix would exceed --max-matrix-mb, BM25 above
+# --max-lexical-rows (the index is built in Python).
+
+DOMAINS = ["Text", "Image", "Code", "Audio", "Data", "Video", "Productivity"]
+DOMAIN_WEIGHTS = [14, 6, 4, 4, 3, 2, 1]
+ACTIONS = ["generate", "analyze", "edit", "transcribe", "convert", "summarize", "translate", "create"]
+PRICINGS = ["freemium", "paid", "free"]
+
+# ================= SYNTHETIC CATALOG =================
+
+def synthetic_tools(n, seed=0):
+    rng = random.Random(seed)
+
+    # Tools share their list objects so 1M tools fit in memory
+    action_sets = [
+        sorted(set(rng.sample(ACTIONS, rng.randint(1, 3))))
+        for _ in range(64)
+    ]
+    empty = []
+
+    return [
+        {
+            "id": f"tool-{i}",
+            "name": f"Tool {i}",
+            "description": "",
+            "domain": rng.choices(DOMAINS, DOMAIN_WEIGHTS)[0],
+            "actions": rng.choice(action_sets),
+            "use_cases": empty,
+            "pricing": rng.choice(PRICINGS),
+            "tags": empty
+        }
+        for i in range(n)
+    ]
+
+def legacy_filter_tools(intent, tools):
+    # The original per-request linear scan, kept as the baseline
+    filtered = []
+    allowed_actions = ACTION_ALIASES.get(intent["action"], [intent["action"]])
+
+    for tool in tools:
+        if tool["domain"] != intent["domain"]:
+            continue
+
+        if not any(a in tool["actions"] for a in allowed_actions):
+            continue
+
+        pricing = intent["constraints"]["pricing"]
+        if pricing != "any" and tool["pricing"] != pricing:
+            continue
+
+        filtered.append(tool)
+
+    return filtered
+
+def legacy_search(matrix, query, k):
+    scores = cosine_similarity(matrix, query)
+    return np.argsort(scores)[::-1][:k]
+
+def make_intents(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "domain": rng.choice(DOMAINS),
+            "action": rng.choice(ACTIONS),
+            "constraints": {"pricing": rng.choice(PRICINGS + ["any", "any"])}
+        }
+        for _ in range(count)
+    ]
+
+# ================= BENCHMARKS =================
+
+def bench_intent(metrics, prompts, repeat):
+    metrics["extract_intent[legacy]"] = summarize(time_calls(legacy_extract_intent, prompts, repeat))
+    metrics["extract_intent"] = summarize(time_calls(extract_intent, prompts, repeat))
+
+def bench_filter(metrics, n, tools, intents, repeat):
+    start = time.perf_counter()
+    columns = ColumnarCatalog(tools)
+    metrics[f"columnar_build n={n}"] = summarize([(time.perf_counter() - start) * 1000])
+
+    metrics[f"filter_tools[legacy] n={n}"] = summarize(
+        time_calls(lambda intent: legacy_filter_tools(intent, tools), intents)
+    )
+
+    def mask_rows(intent):
+        pricing = intent["constraints"]["pricing"]
+        return np.flatnonzero(columns.mask(
+            domain=intent["domain"],
+            actions=ACTION_ALIASES.get(intent["action"], [intent["action"]]),
+            pricing=None if pricing == "any" else pricing
+        ))
+
+    metrics[f"filter_rows[columnar mask] n={n}"] = summarize(time_calls(mask_rows, intents))
+
+    # First call per key computes the mask, later ones hit the memo
+    for intent in intents:
+        columns.rows(intent)
+    metrics[f"filter_rows[columnar memo] n={n}"] = summarize(time_calls(columns.rows, intents, repeat))
+
+    metrics[f"filter_tools[columnar] n={n}"] = summarize(
+        time_calls(lambda intent: filter_tools(intent, tools, columns), intents)
+    )
+
+    metrics[f"facets n={n}"] = summarize(
+        time_calls(lambda intent: columns.facets(domain=intent["domain"]), intents)
+    )
+
+    return columns
+
+def bench_scoring(metrics, n, dim, columns, intents, k):
+    raw = synthetic_catalog(n, dim, topics=max(1, min(500, n // 20)))
+    exact = ExactIndex(raw)
+    qs = make_queries(raw, len(intents))
+
+    metrics[f"cosine_similarity[legacy] n={n}"] = summarize(
+        time_calls(lambda q: legacy_search(raw, q, k), qs)
+    )
+    metrics[f"exact_search n={n}"] = summarize(
+        time_calls(lambda q: exact.search(q, k), qs)
+    )
+
+    rows = [columns.rows(intent) for intent in intents]
+    pairs = list(zip(qs, rows))
+    metrics[f"exact_search[filtered] n={n}"] = summarize(
+        time_calls(lambda pair: exact.search(pair[0], k, pair[1]), pairs)
+    )
+
+def text_tools(tools, seed=0):
+    # Synthetic tools only carry ids and labels; give them Zipf-like text
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(5000)]
+    weights = [1 / (i + 1) for i in range(len(words))]
+
+    return [
+        dict(
+            tool,
+            description=" ".join(rng.choices(words, weights, k=12)),
+            tags=rng.choices(words, weights, k=3)
+        )
+        for tool in tools
+    ]
+
+def bench_lexical(metrics, n, tools, columns, intents, k):
+    tools = text_tools(tools)
+
+    start = time.perf_counter()
+    lexical = LexicalIndex(tools)
+    metrics[f"bm25_build n={n}"] = summarize([(time.perf_counter() - start) * 1000])
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.choice(t["description"].split()) for t in rng.sample(tools, 4)) for _ in intents]
+    metrics[f"bm25_search n={n}"] = summarize(
+        time_calls(lambda q: lexical.search(q, k), queries)
+    )
+
+    pairs = list(zip(queries, [columns.rows(intent) for intent in intents]))
+    metrics[f"bm25_search[filtered] n={n}"] = summarize(
+        time_calls(lambda pair: lexical.search(pair[0], k, pair[1]), pairs)
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,1000,10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--prompts", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--max-matrix-mb", type=float, default=1024)
+    parser.add_argument("--max-lexical-rows", type=int, default=100000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    metrics = {}
+    skipped = []
+
+    rng = random.Random(0)
+    keywords = all_keywords()
+    prompts = [make_prompt(rng, rng.randint(3, 40), rng.randint(0, 3), keywords) for _ in range(args.prompts)]
+
+    print(f"🔧 extract_intent over {len(prompts)} prompts")
+    bench_intent(metrics, prompts, args.repeat)
+
+    intents = make_intents(args.queries)
+
+    for n in sizes:
+        print(f"🔧 {n} tools")
+        tools = synthetic_tools(n)
+        columns = bench_filter(metrics, n, tools, intents, args.repeat)
+        if n <= args.max_lexical_rows:
+            bench_lexical(metrics, n, tools, columns, intents, args.k)
+        del tools
+
+        matrix_mb = n * args.dim * 4 / 2 ** 20
+        if matrix_mb > args.max_matrix_mb:
+            print(f"⏭️  scoring skipped: {matrix_mb:.0f} MB matrix (--max-matrix-mb {args.max_matrix_mb:.0f})")
+            skipped.append(n)
+            continue
+
+        bench_scoring(metrics, n, args.dim, columns, intents, args.k)
+
+    print()
+    print_table(metrics)
+
+    params = vars(args) | {"scoring_skipped": skipped}
+    save_results("pipeline", params, metrics, args.output)
+
+if __name__ == "__main__":
+    main()
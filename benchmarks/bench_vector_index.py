@@ -0,0 +1,77 @@
+import time
+import argparse
+import numpy as np
+
+from src.tool_index import normalize_rows
+from src.vector_index import ExactIndex, IVFIndex, recall_at_k
+
+# ================= SYNTHETIC CATALOG =================
+#
+#   python -m benchmarks.bench_vector_index --rows 200000 --k 5
+#
+# Clustered unit vectors (tools in a catalog group by topic); queries are
+# noisy copies of random rows.
+
+def synthetic_catalog(rows, dim, topics, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim)).astype("float32")
+    labels = rng.integers(topics, size=rows)
+
+    matrix = np.empty((rows, dim), dtype="float32")
+    for start in range(0, rows, 65536):
+        end = min(rows, start + 65536)
+        noise = rng.standard_normal((end - start, dim)).astype("float32")
+        matrix[start:end] = centers[labels[start:end]] + 2.0 * noise
+
+    return normalize_rows(matrix)
+
+def make_queries(matrix, count, seed=1):
+    rng = np.random.default_rng(seed)
+    picks = matrix[rng.integers(len(matrix), size=count)]
+    noise = rng.standard_normal(picks.shape).astype("float32") * 0.05
+    return normalize_rows(picks + noise)
+
+def latency_ms(index, queries, k):
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q, k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.mean(timings), np.percentile(timings, 95)
+
+# ================= REPORT =================
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--nlist", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"🔧 {args.rows} x {args.dim} synthetic catalog, {args.topics} topics")
+    matrix = synthetic_catalog(args.rows, args.dim, args.topics)
+    queries = make_queries(matrix, args.queries)
+
+    exact = ExactIndex(matrix)
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(matrix, nlist=args.nlist)
+    print(f"🧠 IVF built in {time.perf_counter() - start:.1f}s ({len(ivf.centroids)} lists)")
+
+    mean, p95 = latency_ms(exact, queries, args.k)
+    print(f"\n{'backend':<14}{'recall@' + str(args.k):>10}{'mean ms':>10}{'p95 ms':>10}")
+    print(f"{'exact':<14}{1.0:>10.3f}{mean:>10.2f}{p95:>10.2f}")
+
+    for nprobe in (1, 2, 4, 8, 16, 32):
+        if nprobe > len(ivf.centroids):
+            break
+        ivf.nprobe = nprobe
+        recall = recall_at_k(exact, ivf, queries, args.k)
+        mean, p95 = latency_ms(ivf, queries, args.k)
+        print(f"{'ivf nprobe=' + str(nprobe):<14}{recall:>10.3f}{mean:>10.2f}{p95:>10.2f}")
+
+if __name__ == "__main__":
+    main()
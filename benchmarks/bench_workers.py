@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import httpx
+
+from benchmarks.bench_pipeline import synthetic_tools
+from benchmarks.bench_vector_index import synthetic_catalog
+from benchmarks.load_test import make_prompts, run_load
+from benchmarks.servers import ROOT, FAKE_OLLAMA_APP, free_port, wait_ready, uvicorn
+from benchmarks.report import summarize, save_results
+
+# ================= WORKER SCALING =================
+#
+#   python -m benchmarks.bench_workers --workers 1,2,4 --rows 100000
+#
+# Runs `python -m src.serve` with each worker count against the fake
+# Ollama and reports RPS, latency and the memory of the whole server
+# process tree. RSS counts shared pages once per process; PSS splits them
+# between the processes sharing them, so with a memmapped catalog
+# PSS stays roughly flat as workers are added.
+#
+# --rows N serves a synthetic N-tool catalog (via CATALOG_DIR) so the
+# catalog dominates memory; 0 uses data/ as is. The synthetic catalog is
+# compiled, as in deployment, unless --json is given.
+
+def write_synthetic_catalog(path, rows, dim, prepare=None):
+    tools = synthetic_tools(rows)
+    for tool in tools:
+        tool["actions"] = list(tool["actions"])
+    if prepare is not None:
+        tools = prepare(tools)
+
+    with open(os.path.join(path, "tools_seed.json"), "w", encoding="utf-8") as f:
+        json.dump(tools, f)
+    with open(os.path.join(path, "tool_ids.json"), "w", encoding="utf-8") as f:
+        json.dump([t["id"] for t in tools], f)
+
+    np.save(os.path.join(path, "tool_embeddings.npy"), synthetic_catalog(rows, dim, topics=500))
+
+def valid_tools(tools):
+    # Synthetic tools filled in so they pass the compiler's validation
+    for i, tool in enumerate(tools):
+        tool["actions"] = sorted({"generate" if a == "create" else a for a in tool["actions"]})
+        tool["description"] = f"Synthetic tool {i} for {tool['domain'].lower()} work"
+        tool["input_types"] = ["text"]
+        tool["output_types"] = ["text"]
+        tool["use_cases"] = [f"{a} {tool['domain'].lower()}" for a in tool["actions"]]
+        tool["tags"] = [tool["domain"].lower(), f"w{i % 997}"]
+        tool["api_available"] = i % 3 == 0
+    return tools
+
+# ================= MEMORY =================
+
+def process_tree(pid):
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                for child in f.read().split():
+                    pids.extend(process_tree(int(child)))
+        except OSError:
+            pass
+    return pids
+
+def memory_mb(pid):
+    # Sum of Rss / Pss over the server and all its workers (Linux only)
+    totals = {"Rss": 0, "Pss": 0}
+    for p in process_tree(pid):
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in totals:
+                        totals[key] += int(rest.split()[0])
+        except OSError:
+            pass
+    return {"rss_mb": round(totals["Rss"] / 1024, 1), "pss_mb": round(totals["Pss"] / 1024, 1)}
+
+# ================= RUN =================
+
+def wait_workers_ready(url, workers, timeout=300):
+    # Every worker loads its own snapshot; wait for a run of 200s
+    deadline = time.monotonic() + timeout
+    ok = 0
+    while time.monotonic() < deadline:
+        try:
+            ok = ok + 1 if httpx.get(f"{url}/readyz", timeout=5).status_code == 200 else 0
+        except httpx.HTTPError:
+            ok = 0
+        if ok >= 4 * workers:
+            return
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} workers not ready in {timeout}s")
+
+def bench(workers, env, prompts, args):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.serve", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+
+    try:
+        wait_workers_ready(url, workers)
+        asyncio.run(run_load(url, prompts[:args.warmup], args.concurrency, args.timeout))
+        latencies, errors, elapsed = asyncio.run(
+            run_load(url, prompts[args.warmup:], args.concurrency, args.timeout)
+        )
+        memory = memory_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    return summarize(latencies) | memory | {
+        "rps": round(len(latencies) / elapsed, 2),
+        "errors": sum(errors.values())
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--rows", type=int, default=0)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--unique", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--ollama-delay-ms", type=float, default=0)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-workers-")
+    env = dict(os.environ)
+    env.update({
+        "FAKE_OLLAMA_DELAY_MS": str(args.ollama_delay_ms),
+        "RESULT_CACHE_TTL": "0",
+        "BAD_PROMPT_LOG": os.path.join(tmp, "bad_prompts.log"),
+        "FEEDBACK_LOG": os.path.join(tmp, "user_feedback.jsonl"),
+        "LOG_LEVEL": "WARNING"
+    })
+
+    if args.rows:
+        catalog_dir = os.path.join(tmp, "data")
+        os.makedirs(catalog_dir)
+        print(f"🔧 Writing synthetic catalog: {args.rows} x {args.dim}")
+        write_synthetic_catalog(catalog_dir, args.rows, args.dim, valid_tools)
+        env["CATALOG_DIR"] = catalog_dir
+
+        snapshot_file = os.path.join(catalog_dir, "catalog.snap")
+        if args.json:
+            env["CATALOG_SNAPSHOT"] = ""
+        else:
+            subprocess.run(
+                [sys.executable, "-m", "src.compile_catalog", "--output", snapshot_file],
+                cwd=ROOT, env=env, check=True, capture_output=True
+            )
+            env["CATALOG_SNAPSHOT"] = snapshot_file
+
+    fake_port = free_port()
+    env["OLLAMA_URL"] = f"http://127.0.0.1:{fake_port}"
+    fake = uvicorn(FAKE_OLLAMA_APP, fake_port, env)
+
+    prompts = make_prompts(args.requests + args.warmup, args.unique)
+    metrics = {}
+
+    try:
+        wait_ready(env["OLLAMA_URL"])
+        for workers in [int(w) for w in args.workers.split(",")]:
+            print(f"🚀 {workers} worker(s)")
+            metrics[f"workers={workers}"] = bench(workers, env, prompts, args)
+    finally:
+        fake.terminate()
+        fake.wait(timeout=10)
+
+    print(f"\n{'workers':<12}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>10}{'PSS MB':>10}")
+    for name, m in metrics.items():
+        print(
+            f"{name:<12}{m['rps']:>9.1f}{m.get('p50_ms', 0):>9.1f}{m.get('p95_ms', 0):>9.1f}"
+            f"{m['rss_mb']:>10.1f}{m['pss_mb']:>10.1f}"
+        )
+    print(f"\n(CPUs available: {os.cpu_count()})")
+
+    save_results("workers", vars(args), metrics, args.output)
+
+if __name__ == "__main__":
+    main()
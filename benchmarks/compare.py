@@ -0,0 +1,71 @@
+import sys
+import json
+import argparse
+
+# ================= COMPARE RUNS =================
+#
+#   python -m benchmarks.compare benchmarks/results/load-OLD.json benchmarks/results/load-NEW.json
+#
+# Exits with status 1 when any shared metric regressed by more than
+# --threshold (latencies going up, rps going down).
+
+LOWER_IS_BETTER = ("mean_ms", "p50_ms", "p95_ms", "p99_ms")
+HIGHER_IS_BETTER = ("rps",)
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(old, new, threshold, keys=None):
+    rows = []
+
+    for name, old_values in old["metrics"].items():
+        new_values = new["metrics"].get(name)
+        if new_values is None:
+            continue
+
+        for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if keys and key not in keys:
+                continue
+
+            before, after = old_values.get(key), new_values.get(key)
+            if not isinstance(before, (int, float)) or not isinstance(after, (int, float)) or before == 0:
+                continue
+
+            change = (after - before) / before
+            worse = change > threshold if key in LOWER_IS_BETTER else change < -threshold
+            rows.append((name, key, before, after, change, worse))
+
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--keys", default=None, help="e.g. p50_ms,p95_ms,rps")
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    if old.get("benchmark") != new.get("benchmark"):
+        print(f"⚠️ Comparing different benchmarks: {old.get('benchmark')} vs {new.get('benchmark')}")
+
+    keys = args.keys.split(",") if args.keys else None
+    rows = compare(old, new, args.threshold, keys)
+
+    if not rows:
+        print("No shared metrics to compare")
+        return 0
+
+    width = max(len(name) for name, *_ in rows) + 2
+    print(f"{'metric':<{width}}{'key':<10}{'old':>12}{'new':>12}{'change':>10}")
+    for name, key, before, after, change, worse in rows:
+        flag = "  ❌" if worse else ""
+        print(f"{name:<{width}}{key:<10}{before:>12.4f}{after:>12.4f}{change:>+10.1%}{flag}")
+
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
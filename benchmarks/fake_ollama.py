@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import numpy as np
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+# ================= CONFIG =================
+#
+# Deterministic stand-in for a local Ollama server, for development,
+# manual testing and benchmarks:
+#
+#   uvicorn benchmarks.fake_ollama:app --port 11435
+#   OLLAMA_URL=http://localhost:11435 uvicorn src.api:app
+
+EMBED_DIM = int(os.getenv("FAKE_OLLAMA_DIM", "768"))
+
+# Simulated model latency per call, plus per embedded text, in milliseconds
+DELAY_MS = float(os.getenv("FAKE_OLLAMA_DELAY_MS", "0"))
+ITEM_DELAY_MS = float(os.getenv("FAKE_OLLAMA_ITEM_DELAY_MS", "0"))
+
+# Calls processed at once, like OLLAMA_NUM_PARALLEL (1 on CPU-only hosts);
+# 0 means unlimited
+PARALLEL = int(os.getenv("FAKE_OLLAMA_PARALLEL", "0"))
+
+CANNED_REWRITES = {
+    "help me to write letter": "Write a letter using AI",
+    "can you write email for me": "Write an email using AI",
+    "meri awaaz ko text mein badlo": "Convert my voice recording into text",
+    "do something": "Generate content using AI",
+    "something creative": "Create a creative image using AI"
+}
+
+app = FastAPI(title="Fake Ollama")
+
+# ================= UTILS =================
+
+def fake_embedding(text: str):
+    # Hash-seeded so the same text always maps to the same vector
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(EMBED_DIM).astype("float32").tolist()
+
+def fake_reply(messages: list):
+    user = next(
+        (m["content"] for m in reversed(messages) if m.get("role") == "user"),
+        ""
+    )
+    is_rewrite = any(
+        m.get("role") == "system" and "PROMPT NORMALIZER" in m.get("content", "")
+        for m in messages
+    )
+
+    if is_rewrite:
+        key = " ".join(user.lower().split())
+        return CANNED_REWRITES.get(key, f"Generate {user.strip()} using AI")
+
+    return f"This is a canned reply to: {user.strip()}"
+
+_slots = None
+
+async def simulate_latency(items=1):
+    global _slots
+
+    delay = DELAY_MS + ITEM_DELAY_MS * items
+    if not delay:
+        return
+
+    if not PARALLEL:
+        await asyncio.sleep(delay / 1000)
+        return
+
+    if _slots is None:
+        _slots = asyncio.Semaphore(PARALLEL)
+    async with _slots:
+        await asyncio.sleep(delay / 1000)
+
+# ================= ENDPOINTS =================
+
+@app.post("/api/embeddings")
+async def embeddings(body: dict):
+    await simulate_latency()
+    return {"embedding": fake_embedding(body.get("prompt", ""))}
+
+@app.post("/api/embed")
+async def embed(body: dict):
+    inputs = body.get("input", "")
+    if isinstance(inputs, str):
+        inputs = [inputs]
+
+    await simulate_latency(len(inputs))
+    return {
+        "model": body.get("model"),
+        "embeddings": [fake_embedding(text) for text in inputs]
+    }
+
+@app.post("/api/chat")
+async def chat(body: dict):
+    reply = fake_reply(body.get("messages", []))
+    model = body.get("model")
+
+    if not body.get("stream", True):
+        await simulate_latency()
+        return {
+            "model": model,
+            "message": {"role": "assistant", "content": reply},
+            "done": True
+        }
+
+    async def tokens():
+        started = time.perf_counter()
+        words = reply.split(" ")
+
+        for i, word in enumerate(words):
+            await simulate_latency()
+            chunk = word if i == 0 else " " + word
+            yield json.dumps({
+                "model": model,
+                "message": {"role": "assistant", "content": chunk},
+                "done": False
+            }) + "\n"
+
+        yield json.dumps({
+            "model": model,
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "eval_count": len(words),
+            "eval_duration": int((time.perf_counter() - started) * 1e9)
+        }) + "\n"
+
+    return StreamingResponse(tokens(), media_type="application/x-ndjson")
@@ -0,0 +1,144 @@
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import contextlib
+import httpx
+
+from src.final_pipeline_numpy import PROMPT_SUGGESTIONS
+from benchmarks.servers import FAKE_OLLAMA_APP, free_port, wait_ready, uvicorn
+from benchmarks.bench_keyword_matcher import all_keywords, make_prompt
+from benchmarks.report import summarize, save_results, print_table
+
+# ================= LOAD TEST =================
+#
+#   python -m benchmarks.load_test --concurrency 16 --requests 1000
+#   python -m benchmarks.load_test --url http://127.0.0.1:8000
+#
+# Without --url, starts the deterministic fake Ollama (benchmarks/fake_ollama.py)
+# and the API as subprocesses on free ports, with bad-prompt logs sent to
+# a temp dir. --unique sets the share of prompts never seen before, which
+# controls how often the caches can answer.
+
+@contextlib.contextmanager
+def local_stack(args):
+    tmp = tempfile.mkdtemp(prefix="loadtest-")
+    fake_port, api_port = free_port(), free_port()
+
+    env = dict(os.environ)
+    env.update({
+        "FAKE_OLLAMA_DELAY_MS": str(args.ollama_delay_ms),
+        "OLLAMA_URL": f"http://127.0.0.1:{fake_port}",
+        "RESULT_CACHE_TTL": str(args.result_cache_ttl),
+        "BAD_PROMPT_LOG": os.path.join(tmp, "bad_prompts.log"),
+        "FEEDBACK_LOG": os.path.join(tmp, "user_feedback.jsonl"),
+        "LOG_LEVEL": "WARNING"
+    })
+
+    procs = [uvicorn(FAKE_OLLAMA_APP, fake_port, env)]
+    try:
+        wait_ready(f"http://127.0.0.1:{fake_port}")
+        procs.append(uvicorn("src.api:app", api_port, env, ["--workers", str(args.workers)]))
+        api = f"http://127.0.0.1:{api_port}"
+        wait_ready(api)
+        yield api
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+# ================= TRAFFIC =================
+
+def make_prompts(count, unique, seed=0):
+    rng = random.Random(seed)
+    keywords = all_keywords()
+    popular = list(PROMPT_SUGGESTIONS) + [
+        make_prompt(rng, rng.randint(3, 12), rng.randint(1, 2), keywords)
+        for _ in range(20)
+    ]
+
+    return [
+        f"{make_prompt(rng, rng.randint(3, 12), rng.randint(0, 2), keywords)} #{i}"
+        if rng.random() < unique else rng.choice(popular)
+        for i in range(count)
+    ]
+
+async def run_load(url, prompts, concurrency, timeout):
+    queue = asyncio.Queue()
+    for prompt in prompts:
+        queue.put_nowait(prompt)
+
+    latencies = []
+    errors = {}
+
+    async def worker(client):
+        while True:
+            try:
+                prompt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            start = time.perf_counter()
+            try:
+                response = await client.post("/recommend", json={"prompt": prompt})
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+
+            if status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    return latencies, errors, elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--unique", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--ollama-delay-ms", type=float, default=20)
+    parser.add_argument("--result-cache-ttl", type=float, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    prompts = make_prompts(args.requests + args.warmup, args.unique)
+
+    with contextlib.ExitStack() as stack:
+        url = args.url or stack.enter_context(local_stack(args))
+        print(f"🔧 {args.requests} requests, concurrency {args.concurrency} -> {url}")
+
+        asyncio.run(run_load(url, prompts[:args.warmup], args.concurrency, args.timeout))
+        latencies, errors, elapsed = asyncio.run(
+            run_load(url, prompts[args.warmup:], args.concurrency, args.timeout)
+        )
+
+    metrics = {
+        "recommend": summarize(latencies) | {
+            "rps": round(len(latencies) / elapsed, 2),
+            "errors": sum(errors.values()),
+            "error_kinds": errors
+        }
+    }
+
+    print()
+    print_table(metrics)
+    print(f"RPS: {metrics['recommend']['rps']}  errors: {metrics['recommend']['errors']}")
+
+    save_results("load", vars(args), metrics, args.output)
+
+if __name__ == "__main__":
+    main()
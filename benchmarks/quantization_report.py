@@ -0,0 +1,138 @@
+import time
+import argparse
+import numpy as np
+
+from src.catalog import get_snapshot
+from src.tool_index import normalize_rows
+from src.vector_index import ExactIndex, QuantizedIndex, quantize
+from benchmarks.bench_vector_index import synthetic_catalog, make_queries
+from benchmarks.report import summarize, time_calls, save_results
+
+# ================= TOP-K CHANGE REPORT =================
+#
+#   python -m benchmarks.quantization_report
+#   python -m benchmarks.quantization_report --rows 100000
+#
+# For each storage precision, with and without the float32 re-rank, how
+# often the top-k differs from float32 exact search: as a set, in order,
+# and in the returned scores.
+#
+# Queries on the real catalog are its own tool vectors plus noisy copies
+# (no Ollama needed), each searched over the whole catalog and over the
+# rows the filter would keep for that tool's domain/action/pricing.
+
+NOISE_LEVELS = (0.0, 0.02, 0.05, 0.1)
+
+def catalog_queries(snapshot, copies, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = np.asarray(snapshot.index.matrix)
+    rows_list = []
+    queries = []
+
+    for noise in NOISE_LEVELS:
+        for _ in range(copies if noise else 1):
+            noisy = matrix + rng.standard_normal(matrix.shape).astype("float32") * noise
+            queries.append(normalize_rows(noisy))
+            rows_list.extend([None] * len(matrix))
+
+    # Same queries, restricted to each tool's own filter bucket
+    for tool in snapshot.row_tools:
+        mask = snapshot.columns.mask(
+            domain=tool["domain"], actions=tool["actions"][:1], pricing=tool["pricing"]
+        )
+        rows_list.append(np.flatnonzero(mask))
+    queries.append(np.asarray(matrix))
+
+    return np.vstack(queries), rows_list
+
+def compare(exact, approx, queries, rows_list, k):
+    set_changed = order_changed = 0
+    score_err = []
+    latencies = []
+
+    for q, rows in zip(queries, rows_list):
+        truth_rows, truth_scores = exact.search(q, k, rows)
+
+        start = time.perf_counter()
+        rows_, scores = approx.search(q, k, rows)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if set(truth_rows.tolist()) != set(rows_.tolist()):
+            set_changed += 1
+        elif not np.array_equal(truth_rows, rows_):
+            order_changed += 1
+
+        if np.array_equal(truth_rows, rows_):
+            score_err.append(float(np.abs(truth_scores - scores).max()) if len(scores) else 0.0)
+
+    total = len(queries)
+    return {
+        "queries": total,
+        "top_k_set_changed": set_changed,
+        "top_k_set_changed_pct": round(100 * set_changed / total, 2),
+        "top_k_order_changed": order_changed,
+        "top_k_order_changed_pct": round(100 * order_changed / total, 2),
+        "max_score_error": round(max(score_err), 6) if score_err else None
+    } | summarize(latencies)
+
+def evaluate(label, matrix, queries, rows_list, k, rerank_values, metrics):
+    exact = ExactIndex(matrix)
+    metrics[f"{label} float32"] = summarize(time_calls(lambda q: exact.search(q, k), queries[:200])) | {
+        "bytes_per_row": matrix.shape[1] * 4
+    }
+
+    for dtype in ("float16", "int8"):
+        codes, scales = quantize(matrix, dtype)
+        row_bytes = codes.shape[1] * codes.itemsize + (4 if scales is not None else 0)
+
+        for rerank in rerank_values:
+            approx = QuantizedIndex(codes, scales, matrix, rerank)
+            name = f"{label} {dtype} rerank={rerank}"
+            metrics[name] = compare(exact, approx, queries, rows_list, k) | {
+                "bytes_per_row": row_bytes
+            }
+
+def print_report(metrics):
+    print(f"\n{'index':<34}{'B/row':>7}{'set Δ%':>9}{'order Δ%':>10}{'max |Δscore|':>14}{'p50 ms':>9}")
+    for name, m in metrics.items():
+        err = m.get("max_score_error")
+        print(
+            f"{name:<34}{m['bytes_per_row']:>7}"
+            f"{m.get('top_k_set_changed_pct', 0.0):>9.2f}"
+            f"{m.get('top_k_order_changed_pct', 0.0):>10.2f}"
+            f"{(err if err is not None else 0.0):>14.6f}"
+            f"{m['p50_ms']:>9.3f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=0, help="also test a synthetic catalog")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    metrics = {}
+
+    snapshot = get_snapshot()
+    matrix = np.ascontiguousarray(snapshot.index.matrix)
+    queries, rows_list = catalog_queries(snapshot, args.copies)
+    print(f"🔧 tools_seed.json: {len(matrix)} tools, {len(queries)} queries")
+
+    # rerank=k only re-orders the approximate top-k; the default depth
+    # (RERANK_CANDIDATES) covers this whole catalog
+    evaluate("catalog", matrix, queries, rows_list, args.k, (0, args.k, 200), metrics)
+
+    if args.rows:
+        print(f"🔧 synthetic: {args.rows} x {args.dim}, {args.queries} queries")
+        matrix = synthetic_catalog(args.rows, args.dim, topics=500)
+        queries = make_queries(matrix, args.queries)
+        evaluate("synthetic", matrix, queries, [None] * len(queries), args.k, (0, 50, 200), metrics)
+
+    print_report(metrics)
+    save_results("quantization", vars(args), metrics, args.output)
+
+if __name__ == "__main__":
+    main()
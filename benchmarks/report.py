@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import numpy as np
+
+# ================= RESULTS =================
+#
+# Every benchmark writes one JSON file:
+#   {"benchmark", "timestamp", "environment", "params",
+#    "metrics": {name: {"mean_ms", "p50_ms", "p95_ms", "p99_ms", ...}}}
+# Compare two runs with:  python -m benchmarks.compare OLD.json NEW.json
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def summarize(samples_ms):
+    samples = np.asarray(samples_ms, dtype="float64")
+    if not len(samples):
+        return {"n": 0}
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "n": int(len(samples)),
+        "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(samples.max()), 4)
+    }
+
+def time_calls(fn, inputs, repeat=1):
+    # Per-call latency in milliseconds
+    samples = []
+    for _ in range(repeat):
+        for value in inputs:
+            start = time.perf_counter()
+            fn(value)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "git_commit": git_commit()
+    }
+
+def save_results(name, params, metrics, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{name}-{stamp}.json")
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "benchmark": name,
+                "timestamp": time.time(),
+                "argv": sys.argv[1:],
+                "environment": environment(),
+                "params": params,
+                "metrics": metrics
+            },
+            f,
+            indent=2
+        )
+
+    print(f"\n📁 Results saved to {path}")
+    return path
+
+def print_table(metrics, keys=("mean_ms", "p50_ms", "p95_ms", "p99_ms")):
+    width = max(len(name) for name in metrics) + 2
+    print(f"{'metric':<{width}}" + "".join(f"{k:>12}" for k in keys))
+    for name, values in metrics.items():
+        cells = "".join(
+            f"{values[k]:>12.4f}" if isinstance(values.get(k), (int, float)) else f"{'-':>12}"
+            for k in keys
+        )
+        print(f"{name:<{width}}{cells}")
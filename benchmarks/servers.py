@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import socket
+import subprocess
+import contextlib
+import httpx
+
+# ================= LOCAL SERVERS =================
+#
+# Subprocess helpers shared by the benchmarks and tests/conftest.py: free
+# ports, readiness polling, and uvicorn apps started from the repo root.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAKE_OLLAMA_APP = "benchmarks.fake_ollama:app"
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/docs", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready in {timeout}s")
+
+def uvicorn(app, port, env, extra=()):
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port),
+         "--log-level", "warning", *extra],
+        cwd=ROOT,
+        env=env
+    )
+
+@contextlib.contextmanager
+def fake_ollama(env=None):
+    # Yields the base URL of a fake Ollama running for the block
+    port = free_port()
+    proc = uvicorn(FAKE_OLLAMA_APP, port, dict(os.environ) if env is None else env)
+    try:
+        url = f"http://127.0.0.1:{port}"
+        wait_ready(url)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
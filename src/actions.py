@@ -0,0 +1,18 @@
+import os
+
+# ================= ACTION VOCABULARY =================
+#
+# Shared by the filter columns (src/columnar.py) and the ranking's action
+# signal, and by src/filter_tools.py.
+
+ACTION_ALIASES = {
+    "convert": ["convert", "transcribe"],
+    "generate": ["generate", "create"],
+    "summarize": ["summarize"],
+    "analyze": ["analyze"],
+    "translate": ["translate"]
+}
+
+# Match level of a tool listing only an alias of the intent action (a tool
+# listing the action itself, or an alias the prompt spells out, scores 1)
+ALIAS_MATCH = float(os.getenv("ALIAS_MATCH", "0.5"))
@@ -1,11 +1,49 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+
+import os
+import hmac
+import json
+import logging
+
+from fastapi import FastAPI, HTTPException, Header, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from src.final_pipeline_numpy import recommend_tools, tool_map
+from src.final_pipeline_numpy import (
+    recommend_tools_async, recommend_tools_batch, EMBED_CACHE, RESULT_CACHE,
+    SEMANTIC_CACHE, BAD_PROMPTS, FEEDBACK
+)
+from src import catalog
+from src.prompt_rewriter import PROMPT_CACHE
 from src.chat_api import router as chat_router
+from src import ollama_client
+from src import log_sink
+from src.metrics import render_prometheus
+from src.payloads import encode_response, encode_results
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+# One INFO line per upstream request is too chatty for production logs
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Shared secret for the /admin endpoints; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Most prompts in one /recommend/batch request; longer lists get a 422
+MAX_BATCH_PROMPTS = int(os.getenv("MAX_BATCH_PROMPTS", "256"))
 
-app = FastAPI(title="AI Tool Finder API")
+@asynccontextmanager
+async def lifespan(app):
+    # Load the catalog off the startup path; see /readyz
+    catalog.warm_in_background()
+    yield
+    await ollama_client.close_client()
+    log_sink.close_all()
+
+app = FastAPI(title="AI Tool Finder API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,20 +57,139 @@ app.include_router(chat_router)
 
 class PromptRequest(BaseModel):
     prompt: str
+    # Adds per-stage timings (ms) to the response
+    debug: bool = False
+
+class BatchPromptRequest(BaseModel):
+    prompts: list[str] = Field(max_length=MAX_BATCH_PROMPTS)
+
+def json_response(body: bytes, **kwargs):
+    # Bodies are already encoded (tool payloads are pre-serialized per
+    # snapshot), so skip FastAPI's jsonable_encoder pass
+    return Response(content=body, media_type="application/json", **kwargs)
+
+def require_catalog():
+    # While the catalog loads, answer at once instead of holding the
+    # request (and, for async handlers, the event loop) until it is ready
+    if not catalog.is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Catalog is loading",
+            headers={"Retry-After": "1"}
+        )
 
 @app.post("/recommend")
-def recommend(req: PromptRequest):
-    return recommend_tools(req.prompt)
+async def recommend(req: PromptRequest):
+    require_catalog()
+    response = await recommend_tools_async(req.prompt, debug=req.debug)
+    return json_response(encode_response(response))
+
+@app.post("/recommend/batch")
+def recommend_batch(req: BatchPromptRequest):
+    require_catalog()
+    return json_response(encode_results(recommend_tools_batch(req.prompts)))
 
 @app.post("/feedback")
 def tool_feedback(data: dict):
-    with open("data/user_feedback.jsonl", "a", encoding="utf-8") as f:
-        f.write(json.dumps(data) + "\n")
+    if not FEEDBACK.write(json.dumps(data, ensure_ascii=False)):
+        raise HTTPException(status_code=503, detail="Feedback queue is full")
     return {"status": "recorded"}
 
+@app.get("/stats/cache")
+def cache_stats():
+    return {
+        "embed": EMBED_CACHE.stats(),
+        "rewrite": PROMPT_CACHE.stats(),
+        "result": RESULT_CACHE.stats() if RESULT_CACHE is not None else None,
+        "semantic": SEMANTIC_CACHE.stats() if SEMANTIC_CACHE is not None else None
+    }
+
+@app.get("/stats/logs")
+def log_stats():
+    return {
+        "bad_prompts": BAD_PROMPTS.stats(),
+        "feedback": FEEDBACK.stats()
+    }
+
+@app.get("/healthz")
+def healthz():
+    # Liveness: the process is up and serving
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    # Readiness: the catalog and index are loaded. Ollama being down does
+    # not make the API unready (requests degrade to rule rewrite and
+    # lexical ranking), but its circuit state is reported here.
+    if not catalog.is_ready():
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "loading",
+                "error": catalog.last_reload_error,
+                "ollama": ollama_client.upstream_info()
+            }
+        )
+    return {
+        "status": "ready",
+        "catalog": catalog.get_snapshot().info(),
+        "ollama": ollama_client.upstream_info()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return render_prometheus()
+
+def check_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not token or not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/reload")
+def admin_reload(wait: bool = False, x_admin_token: str | None = Header(None)):
+    check_admin(x_admin_token)
+
+    if not wait:
+        started = catalog.reload_in_background()
+        return {
+            "status": "reloading" if started else "already reloading",
+            "catalog": catalog.get_snapshot().info()
+        }
+
+    try:
+        snapshot = catalog.reload_snapshot()
+    except Exception as e:
+        raise HTTPException(status_code=409, detail=f"Reload failed: {e}")
+
+    return {"status": "reloaded", "catalog": snapshot.info()}
+
+@app.get("/admin/catalog")
+def admin_catalog(x_admin_token: str | None = Header(None)):
+    check_admin(x_admin_token)
+    return {
+        "catalog": catalog.get_snapshot().info(),
+        "last_reload_error": catalog.last_reload_error
+    }
+
 @app.get("/tool/{tool_id}")
-def get_tool(tool_id: str):
-    tool = tool_map.get(tool_id)
-    if not tool:
+def get_tool(tool_id: str, if_none_match: str | None = Header(None)):
+    require_catalog()
+    document = catalog.get_snapshot().document(tool_id)
+    if not document:
         raise HTTPException(status_code=404, detail="Tool not found")
-    return tool
\ No newline at end of file
+
+    headers = {"ETag": document.etag, "Cache-Control": "no-cache"}
+    if if_none_match and document.etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    return json_response(document.body, headers=headers)
+
+@app.get("/facets")
+def facets(domain: str | None = None, action: str | None = None, pricing: str | None = None):
+    # Counts per value, optionally narrowed to one domain / action / pricing
+    require_catalog()
+    filters = {"domain": domain, "pricing": pricing, "actions": [action] if action else None}
+    snapshot = catalog.get_snapshot()
+    counts = snapshot.columns.facets(**{k: v for k, v in filters.items() if v})
+    return {"catalog": snapshot.version} | counts
@@ -0,0 +1,308 @@
+import os
+import json
+import logging
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# ================= CONFIG =================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "..", "data")
+
+# "memory" keeps entries per process, "sqlite" adds an on-disk tier that
+# every uvicorn worker on the host shares and that survives restarts
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_DB = os.getenv("CACHE_DB", os.path.join(DATA_DIR, "cache.sqlite3"))
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# ================= KEYS =================
+
+def normalize_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def json_encode(value) -> bytes:
+    return json.dumps(value).encode("utf-8")
+
+def json_decode(data: bytes):
+    return json.loads(data.decode("utf-8"))
+
+# ================= MEMORY (LRU + TTL) =================
+
+class MemoryCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        key = normalize_key(key)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        key = normalize_key(key)
+        expires_at = time.monotonic() + self.ttl
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# ================= SQLITE (SHARED ACROSS WORKERS) =================
+
+class SqliteCache:
+    # Expired / over-capacity rows are pruned every PRUNE_EVERY writes
+    PRUNE_EVERY = 256
+
+    def __init__(
+        self,
+        namespace,
+        path=CACHE_DB,
+        encode=json_encode,
+        decode=json_decode,
+        max_entries=CACHE_MAX_ENTRIES,
+        ttl=CACHE_TTL_SECONDS
+    ):
+        self.namespace = namespace
+        self.path = path
+        self.encode = encode
+        self.decode = decode
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_lru"
+                " ON cache (namespace, accessed_at)"
+            )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        key = normalize_key(key)
+        now = time.time()
+
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value FROM cache"
+                " WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, now)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return default
+
+            conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+            self.hits += 1
+            return self.decode(row[0])
+
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Cache read failed: %s", e)
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        key = normalize_key(key)
+        now = time.time()
+
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, self.encode(value), now + self.ttl, now)
+            )
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Cache write failed: %s", e)
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+
+        if prune:
+            self.prune()
+
+    def prune(self):
+        conn = self._conn()
+        try:
+            expired = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time())
+            ).rowcount
+
+            overflow = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache WHERE namespace = ?"
+                " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries)
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Cache prune failed: %s", e)
+            return
+
+        self.evictions += expired + overflow
+
+    def clear(self):
+        self._conn().execute(
+            "DELETE FROM cache WHERE namespace = ?", (self.namespace,)
+        )
+
+    def __len__(self):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# ================= TIERED =================
+
+class TieredCache:
+    # Small per-process LRU in front of the shared on-disk cache
+    def __init__(self, front, back):
+        self.front = front
+        self.back = back
+
+    def get(self, key, default=None):
+        value = self.front.get(key)
+        if value is not None:
+            return value
+
+        value = self.back.get(key)
+        if value is None:
+            return default
+
+        self.front.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.front.set(key, value)
+        self.back.set(key, value)
+
+    def clear(self):
+        self.front.clear()
+        self.back.clear()
+
+    def __len__(self):
+        return len(self.back)
+
+    def stats(self):
+        front = self.front.stats()
+        back = self.back.stats()
+        hits = front["hits"] + back["hits"]
+        lookups = front["hits"] + front["misses"]
+        return {
+            "backend": "memory+sqlite",
+            "entries": back["entries"],
+            "hits": hits,
+            "misses": back["misses"],
+            "evictions": front["evictions"] + back["evictions"],
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": front,
+            "sqlite": back
+        }
+
+# ================= FACTORY =================
+
+def make_cache(namespace, encode=json_encode, decode=json_decode, backend=None):
+    backend = backend or CACHE_BACKEND
+
+    if backend == "sqlite":
+        return TieredCache(
+            MemoryCache(max_entries=min(CACHE_MAX_ENTRIES, 1024)),
+            SqliteCache(namespace, encode=encode, decode=decode)
+        )
+
+    if backend != "memory":
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+    return MemoryCache()
@@ -0,0 +1,365 @@
+import os
+import json
+import time
+import logging
+import hashlib
+import threading
+import numpy as np
+
+from src.columnar import ColumnarCatalog
+from src.lexical import LexicalIndex, KEYWORD_FIELDS, BM25_K1, BM25_B
+from src.tool_index import load_index, ToolIndex
+from src.vector_index import make_vector_index
+from src.payloads import ToolPayload, ToolDocument, PayloadTable, ToolTable
+from src.catalog_file import CatalogFile
+from src.tool_schema import load_schema, validate_tool
+
+logger = logging.getLogger(__name__)
+
+# ================= PATH SETUP =================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.getenv("CATALOG_DIR", os.path.join(BASE_DIR, "..", "data"))
+
+TOOLS_FILE = os.path.join(DATA_DIR, "tools_seed.json")
+EMBED_FILE = os.path.join(DATA_DIR, "tool_embeddings.npy")
+ID_FILE = os.path.join(DATA_DIR, "tool_ids.json")
+INDEX_FILE = os.path.join(DATA_DIR, "tool_index.bin")
+
+SOURCE_FILES = (TOOLS_FILE, EMBED_FILE, ID_FILE)
+
+# Built from the files above by python -m src.compile_catalog and loaded
+# instead of them when present and newer; set to "" to always use the JSON
+SNAPSHOT_FILE = os.getenv("CATALOG_SNAPSHOT", os.path.join(DATA_DIR, "catalog.snap"))
+
+# Hash the compiled catalog on load (one sequential read of the file)
+SNAPSHOT_VERIFY = os.getenv("CATALOG_SNAPSHOT_VERIFY", "1") != "0"
+
+# Seconds between file checks; 0 disables the watcher
+WATCH_INTERVAL = float(os.getenv("CATALOG_WATCH_INTERVAL", "0"))
+
+class CatalogError(ValueError):
+    pass
+
+# ================= SNAPSHOT =================
+
+class CatalogSnapshot:
+    # Immutable once built. Requests grab one snapshot up front and use it
+    # throughout, so a reload never changes the catalog under them.
+
+    def __init__(self, version, tools, index, signature=None):
+        self.version = version
+        self.signature = signature
+        self.tools = tools
+        self.tool_map = {t["id"]: t for t in tools}
+        self.index = index
+        self.tool_ids = index.ids
+
+        # Exact or approximate search backend over the same rows
+        self.vectors = make_vector_index(index, INDEX_FILE)
+
+        # Catalog rows aligned with the embedding rows, plus their
+        # filterable fields as arrays for filters and facets
+        self.row_tools = [self.tool_map[tool_id] for tool_id in self.tool_ids]
+        self.columns = ColumnarCatalog(self.row_tools)
+
+        # BM25 over the same rows, for ranking without a query embedding,
+        # and the use_cases / tags terms for the keyword-overlap signal
+        self.lexical = LexicalIndex(self.row_tools)
+        self.keywords = LexicalIndex(self.row_tools, KEYWORD_FIELDS)
+
+        # Response payloads, encoded once per snapshot instead of per request
+        self.payloads = [ToolPayload(t) for t in self.row_tools]
+
+        # /tool/{id} documents are encoded on first request: most tools are
+        # never opened, and each worker would hold its own copy
+        self.documents = {}
+
+        self.loaded_at = time.time()
+
+    def document(self, tool_id):
+        document = self.documents.get(tool_id)
+        if document is None:
+            tool = self.tool_map.get(tool_id)
+            if tool is None:
+                return None
+            document = self.documents[tool_id] = ToolDocument(tool)
+        return document
+
+    def info(self):
+        return {
+            "version": self.version,
+            "tools": len(self.tools),
+            "indexed": len(self.tool_ids),
+            "dim": self.index.meta["dim"],
+            "vector_index": self.vectors.name,
+            "loaded_at": self.loaded_at
+        }
+
+class CompiledSnapshot(CatalogSnapshot):
+    # The same snapshot read from a compiled catalog: the matrix, columns
+    # and BM25 postings are views into one memory map shared by workers,
+    # and tools are only decoded when a request reaches them
+
+    def __init__(self, catalog_file, signature=None):
+        header = catalog_file.header
+        self.version = header["checksum"][:12]
+        self.signature = signature
+        self.file = catalog_file
+
+        self.tool_ids = catalog_file.strings("ids").strings()
+        self.rows_by_id = {tool_id: row for row, tool_id in enumerate(self.tool_ids)}
+
+        meta = {
+            "count": header["count"], "dim": header["dim"], "model": header["model"],
+            "checksum": header["checksum"]
+        }
+        self.index = ToolIndex(catalog_file.array("embeddings"), self.tool_ids, meta)
+        self.vectors = make_vector_index(self.index, catalog_file.path)
+
+        self.tools = self.row_tools = ToolTable(catalog_file.strings("documents"))
+        self.columns = ColumnarCatalog.from_arrays(header["columns"], catalog_file.arrays("columns"))
+
+        bm25 = header["bm25"]
+        if (bm25["k1"], bm25["b"]) != (BM25_K1, BM25_B):
+            logger.warning(
+                "⚠️ %s was compiled with BM25_K1=%s BM25_B=%s; recompile to apply the current values",
+                catalog_file.path, bm25["k1"], bm25["b"]
+            )
+
+        count = header["count"]
+        self.lexical = LexicalIndex.from_arrays(
+            count, catalog_file.strings("terms.lexical").strings(), catalog_file.arrays("lexical")
+        )
+        self.keywords = LexicalIndex.from_arrays(
+            count, catalog_file.strings("terms.keywords").strings(), catalog_file.arrays("keywords")
+        )
+
+        self.payloads = PayloadTable(catalog_file.strings("payloads"))
+        self.documents = {}
+
+        self.loaded_at = time.time()
+
+    def document(self, tool_id):
+        document = self.documents.get(tool_id)
+        if document is None:
+            row = self.rows_by_id.get(tool_id)
+            if row is None:
+                return None
+            body = self.file.strings("documents")[row]
+            document = self.documents[tool_id] = ToolDocument(body)
+        return document
+
+    def info(self):
+        return super().info() | {
+            "compiled": self.file.path,
+            "rejected": len(self.file.header["rejected"])
+        }
+
+def watched_files():
+    paths = SOURCE_FILES + ((SNAPSHOT_FILE,) if SNAPSHOT_FILE else ())
+    return [p for p in paths if os.path.exists(p)]
+
+def source_signature(paths=None):
+    stats = [os.stat(p) for p in (watched_files() if paths is None else paths)]
+    return tuple((s.st_mtime_ns, s.st_size) for s in stats)
+
+def use_compiled():
+    # The compiled catalog wins unless one of its sources was edited later
+    if not SNAPSHOT_FILE or not os.path.exists(SNAPSHOT_FILE):
+        return False
+
+    compiled_at = os.path.getmtime(SNAPSHOT_FILE)
+    newer = [p for p in SOURCE_FILES if os.path.exists(p) and os.path.getmtime(p) > compiled_at]
+    if newer:
+        logger.warning(
+            "⚠️ %s is newer than %s, loading the JSON catalog (run python -m src.compile_catalog)",
+            os.path.basename(newer[0]), SNAPSHOT_FILE
+        )
+        return False
+
+    return True
+
+def check_consistency(tools, embed_rows, ids):
+    if embed_rows != len(ids):
+        raise CatalogError(
+            f"{EMBED_FILE} has {embed_rows} rows but {ID_FILE} lists {len(ids)} ids"
+        )
+
+    if len(set(ids)) != len(ids):
+        raise CatalogError(f"{ID_FILE} contains duplicate tool ids")
+
+    known = {t["id"] for t in tools}
+    missing = [tool_id for tool_id in ids if tool_id not in known]
+    if missing:
+        raise CatalogError(
+            f"{len(missing)} embedded ids are not in {TOOLS_FILE}: {missing[:5]}"
+        )
+
+def check_tools(tools):
+    # The rules python -m src.compile_catalog enforces: the JSON fallback
+    # must not serve tools the compiled catalog would refuse
+    rules = load_schema()
+    problems = {}
+    seen = set()
+    for tool in tools:
+        tool_id = tool.get("id")
+        found = validate_tool(tool, rules)
+        if tool_id in seen:
+            found.append("duplicate id")
+        seen.add(tool_id)
+        if found:
+            problems[tool_id] = found
+
+    for tool_id, found in problems.items():
+        logger.error("⚠️ %s: %s", tool_id, "; ".join(found))
+
+    if problems:
+        raise CatalogError(
+            f"{len(problems)} invalid tools in {TOOLS_FILE}: {list(problems)[:5]}"
+        )
+
+def load_snapshot():
+    if use_compiled():
+        return CompiledSnapshot(CatalogFile(SNAPSHOT_FILE, SNAPSHOT_VERIFY), source_signature())
+
+    signature = source_signature()
+
+    with open(TOOLS_FILE, "r", encoding="utf-8") as f:
+        tools = json.load(f)
+
+    with open(ID_FILE, "r", encoding="utf-8") as f:
+        ids = json.load(f)
+
+    # Header-only read of the .npy, the matrix itself is not loaded here
+    embed_rows = np.load(EMBED_FILE, mmap_mode="r").shape[0]
+    check_tools(tools)
+    check_consistency(tools, embed_rows, ids)
+
+    index = load_index(INDEX_FILE, EMBED_FILE, ID_FILE)
+    if index.ids != ids:
+        raise CatalogError(f"{INDEX_FILE} does not match {ID_FILE}")
+
+    version = hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:12]
+    return CatalogSnapshot(version, tools, index, signature)
+
+# ================= CURRENT SNAPSHOT =================
+
+_current = None
+_load_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+last_reload_error = None
+
+def get_snapshot():
+    global _current
+
+    snapshot = _current
+    if snapshot is None:
+        with _load_lock:
+            if _current is None:
+                _current = load_snapshot()
+            snapshot = _current
+
+    return snapshot
+
+def is_ready():
+    return _current is not None
+
+def current_snapshot():
+    # Never blocks: None while the first load is still running
+    return _current
+
+def warm_in_background():
+    # Called from the API startup hook: the port opens right away and
+    # /readyz reports 200 once the first snapshot is loaded. API requests
+    # that arrive earlier get a 503; offline callers of get_snapshot()
+    # wait on the same load.
+
+    def run():
+        global last_reload_error
+        started = time.perf_counter()
+        try:
+            snapshot = get_snapshot()
+        except Exception as e:
+            last_reload_error = f"{type(e).__name__}: {e}"
+            logger.error("⚠️ Catalog load failed: %s", last_reload_error)
+            return
+
+        logger.info(
+            "✅ Catalog %s ready in %.2fs (%d tools)",
+            snapshot.version, time.perf_counter() - started, len(snapshot.tool_ids)
+        )
+        start_watcher()
+
+    threading.Thread(target=run, name="catalog-warm", daemon=True).start()
+
+def reload_snapshot():
+    # Build the new snapshot off to the side and swap the reference in
+    # one assignment; on failure the old snapshot keeps serving
+    global _current, last_reload_error
+
+    with _reload_lock:
+        try:
+            snapshot = load_snapshot()
+        except Exception as e:
+            last_reload_error = f"{type(e).__name__}: {e}"
+            logger.error("⚠️ Catalog reload failed: %s", last_reload_error)
+            raise
+
+        previous = _current
+        _current = snapshot
+        last_reload_error = None
+
+    logger.info(
+        "🔄 Catalog %s -> %s (%d tools)",
+        previous.version if previous else "-", snapshot.version, len(snapshot.tool_ids)
+    )
+    return snapshot
+
+def reload_in_background():
+    if _reload_lock.locked():
+        return False
+
+    def run():
+        try:
+            reload_snapshot()
+        except Exception:
+            pass
+
+    threading.Thread(target=run, name="catalog-reload", daemon=True).start()
+    return True
+
+# ================= FILE WATCHER =================
+
+_watcher = None
+
+def start_watcher(interval=WATCH_INTERVAL):
+    global _watcher
+
+    if interval <= 0 or _watcher is not None:
+        return
+
+    def watch():
+        seen = get_snapshot().signature
+
+        while True:
+            time.sleep(interval)
+            try:
+                signature = source_signature()
+            except OSError:
+                # A file is being replaced right now, check again next tick
+                continue
+
+            if signature == seen:
+                continue
+
+            seen = signature
+            try:
+                reload_snapshot()
+            except Exception:
+                # Keep serving the old snapshot until the files change again
+                pass
+
+    _watcher = threading.Thread(target=watch, name="catalog-watcher", daemon=True)
+    _watcher.start()
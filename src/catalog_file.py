@@ -0,0 +1,158 @@
+import os
+import json
+import struct
+import hashlib
+import numpy as np
+
+# ================= FORMAT =================
+#
+# [ MAGIC (8 bytes) ][ header length (uint32 LE) ][ JSON header ][ pad ][ body ]
+#
+# The body is a sequence of arrays, each starting on an ALIGNMENT
+# boundary, so every one of them is a zero-copy view into one read-only
+# memory map shared by all workers. The JSON header holds the section
+# table (offset, dtype, shape relative to the body), small vocabularies,
+# and the SHA-256 of the body.
+#
+# Strings (ids, tool documents, encoded payloads, BM25 terms) live in
+# string pools: one uint8 array of UTF-8 bytes plus an int64 array of
+# count + 1 offsets.
+
+MAGIC = b"TOOLSNAP"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+class CatalogFileError(ValueError):
+    pass
+
+def aligned(n):
+    return n + (-n) % ALIGNMENT
+
+# ================= STRING POOLS =================
+
+def pack_strings(values):
+    # values: str or bytes -> (data, offsets) arrays
+    encoded = [v.encode("utf-8") if isinstance(v, str) else v for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(v) for v in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return data, offsets
+
+class StringPool:
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def strings(self):
+        # Every entry decoded, with one copy of the pool instead of one per entry
+        data = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        return [data[a:b].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+
+# ================= WRITE =================
+
+def write_catalog(path, header, arrays, pools):
+    # arrays: name -> ndarray; pools: name -> list of str / bytes
+    for name, values in pools.items():
+        arrays[f"{name}.data"], arrays[f"{name}.offsets"] = pack_strings(values)
+
+    sections = {}
+    size = 0
+    for name, array in arrays.items():
+        array = arrays[name] = np.ascontiguousarray(array)
+        sections[name] = {
+            "offset": size,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape)
+        }
+        size = aligned(size + array.nbytes)
+
+    digest = hashlib.sha256()
+    for chunk in body_chunks(arrays):
+        digest.update(chunk)
+
+    header = dict(
+        header,
+        version=FORMAT_VERSION,
+        checksum=digest.hexdigest(),
+        body_size=size,
+        sections=sections
+    )
+    header_bytes = json.dumps(header).encode("utf-8")
+    padding = aligned(len(MAGIC) + 4 + len(header_bytes)) - (len(MAGIC) + 4 + len(header_bytes))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * padding)
+        for chunk in body_chunks(arrays):
+            f.write(chunk)
+
+    os.replace(tmp_path, path)
+    return header
+
+def body_chunks(arrays):
+    for array in arrays.values():
+        yield array.reshape(-1).view(np.uint8)
+        yield b"\0" * ((-array.nbytes) % ALIGNMENT)
+
+# ================= READ =================
+
+class CatalogFile:
+    def __init__(self, path, verify=True):
+        self.path = path
+
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise CatalogFileError(f"{path} is not a compiled catalog")
+
+            (header_len,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+
+        if self.header.get("version") != FORMAT_VERSION:
+            raise CatalogFileError(f"Unsupported catalog format version: {self.header.get('version')}")
+
+        body_offset = aligned(len(MAGIC) + 4 + header_len)
+        if os.path.getsize(path) != body_offset + self.header["body_size"]:
+            raise CatalogFileError(f"{path} is truncated or has trailing data")
+
+        self.body = np.memmap(path, dtype=np.uint8, mode="r", offset=body_offset)
+
+        if verify:
+            self.verify()
+
+    def verify(self):
+        # Hashes the whole body: one sequential read, skipped with verify=False
+        digest = hashlib.sha256(self.body).hexdigest()
+        if digest != self.header["checksum"]:
+            raise CatalogFileError(f"{self.path} failed its checksum, recompile the catalog")
+
+    def array(self, name):
+        section = self.header["sections"].get(name)
+        if section is None:
+            raise CatalogFileError(f"{self.path} has no section {name!r}")
+
+        dtype = np.dtype(section["dtype"])
+        count = int(np.prod(section["shape"]))
+        start = section["offset"]
+        raw = self.body[start:start + count * dtype.itemsize]
+        return raw.view(dtype).reshape(section["shape"])
+
+    def arrays(self, prefix):
+        # Sections named "<prefix>.<name>", by name
+        start = f"{prefix}."
+        return {
+            name[len(start):]: self.array(name)
+            for name in self.header["sections"] if name.startswith(start)
+        }
+
+    def strings(self, name):
+        return StringPool(self.array(f"{name}.data"), self.array(f"{name}.offsets"))
@@ -1,52 +1,142 @@
-from fastapi import APIRouter
+import json
+import time
+import logging
+from contextlib import aclosing
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
+
+from src import ollama_client
+from src.metrics import describe, observe
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-OLLAMA_CHAT_URL = "http://localhost:11434/api/chat"
+SYSTEM_PROMPT = "You are a helpful AI assistant for user questions."
+
+# ✅ Safe fallback for Render / Cloud
+CHAT_UNAVAILABLE = (
+    "⚠️ Chat is unavailable on the hosted version.\n\n"
+    "Reason: Ollama runs locally and cannot be accessed from cloud hosting.\n\n"
+    "👉 To use chat, run the backend locally with Ollama running."
+)
+
+# ================= METRICS =================
+
+TTFT_METRIC = "chat_time_to_first_token_seconds"
+TOKENS_METRIC = "chat_tokens_per_second"
+TOKENS_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500)
+
+describe(TTFT_METRIC, "Time from /chat/stream request to the first streamed token")
+describe(TOKENS_METRIC, "Generation speed of streamed chat replies")
 
 class ChatRequest(BaseModel):
     message: str
 
+def chat_messages(message: str):
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": message
+        }
+    ]
+
 @router.post("/chat")
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     try:
-        response = requests.post(
-            OLLAMA_CHAT_URL,
-            json={
-                "model": "qwen2:0.5b",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are a helpful AI assistant for user questions."
-                    },
-                    {
-                        "role": "user",
-                        "content": req.message
-                    }
-                ],
-                "stream": False
-            },
-            timeout=None
+        reply = await ollama_client.chat(
+            chat_messages(req.message),
+            timeout=ollama_client.CHAT_TIMEOUT
         )
 
-        response.raise_for_status()
-
-        data = response.json()
-        reply = data.get("message", {}).get("content")
-
         if not reply:
             raise ValueError("Empty response from Ollama")
 
         return {"reply": reply}
 
     except Exception as e:
-        # ✅ Safe fallback for Render / Cloud
-        return {
-            "reply": (
-                "⚠️ Chat is unavailable on the hosted version.\n\n"
-                "Reason: Ollama runs locally and cannot be accessed from cloud hosting.\n\n"
-                "👉 To use chat, run the backend locally with Ollama running."
-            )
-        }
\ No newline at end of file
+        return {"reply": CHAT_UNAVAILABLE}
+
+# ================= STREAMING =================
+
+def sse(data, event=None):
+    frame = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return f"event: {event}\n{frame}" if event else frame
+
+def tokens_per_second(final, tokens, first_at, last_at):
+    # Prefer Ollama's own counters, they exclude network time
+    eval_count = final.get("eval_count")
+    eval_ns = final.get("eval_duration")
+    if eval_count and eval_ns:
+        return eval_count / (eval_ns / 1e9)
+
+    if tokens > 1 and last_at > first_at:
+        return (tokens - 1) / (last_at - first_at)
+    return None
+
+async def stream_reply(request: Request, message: str):
+    started = time.perf_counter()
+    first_at = last_at = None
+    tokens = 0
+    final = {}
+
+    try:
+        # aclosing: leaving the loop early (done, client gone) closes the
+        # stream right away, which drops the upstream connection, instead
+        # of whenever the generator is garbage collected
+        async with aclosing(ollama_client.chat_stream(chat_messages(message))) as stream:
+            async for chunk in stream:
+                if await request.is_disconnected():
+                    logger.info("🔌 Chat client disconnected after %d tokens", tokens)
+                    return
+
+                if chunk.get("done"):
+                    final = chunk
+                    break
+
+                content = chunk.get("message", {}).get("content", "")
+                if not content:
+                    continue
+
+                last_at = time.perf_counter()
+                if first_at is None:
+                    first_at = last_at
+                    observe(TTFT_METRIC, first_at - started)
+
+                tokens += 1
+                yield sse({"token": content})
+
+    except Exception as e:
+        logger.warning("⚠️ Chat stream failed: %s", e)
+        if tokens == 0:
+            yield sse({"message": CHAT_UNAVAILABLE}, event="error")
+        else:
+            yield sse({"message": "Reply interrupted"}, event="error")
+        return
+
+    rate = tokens_per_second(final, tokens, first_at, last_at) if tokens else None
+    if rate:
+        observe(TOKENS_METRIC, rate, TOKENS_BUCKETS)
+
+    yield sse(
+        {
+            "tokens": tokens,
+            "ttft_ms": round((first_at - started) * 1000, 1) if first_at else None,
+            "tokens_per_sec": round(rate, 1) if rate else None
+        },
+        event="done"
+    )
+
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest, request: Request):
+    return StreamingResponse(
+        stream_reply(request, req.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,224 @@
+import threading
+import numpy as np
+
+from src.actions import ACTION_ALIASES, ALIAS_MATCH
+
+# ================= COLUMNS =================
+#
+# The catalog's filterable fields as arrays aligned with the embedding
+# rows, so a filter is a few vectorized comparisons instead of a walk over
+# the tool dicts:
+#
+#   domain, pricing                      categorical codes (int16)
+#   actions, input_types, output_types,  bitmasks, one bit per label
+#   tags                                 (uint64 words, row x word)
+#   api_available                        bool
+
+class Categorical:
+    def __init__(self, values):
+        self.labels = sorted(set(values))
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.codes = np.array([self.index[v] for v in values], dtype=np.int16)
+
+    def mask(self, labels):
+        codes = [self.index[label] for label in labels if label in self.index]
+        if not codes:
+            return np.zeros(len(self.codes), dtype=bool)
+        if len(codes) == 1:
+            return self.codes == codes[0]
+        return np.isin(self.codes, codes)
+
+    @classmethod
+    def from_array(cls, labels, codes):
+        column = cls.__new__(cls)
+        column.labels = list(labels)
+        column.index = {label: i for i, label in enumerate(column.labels)}
+        column.codes = codes
+        return column
+
+    def counts(self, mask=None):
+        codes = self.codes if mask is None else self.codes[mask]
+        counts = np.bincount(codes, minlength=len(self.labels))
+        return {label: int(c) for label, c in zip(self.labels, counts)}
+
+class MultiLabel:
+    def __init__(self, value_lists):
+        self.labels = sorted({v for values in value_lists for v in values})
+        self.index = {label: i for i, label in enumerate(self.labels)}
+
+        # Rows share a handful of label combinations: build each distinct
+        # combination's words once and gather them by combination id
+        combos = {}
+        ids = np.array(
+            [combos.setdefault(tuple(values), len(combos)) for values in value_lists],
+            dtype=np.int64
+        )
+
+        words = max(1, (len(self.labels) + 63) // 64)
+        table = np.zeros((max(1, len(combos)), words), dtype=np.uint64)
+        for combo, i in combos.items():
+            for v in combo:
+                bit = self.index[v]
+                table[i, bit // 64] |= np.uint64(1 << (bit % 64))
+
+        self.bits = table[ids]
+
+    @classmethod
+    def from_array(cls, labels, bits):
+        column = cls.__new__(cls)
+        column.labels = list(labels)
+        column.index = {label: i for i, label in enumerate(column.labels)}
+        column.bits = bits
+        return column
+
+    def query(self, labels):
+        query = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for label in labels:
+            i = self.index.get(label)
+            if i is not None:
+                query[i // 64] |= np.uint64(1 << (i % 64))
+        return query
+
+    def mask(self, labels, rows=None):
+        # Rows carrying any of the labels
+        bits = self.bits if rows is None else self.bits[rows]
+        query = self.query(labels)
+        words = np.flatnonzero(query)
+        if len(words) == 0:
+            return np.zeros(len(bits), dtype=bool)
+        if len(words) == 1:
+            w = words[0]
+            return (bits[:, w] & query[w]) != 0
+        return ((bits[:, words] & query[words]) != 0).any(axis=1)
+
+    def counts(self, mask=None):
+        bits = self.bits if mask is None else self.bits[mask]
+        return {
+            label: int(np.count_nonzero(bits[:, i // 64] & np.uint64(1 << (i % 64))))
+            for i, label in enumerate(self.labels)
+        }
+
+# ================= CATALOG =================
+
+CATEGORICAL_FIELDS = ("domain", "pricing")
+MULTI_LABEL_FIELDS = ("actions", "input_types", "output_types", "tags")
+
+# Filter results kept per (domain, actions, pricing); the key space is
+# small (domains x actions x pricings), so this is bounded in practice
+MAX_MEMO_KEYS = 4096
+
+class ColumnarCatalog:
+    def __init__(self, tools):
+        self.size = len(tools)
+
+        self.domain = Categorical([t["domain"] for t in tools])
+        self.pricing = Categorical([t["pricing"] for t in tools])
+        self.actions = MultiLabel([t["actions"] for t in tools])
+        self.input_types = MultiLabel([t.get("input_types", []) for t in tools])
+        self.output_types = MultiLabel([t.get("output_types", []) for t in tools])
+        self.tags = MultiLabel([t.get("tags", []) for t in tools])
+        self.api_available = np.array([bool(t.get("api_available")) for t in tools], dtype=bool)
+        self._reset()
+
+    def _reset(self):
+        self._memo = {}
+        self._lock = threading.Lock()
+        self._facets = None
+
+    def export(self):
+        # (labels per field, arrays per field) as stored in a compiled catalog
+        labels = {f: getattr(self, f).labels for f in CATEGORICAL_FIELDS + MULTI_LABEL_FIELDS}
+        arrays = {f: getattr(self, f).codes for f in CATEGORICAL_FIELDS}
+        arrays |= {f: getattr(self, f).bits for f in MULTI_LABEL_FIELDS}
+        arrays["api_available"] = self.api_available
+        return labels, arrays
+
+    @classmethod
+    def from_arrays(cls, labels, arrays):
+        # Columns straight from (memory-mapped) arrays, nothing recomputed
+        columns = cls.__new__(cls)
+        for f in CATEGORICAL_FIELDS:
+            setattr(columns, f, Categorical.from_array(labels[f], arrays[f]))
+        for f in MULTI_LABEL_FIELDS:
+            setattr(columns, f, MultiLabel.from_array(labels[f], arrays[f]))
+        columns.api_available = arrays["api_available"]
+        columns.size = len(columns.api_available)
+        columns._reset()
+        return columns
+
+    def mask(
+        self, domain=None, actions=None, pricing=None,
+        input_types=None, output_types=None, tags=None, api_available=None
+    ):
+        # AND across the given fields, OR within a field's values
+        mask = np.ones(self.size, dtype=bool)
+
+        if domain is not None:
+            mask &= self.domain.mask([domain])
+        if pricing is not None:
+            mask &= self.pricing.mask([pricing])
+        if actions is not None:
+            mask &= self.actions.mask(actions)
+        if input_types is not None:
+            mask &= self.input_types.mask(input_types)
+        if output_types is not None:
+            mask &= self.output_types.mask(output_types)
+        if tags is not None:
+            mask &= self.tags.mask(tags)
+        if api_available is not None:
+            mask &= self.api_available == api_available
+
+        return mask
+
+    def rows(self, intent):
+        # The intent's domain, any aliased action, and its pricing unless
+        # that is "any"
+        allowed = tuple(ACTION_ALIASES.get(intent["action"], [intent["action"]]))
+        pricing = intent["constraints"]["pricing"]
+        key = (intent["domain"], allowed, None if pricing == "any" else pricing)
+
+        rows = self._memo.get(key)
+        if rows is None:
+            rows = np.flatnonzero(self.mask(domain=key[0], actions=allowed, pricing=key[2]))
+            rows.flags.writeable = False
+
+            with self._lock:
+                if len(self._memo) >= MAX_MEMO_KEYS:
+                    self._memo.clear()
+                self._memo[key] = rows
+
+        return rows
+
+    def match_levels(self, intent, rows, prompt_terms=()):
+        # 1.0 when a tool lists the intent action (or an alias the prompt
+        # names literally, e.g. "transcribe"), ALIAS_MATCH when it only
+        # lists another alias, 0 otherwise (catalog-wide fallback rows)
+        action = intent["action"]
+        aliases = ACTION_ALIASES.get(action, [action])
+        exact = {action} | (set(aliases) & set(prompt_terms))
+
+        levels = np.zeros(len(rows), dtype="float32")
+        levels[self.actions.mask([a for a in aliases if a not in exact], rows)] = ALIAS_MATCH
+        levels[self.actions.mask(exact, rows)] = 1.0
+        return levels
+
+    def facets(self, **filters):
+        # Counts per value under the given filters; the unfiltered counts
+        # are computed once per catalog snapshot
+        if not filters and self._facets is not None:
+            return self._facets
+
+        mask = self.mask(**filters) if filters else None
+        facets = {
+            "total": int(self.size if mask is None else mask.sum()),
+            "domain": self.domain.counts(mask),
+            "action": self.actions.counts(mask),
+            "pricing": self.pricing.counts(mask),
+            "input_types": self.input_types.counts(mask),
+            "output_types": self.output_types.counts(mask),
+            "api_available": int(self.api_available.sum() if mask is None else self.api_available[mask].sum())
+        }
+
+        if not filters:
+            self._facets = facets
+        return facets
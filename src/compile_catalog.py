@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+
+from src import ollama_client
+from src.catalog import TOOLS_FILE, EMBED_FILE, ID_FILE, SNAPSHOT_FILE, CatalogError
+from src.catalog_file import write_catalog
+from src.columnar import ColumnarCatalog
+from src.lexical import LexicalIndex, KEYWORD_FIELDS, BM25_K1, BM25_B
+from src.payloads import ToolDocument, tool_payload, dumps
+from src.tool_index import normalize_rows
+from src.tool_schema import load_schema, validate_tool
+
+# ================= CONFIG =================
+#
+# Run from the repository root:  python -m src.compile_catalog
+#
+# Compiles tools_seed.json, tool_ids.json and tool_embeddings.npy into one
+# checksummed data/catalog.snap (see src/catalog_file.py) that the API
+# memory-maps at startup instead of parsing the JSON files. A tool that
+# breaks the rules in specs/tools_schema.json and notes/validation.md
+# fails the build; --skip-invalid leaves such tools out and lists them.
+
+# ================= VALIDATION =================
+
+def select_rows(tools, ids, embeddings, rules):
+    # -> (embedding rows, tools) of the valid tools in embedding order, and
+    # the rejected tool ids with their problems
+    problems = {}
+    seen = {}
+    for tool in tools:
+        tool_id = tool.get("id")
+        if tool_id in seen:
+            problems.setdefault(tool_id, []).append("duplicate id")
+            continue
+        seen[tool_id] = tool
+        found = validate_tool(tool, rules)
+        if found:
+            problems[tool_id] = found
+
+    embedded = set(ids)
+    for tool_id in seen:
+        if tool_id not in embedded:
+            problems.setdefault(tool_id, []).append(
+                "no embedding (run python -m src.generate_embeddings)"
+            )
+
+    norms = np.linalg.norm(embeddings, axis=1)
+    rows = []
+    for row, tool_id in enumerate(ids):
+        if tool_id not in seen:
+            problems.setdefault(tool_id, []).append(f"embedded but not in {TOOLS_FILE}")
+        elif not np.isfinite(norms[row]) or norms[row] == 0:
+            problems.setdefault(tool_id, []).append("embedding is zero or not finite")
+        elif tool_id not in problems:
+            rows.append(row)
+
+    return rows, [seen[ids[row]] for row in rows], problems
+
+# ================= COMPILE =================
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def compile_catalog(
+    tools_file=TOOLS_FILE, embed_file=EMBED_FILE, id_file=ID_FILE,
+    output=SNAPSHOT_FILE, skip_invalid=False
+):
+    with open(tools_file, "r", encoding="utf-8") as f:
+        tools = json.load(f)
+
+    with open(id_file, "r", encoding="utf-8") as f:
+        ids = json.load(f)
+
+    embeddings = np.load(embed_file, mmap_mode="r")
+    if embeddings.ndim != 2 or embeddings.shape[0] != len(ids):
+        raise CatalogError(
+            f"{embed_file} has shape {embeddings.shape} but {id_file} lists {len(ids)} ids"
+        )
+    if len(set(ids)) != len(ids):
+        raise CatalogError(f"{id_file} contains duplicate tool ids")
+
+    rows, row_tools, problems = select_rows(tools, ids, embeddings, load_schema())
+
+    for tool_id, found in problems.items():
+        print(f"⚠️ {tool_id}: {'; '.join(found)}")
+
+    if problems and not skip_invalid:
+        raise CatalogError(f"{len(problems)} invalid tools (--skip-invalid leaves them out)")
+    if not row_tools:
+        raise CatalogError("No valid tools to compile")
+
+    columns = ColumnarCatalog(row_tools)
+    lexical = LexicalIndex(row_tools)
+    keywords = LexicalIndex(row_tools, KEYWORD_FIELDS)
+
+    labels, column_arrays = columns.export()
+    lexical_terms, lexical_arrays = lexical.export()
+    keyword_terms, keyword_arrays = keywords.export()
+
+    arrays = {"embeddings": normalize_rows(embeddings[rows])}
+    arrays |= {f"columns.{name}": array for name, array in column_arrays.items()}
+    arrays |= {f"lexical.{name}": array for name, array in lexical_arrays.items()}
+    arrays |= {f"keywords.{name}": array for name, array in keyword_arrays.items()}
+
+    pools = {
+        "ids": [t["id"] for t in row_tools],
+        "documents": [ToolDocument(t).body for t in row_tools],
+        "payloads": [dumps(tool_payload(t)) for t in row_tools],
+        "terms.lexical": lexical_terms,
+        "terms.keywords": keyword_terms
+    }
+
+    header = {
+        "count": len(row_tools),
+        "dim": int(embeddings.shape[1]),
+        "model": ollama_client.EMBED_MODEL,
+        "built_at": time.time(),
+        "sources": {
+            os.path.basename(path): file_digest(path)
+            for path in (tools_file, id_file, embed_file)
+        },
+        "rejected": sorted(map(str, problems)),
+        "columns": labels,
+        "bm25": {"k1": BM25_K1, "b": BM25_B}
+    }
+
+    return write_catalog(output, header, arrays, pools)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tools", default=TOOLS_FILE)
+    parser.add_argument("--embeddings", default=EMBED_FILE)
+    parser.add_argument("--ids", default=ID_FILE)
+    parser.add_argument("--output", default=SNAPSHOT_FILE)
+    parser.add_argument("--skip-invalid", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        header = compile_catalog(args.tools, args.embeddings, args.ids, args.output, args.skip_invalid)
+    except CatalogError as e:
+        print(f"⚠️ Catalog not compiled: {e}")
+        sys.exit(1)
+
+    print(
+        f"✅ Compiled {header['count']} tools ({len(header['rejected'])} rejected) "
+        f"into {args.output} in {time.perf_counter() - started:.2f}s "
+        f"({os.path.getsize(args.output) / 2 ** 20:.1f} MB, checksum {header['checksum'][:12]})"
+    )
+
+if __name__ == "__main__":
+    main()
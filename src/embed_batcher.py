@@ -0,0 +1,89 @@
+import asyncio
+import contextvars
+
+from src.resilience import remaining, DeadlineExceeded
+
+# ================= MICRO-BATCHING =================
+#
+# Concurrent requests that each need one embedding are collected for up
+# to `window` seconds (or until `max_batch` texts are waiting) and sent as
+# one upstream call. Callers wait on their own future, so each keeps its
+# own request deadline; the upstream call runs outside any request's
+# context and is bounded only by its own timeout.
+
+class AsyncBatcher:
+    def __init__(self, name, call, window, max_batch):
+        # call(texts) -> list of results in the same order
+        self.name = name
+        self.call = call
+        self.window = window
+        self.max_batch = max_batch
+
+        # Batches belong to one event loop
+        self._pending = {}
+
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, text, timeout):
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(id(loop))
+
+        if batch is None:
+            batch = self._pending[id(loop)] = {}
+            loop.call_later(self.window, self._flush, loop, batch)
+
+        future = batch.get(text)
+        if future is None:
+            future = batch[text] = loop.create_future()
+
+        if len(batch) >= self.max_batch:
+            self._flush(loop, batch)
+
+        try:
+            async with asyncio.timeout(remaining(timeout)):
+                return await asyncio.shield(future)
+        except TimeoutError:
+            raise DeadlineExceeded(f"{self.name} batch did not finish in time") from None
+
+    def _flush(self, loop, batch):
+        # Called by the window timer and when the batch fills up; whichever
+        # comes second finds the batch already taken
+        if self._pending.get(id(loop)) is not batch:
+            return
+        del self._pending[id(loop)]
+
+        loop.create_task(self._run(batch), context=contextvars.Context())
+
+    async def _run(self, batch):
+        texts = list(batch)
+        self.batches += 1
+        self.items += len(texts)
+
+        try:
+            results = await self.call(texts)
+            if len(results) != len(texts):
+                raise ValueError(f"{len(texts)} texts sent, {len(results)} results returned")
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Callers that already gave up never read it
+                    future.exception()
+            return
+
+        for text, result in zip(texts, results):
+            future = batch[text]
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
@@ -1,26 +1,10 @@
-ACTION_ALIASES = {
-    "convert": ["convert", "transcribe"],
-    "generate": ["generate", "create"],
-    "summarize": ["summarize"],
-    "analyze": ["analyze"],
-    "translate": ["translate"]
-}
-
-def filter_tools(intent, tools):
-    filtered = []
-    allowed_actions = ACTION_ALIASES.get(intent["action"], [intent["action"]])
-
-    for tool in tools:
-        if tool["domain"] != intent["domain"]:
-            continue
-
-        if not any(a in tool["actions"] for a in allowed_actions):
-            continue
-
-        pricing = intent["constraints"]["pricing"]
-        if pricing != "any" and tool["pricing"] != pricing:
-            continue
-
-        filtered.append(tool)
-
-    return filtered
\ No newline at end of file
+# ================= FILTER =================
+#
+# Filtering itself lives in the catalog's columns (src/columnar.py), built
+# once per snapshot; the action vocabulary is in src/actions.py.
+
+def filter_tools(intent, tools, columns):
+    # Tools matching the intent's domain, any aliased action and its
+    # pricing; columns are the snapshot's (catalog.columns), so their memo
+    # is reused instead of rebuilding them on every call
+    return [tools[row] for row in columns.rows(intent)]
@@ -1,162 +1,309 @@
 import os
-import json
+import asyncio
+import logging
 import numpy as np
-import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 from src.intent_extractor import extract_intent
-from src.prompt_rewriter import rewrite_prompt
-from src.filter_tools import filter_tools
+from src.prompt_rewriter import rewrite_prompt, quick_rewrite, llm_rewrite, llm_rewrite_async
 from src.moderation import is_safe
+from src.catalog import get_snapshot, current_snapshot
+from src import ranking
+from src import ollama_client
+from src.cache import make_cache, normalize_key, MemoryCache
+from src.log_sink import make_sink
+from src.metrics import span, request_timings, register_collector
+from src.prompt_rewriter import PROMPT_CACHE, REWRITE_FLIGHT, REWRITE_FLIGHT_ASYNC
+from src.singleflight import SingleFlight, AsyncSingleFlight
+from src.semantic_cache import make_semantic_cache
+from src.resilience import UpstreamUnavailable, REQUEST_DEADLINE, deadline, propagate, with_deadline
+
+logger = logging.getLogger(__name__)
 
 # ================= PATH SETUP =================
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "..", "data")
 
-TOOLS_FILE = os.path.join(DATA_DIR, "tools_seed.json")
-EMBED_FILE = os.path.join(DATA_DIR, "tool_embeddings.npy")
-ID_FILE = os.path.join(DATA_DIR, "tool_ids.json")
-BAD_PROMPT_LOG = os.path.join(DATA_DIR, "bad_prompts.log")
-FEEDBACK_LOG = os.path.join(DATA_DIR, "user_feedback.jsonl")
+BAD_PROMPT_LOG = os.getenv("BAD_PROMPT_LOG", os.path.join(DATA_DIR, "bad_prompts.log"))
+FEEDBACK_LOG = os.getenv("FEEDBACK_LOG", os.path.join(DATA_DIR, "user_feedback.jsonl"))
 
-OLLAMA_EMBED_URL = "http://localhost:11434/api/embeddings"
+# Buffered, background writers (see src/log_sink.py); one line per bad
+# prompt as before, with repeats within a flush counted on /stats/logs
+BAD_PROMPTS = make_sink(BAD_PROMPT_LOG, count_repeats=True)
+FEEDBACK = make_sink(FEEDBACK_LOG, timestamps=False)
 
-# ================= LOAD DATA =================
+# Concurrent upstream calls used by recommend_tools_batch
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
 
-with open(TOOLS_FILE, "r", encoding="utf-8") as f:
-    tools = json.load(f)
+# Deadline of each batch prompt's rewrite and of each embedding chunk; a
+# batch as a whole has none (its size is capped by the API instead)
+BATCH_ITEM_DEADLINE = float(os.getenv("BATCH_ITEM_DEADLINE", str(REQUEST_DEADLINE)))
 
-tool_map = {t["id"]: t for t in tools}
-tool_embeddings = np.load(EMBED_FILE)
+PROMPT_SUGGESTIONS = [
+    "Convert my voice recording into text",
+    "Create a professional logo for my startup",
+    "Write Python code",
+    "Make Instagram reels automatically",
+    "Summarize a research paper"
+]
 
-with open(ID_FILE, "r", encoding="utf-8") as f:
-    tool_ids = json.load(f)
+FOLLOW_UP_QUESTIONS = [
+    "What output do you want (text, image, audio, video)?",
+    "Is this for personal or professional use?",
+    "Do you prefer free tools only?"
+]
+
+# ================= CATALOG =================
+# Tools, embeddings and lookups live in a versioned snapshot (src/catalog.py)
+# that can be reloaded and swapped without restarting the process.
 
 # ================= CACHE =================
-EMBED_CACHE = {}
+# Bounded LRU/TTL cache keyed on normalized prompt text (see src/cache.py)
+
+def encode_vector(vec) -> bytes:
+    return np.asarray(vec, dtype="float32").tobytes()
+
+def decode_vector(data: bytes):
+    return np.frombuffer(data, dtype="float32").copy()
+
+EMBED_CACHE = make_cache("embed", encode=encode_vector, decode=decode_vector)
+
+CACHE_COUNTERS = ("hits", "misses", "evictions")
+
+def cache_metrics():
+    caches = [("embed", EMBED_CACHE), ("rewrite", PROMPT_CACHE)]
+    if SEMANTIC_CACHE is not None:
+        caches.append(("semantic", SEMANTIC_CACHE))
+
+    lines = []
+    for counter in CACHE_COUNTERS:
+        name = f"cache_{counter}_total"
+        lines.append(f"# TYPE {name} counter")
+        for cache_name, cache in caches:
+            lines.append(f'{name}{{cache="{cache_name}"}} {cache.stats()[counter]}')
+
+    if SEMANTIC_CACHE is not None:
+        stats = SEMANTIC_CACHE.stats()
+        lines.append("# TYPE semantic_cache_verified_total counter")
+        lines.append(f"semantic_cache_verified_total {stats['verified']}")
+        lines.append("# TYPE semantic_cache_false_hits_total counter")
+        lines.append(f"semantic_cache_false_hits_total {stats['false_hits']}")
+    return lines
+
+def flight_metrics():
+    flights = (
+        ("embed", EMBED_FLIGHT), ("embed_async", EMBED_FLIGHT_ASYNC),
+        ("rewrite", REWRITE_FLIGHT), ("rewrite_async", REWRITE_FLIGHT_ASYNC)
+    )
+    lines = ["# TYPE singleflight_shared_total counter"]
+    for name, flight in flights:
+        lines.append(f'singleflight_shared_total{{call="{name}"}} {flight.shared}')
+    return lines
+
+register_collector(cache_metrics)
+register_collector(flight_metrics)
 
 # ================= UTILS =================
+#
+# Identical prompts embedded concurrently share one Ollama call; the
+# fetch functions re-check the cache for callers that just missed one.
 
-def cosine_similarity(matrix, vector):
-    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
-    vector = vector / np.linalg.norm(vector)
-    return np.dot(matrix, vector)
+EMBED_FLIGHT = SingleFlight("embed")
+EMBED_FLIGHT_ASYNC = AsyncSingleFlight("embed")
 
-def embed_prompt(prompt: str):
-    if prompt in EMBED_CACHE:
-        return EMBED_CACHE[prompt]
+def fetch_embedding(prompt: str):
+    cached = EMBED_CACHE.get(prompt)
+    if cached is not None:
+        return cached
 
     try:
-        res = requests.post(
-            OLLAMA_EMBED_URL,
-            json={"model": "nomic-embed-text", "prompt": prompt},
-            timeout=None
-        )
-        res.raise_for_status()
+        emb = ollama_client.embed_sync(prompt)
+        if not emb:
+            return None
+
+        vec = np.array(emb, dtype="float32")
+        EMBED_CACHE.set(prompt, vec)
+        return vec
+
+    except UpstreamUnavailable as e:
+        logger.debug("⏭️ Embedding skipped: %s", e)
+        return None
+
+    except Exception as e:
+        logger.warning("⚠️ Embedding failed: %s", e)
+        return None
+
+async def fetch_embedding_async(prompt: str):
+    cached = EMBED_CACHE.get(prompt)
+    if cached is not None:
+        return cached
 
-        emb = res.json().get("embedding")
+    try:
+        emb = await ollama_client.embed(prompt)
         if not emb:
             return None
 
         vec = np.array(emb, dtype="float32")
-        EMBED_CACHE[prompt] = vec
+        EMBED_CACHE.set(prompt, vec)
         return vec
 
+    except UpstreamUnavailable as e:
+        logger.debug("⏭️ Embedding skipped: %s", e)
+        return None
+
     except Exception as e:
-        print("⚠️ Embedding failed:", e)
+        logger.warning("⚠️ Embedding failed: %s", e)
         return None
 
-# ================= MAIN PIPELINE =================
+def embed_prompt(prompt: str):
+    with span("embed") as labels:
+        cached = EMBED_CACHE.get(prompt)
+        if cached is not None:
+            labels["cache"] = "hit"
+            return cached
+
+        labels["cache"] = "miss"
+        return EMBED_FLIGHT.do(normalize_key(prompt), lambda: fetch_embedding(prompt))
+
+async def embed_prompt_async(prompt: str):
+    with span("embed") as labels:
+        cached = EMBED_CACHE.get(prompt)
+        if cached is not None:
+            labels["cache"] = "hit"
+            return cached
+
+        labels["cache"] = "miss"
+        return await EMBED_FLIGHT_ASYNC.do(
+            normalize_key(prompt), lambda: fetch_embedding_async(prompt)
+        )
 
-def recommend_tools(prompt: str, top_k: int = 5):
-    print("➡️ User prompt:", prompt)
+def fetch_embeddings(prompts):
+    try:
+        embeddings = ollama_client.embed_many_sync(prompts)
+        if len(embeddings) != len(prompts):
+            raise ValueError(f"{len(embeddings)} embeddings for {len(prompts)} prompts")
 
-    # ---------- MODERATION ----------
-    if not is_safe(prompt):
-        return {
-            "original_prompt": prompt,
-            "rewritten_prompt": "",
-            "confidence": 0.0,
-            "confidence_breakdown": {},
-            "needs_followup": True,
-            "warning": "This request contains restricted content.",
-            "tools": []
-        }
+    except UpstreamUnavailable as e:
+        logger.debug("⏭️ Embedding skipped: %s", e)
+        return [None] * len(prompts)
 
-    # ---------- PROMPT REWRITE ----------
-    rewritten = rewrite_prompt(prompt)
-    rewrite_failed = rewritten.strip().lower() == prompt.strip().lower()
-    print("✏️ Rewritten prompt:", rewritten)
+    except Exception as e:
+        logger.warning("⚠️ Embedding failed: %s", e)
+        return [None] * len(prompts)
+
+    vectors = []
+    for prompt, emb in zip(prompts, embeddings):
+        vec = np.array(emb, dtype="float32") if emb else None
+        if vec is not None:
+            EMBED_CACHE.set(prompt, vec)
+        vectors.append(vec)
+    return vectors
+
+def embed_prompts(prompts):
+    # Cache hits return immediately; misses go upstream in chunks of
+    # OLLAMA_EMBED_BATCH_MAX, one /api/embed call per chunk
+    unique = list(dict.fromkeys(prompts))
+    vectors = {p: EMBED_CACHE.get(p) for p in unique}
+
+    missing = [p for p, vec in vectors.items() if vec is None]
+    size = ollama_client.EMBED_BATCH_MAX
+    chunks = [missing[i:i + size] for i in range(0, len(missing), size)]
+
+    with span("embed", mode="batch"):
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+            fetch = propagate(with_deadline(fetch_embeddings, BATCH_ITEM_DEADLINE))
+            for chunk, embedded in zip(chunks, pool.map(fetch, chunks)):
+                vectors.update(zip(chunk, embedded))
+
+    return [vectors[p] for p in prompts]
+
+# ================= PIPELINE STAGES =================
+
+def blocked_response(prompt: str):
+    return {
+        "original_prompt": prompt,
+        "rewritten_prompt": "",
+        "confidence": 0.0,
+        "confidence_breakdown": {},
+        "needs_followup": True,
+        "warning": "This request contains restricted content.",
+        "tools": []
+    }
 
-    # ---------- INTENT ----------
-    intent = extract_intent(rewritten)
+def check_safe(prompt: str):
+    with span("moderation"):
+        return is_safe(prompt)
 
-    # ---------- TOOL FILTER ----------
-    filtered = filter_tools(intent, tools)
-    fallback_used = False
+def classify(rewritten: str):
+    with span("intent"):
+        return extract_intent(rewritten)
 
-    if not filtered:
-        filtered = tools
-        fallback_used = True
+def select_rows(catalog, intent):
+    with span("filter"):
+        rows = catalog.columns.rows(intent)
 
-    filtered_ids = {t["id"] for t in filtered}
+    # Nothing matched the intent: fall back to the whole catalog
+    if len(rows) == 0:
+        return None, True
 
-    # ---------- EMBEDDINGS ----------
-    query_vec = embed_prompt(rewritten)
-
-    results = []
-    semantic_score = 0.0
-
-    if query_vec is not None:
-        scores = cosine_similarity(tool_embeddings, query_vec)
-        ranked = np.argsort(scores)[::-1]
-
-        for idx in ranked:
-            tool_id = tool_ids[idx]
-            if tool_id in filtered_ids:
-                tool = tool_map[tool_id]
-
-                score = float(scores[idx])
-                score = max(0.0, min(score, 1.0))  # hard clamp
-
-                results.append({
-                    "id": tool["id"],
-                    "name": tool["name"],
-                    "description": tool.get("description", ""),
-                    "domain": tool["domain"],
-                    "actions": tool.get("actions", []),
-                    "use_cases": tool.get("use_cases", []),
-                    "pricing": tool.get("pricing", "N/A"),
-                    "api_available": tool.get("api_available", False),
-                    "website": tool.get("website"),
-                    "tags": tool.get("tags", []),
-                    "score": round(score, 3)
-                })
-
-            if len(results) == top_k:
-                break
-
-        semantic_score = results[0]["score"] if results else 0.0
+    return rows, False
 
+def search(catalog, query_vec, text, intent, top_k, rows):
+    # -> (hits, best cosine), see fuse
+    depth = ranking.candidate_depth(top_k)
+
+    # Without a query embedding, rank the same rows with BM25 instead of
+    # returning them unranked
+    if query_vec is None:
+        with span("scoring", mode="lexical"):
+            hits = catalog.lexical.search(text, depth, rows)
     else:
-        results = [
-            {
-                "id": t["id"],
-                "name": t["name"],
-                "description": t.get("description", ""),
-                "domain": t["domain"],
-                "actions": t.get("actions", []),
-                "use_cases": t.get("use_cases", []),
-                "pricing": t.get("pricing", "N/A"),
-                "api_available": t.get("api_available", False),
-                "website": t.get("website"),
-                "tags": t.get("tags", []),
-                "score": 0.0
-            }
-            for t in filtered[:top_k]
-        ]
+        with span("scoring"):
+            # Only the filtered rows are scored and partitioned
+            hits = catalog.vectors.search(query_vec, depth, rows)
+
+    return fuse(catalog, text, intent, hits, top_k, query_vec is None)
+
+def fuse(catalog, text, intent, hits, top_k, lexical_semantic=False):
+    # -> (top_k hits in fused order, best cosine among all candidates).
+    # Confidence reads that best cosine before fusion re-orders and cuts
+    # the candidates, never the fused score; BM25 scores count as 0.
+    best = 0.0
+    if not lexical_semantic and hits is not None and len(hits[1]):
+        best = clamp_score(np.max(hits[1]))
+
+    with span("ranking"):
+        return ranking.rank(catalog, text, intent, hits, top_k, lexical_semantic), best
+
+def clamp_score(score):
+    return round(max(0.0, min(float(score), 1.0)), 3)
+
+def ranked_results(catalog, top, top_scores, rank_scores=None):
+    payloads = catalog.payloads
 
+    if rank_scores is None:
+        return [payloads[idx].result(clamp_score(score)) for idx, score in zip(top, top_scores)]
+
+    return [
+        payloads[idx].result(clamp_score(score), clamp_score(rank_score))
+        for idx, score, rank_score in zip(top, top_scores, rank_scores)
+    ]
+
+def unranked_results(catalog, rows, top_k):
+    payloads = catalog.payloads
+    candidates = payloads[:top_k] if rows is None else [payloads[i] for i in rows[:top_k]]
+    return [p.result(0.0) for p in candidates]
+
+def log_bad_prompt(prompt: str):
+    with span("log"):
+        BAD_PROMPTS.write(prompt)
+
+def should_log(fallback_used, needs_followup, prompt, rewritten):
+    rewrite_failed = rewritten.strip().lower() == prompt.strip().lower()
+    return fallback_used or needs_followup or rewrite_failed
+
+def build_response(prompt, rewritten, intent, fallback_used, results, semantic_score=0.0):
     # ---------- CONFIDENCE BREAKDOWN ----------
     intent_score = 1.0 if intent.get("action") else 0.4
     domain_score = 0.9 if intent.get("domain") else 0.5
@@ -179,21 +326,15 @@ def recommend_tools(prompt: str, top_k: int = 5):
     needs_followup = confidence < 40
 
     if needs_followup:
-        follow_up_questions = [
-            "What output do you want (text, image, audio, video)?",
-            "Is this for personal or professional use?",
-            "Do you prefer free tools only?"
-        ]
+        follow_up_questions = list(FOLLOW_UP_QUESTIONS)
 
     # ---------- LOG BAD PROMPTS ----------
-    if fallback_used or needs_followup or rewrite_failed:
-        with open(BAD_PROMPT_LOG, "a", encoding="utf-8") as f:
-            f.write(f"{datetime.utcnow().isoformat()} | {prompt}\n")
-
-    print(
-        f"📊 Confidence: {confidence}% | "
-        f"Semantic: {confidence_breakdown['semantic_similarity']} | "
-        f"Fallback: {fallback_used}"
+    if should_log(fallback_used, needs_followup, prompt, rewritten):
+        log_bad_prompt(prompt)
+
+    logger.debug(
+        "📊 Confidence: %s%% | Semantic: %s | Fallback: %s",
+        confidence, confidence_breakdown["semantic_similarity"], fallback_used
     )
 
     return {
@@ -205,12 +346,316 @@ def recommend_tools(prompt: str, top_k: int = 5):
         "needs_followup": needs_followup,
         "follow_up_questions": follow_up_questions,
         "fallback_used": fallback_used,
-        "prompt_suggestions": [
-            "Convert my voice recording into text",
-            "Create a professional logo for my startup",
-            "Write Python code",
-            "Make Instagram reels automatically",
-            "Summarize a research paper"
-        ],
+        "prompt_suggestions": list(PROMPT_SUGGESTIONS),
         "tools": results
-    }
\ No newline at end of file
+    }
+
+def finish(prompt, rewritten, intent, fallback_used, catalog, hits, rows, top_k, semantic_score=0.0):
+    with span("results"):
+        if hits is not None:
+            results = ranked_results(catalog, *hits)
+        else:
+            results = unranked_results(catalog, rows, top_k)
+
+        return build_response(prompt, rewritten, intent, fallback_used, results, semantic_score)
+
+# ================= RESULT CACHE =================
+#
+# Finished responses for (catalog version, prompt, top_k), kept briefly so
+# a burst of the same prompt runs the pipeline once. 0 disables it.
+
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "30"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2048"))
+
+RESULT_CACHE = (
+    MemoryCache(max_entries=RESULT_CACHE_MAX_ENTRIES, ttl=RESULT_CACHE_TTL)
+    if RESULT_CACHE_TTL > 0 else None
+)
+
+def result_key(catalog, prompt, top_k):
+    return f"{catalog.version}|{top_k}|{prompt}"
+
+def cached_result(key, prompt):
+    if RESULT_CACHE is None:
+        return None
+
+    with span("result_cache") as labels:
+        response = RESULT_CACHE.get(key)
+        labels["cache"] = "miss" if response is None else "hit"
+
+    if response is None:
+        return None
+
+    return replay(response, prompt)
+
+def replay(response, prompt):
+    # Bad prompts are still logged once per request, not once per TTL
+    if should_log(
+        response["fallback_used"], response["needs_followup"],
+        prompt, response["rewritten_prompt"]
+    ):
+        log_bad_prompt(prompt)
+
+    return dict(response, original_prompt=prompt)
+
+def store_result(key, response):
+    if RESULT_CACHE is not None:
+        # Stored as a copy: callers may add keys (e.g. timings) to theirs
+        RESULT_CACHE.set(key, dict(response))
+    return response
+
+# ================= SEMANTIC CACHE =================
+#
+# Near-duplicate prompts that would need an LLM rewrite reuse the response
+# of an earlier prompt whose embedding is within SEMANTIC_CACHE_THRESHOLD
+# (see src/semantic_cache.py). Checked after the exact caches and rules.
+#
+# Entries are scoped by the rule-based intent of the raw prompt as well:
+# "free logo maker" and "paid logo maker" embed close together but must
+# not share a response.
+
+SEMANTIC_CACHE = make_semantic_cache()
+
+def semantic_scope(catalog, top_k, prompt):
+    intent = extract_intent(prompt)
+    return (
+        catalog.version, top_k,
+        intent["domain"], intent["action"], intent["constraints"]["pricing"]
+    )
+
+def similar_result(catalog, prompt, top_k, vec):
+    if SEMANTIC_CACHE is None or vec is None:
+        return None
+
+    with span("semantic_cache") as labels:
+        found = SEMANTIC_CACHE.lookup(semantic_scope(catalog, top_k, prompt), vec)
+        labels["cache"] = "miss" if found is None else "hit"
+
+    if found is None:
+        return None
+
+    response, similarity = found
+    logger.debug(
+        "♻️ Semantic cache hit (%.3f): %s ~ %s",
+        similarity, prompt, response["original_prompt"]
+    )
+    return response
+
+def remember(catalog, top_k, vec, response, similar):
+    if SEMANTIC_CACHE is None or vec is None:
+        return
+
+    if similar is None:
+        scope = semantic_scope(catalog, top_k, response["original_prompt"])
+        SEMANTIC_CACHE.store(scope, vec, dict(response))
+    elif not SEMANTIC_CACHE.record_verification(similar, response):
+        logger.info(
+            "⚠️ Semantic cache false hit: %s ~ %s",
+            response["original_prompt"], similar["original_prompt"]
+        )
+
+# ================= MAIN PIPELINE =================
+
+def recommend_tools(prompt: str, top_k: int = 5, debug: bool = False):
+    with request_timings(debug) as timings, deadline():
+        with span("total"):
+            response = run_pipeline(prompt, top_k)
+
+    if timings is not None:
+        response["timings"] = timings
+    return response
+
+def run_pipeline(prompt: str, top_k: int):
+    logger.debug("➡️ User prompt: %s", prompt)
+    catalog = get_snapshot()
+
+    # ---------- MODERATION ----------
+    if not check_safe(prompt):
+        return blocked_response(prompt)
+
+    # ---------- RESULT CACHE ----------
+    key = result_key(catalog, prompt, top_k)
+    cached = cached_result(key, prompt)
+    if cached is not None:
+        return cached
+
+    # ---------- PROMPT REWRITE ----------
+    original_vec = similar = None
+
+    with span("rewrite") as labels:
+        rewritten = quick_rewrite(prompt, labels)
+
+        if rewritten is None:
+            # ---------- SEMANTIC CACHE ----------
+            if SEMANTIC_CACHE is not None:
+                original_vec = embed_prompt(prompt)
+                similar = similar_result(catalog, prompt, top_k, original_vec)
+
+                if similar is not None and not SEMANTIC_CACHE.should_verify():
+                    labels["path"] = "semantic"
+                    return store_result(key, replay(similar, prompt))
+
+            labels["path"] = "llm"
+            rewritten = llm_rewrite(prompt)
+
+    logger.debug("✏️ Rewritten prompt: %s", rewritten)
+
+    # ---------- INTENT ----------
+    intent = classify(rewritten)
+
+    # ---------- TOOL FILTER ----------
+    rows, fallback_used = select_rows(catalog, intent)
+
+    # ---------- EMBEDDINGS ----------
+    if original_vec is not None and rewritten == prompt:
+        query_vec = original_vec
+    else:
+        query_vec = embed_prompt(rewritten)
+
+    hits, semantic_score = search(catalog, query_vec, rewritten, intent, top_k, rows)
+
+    response = finish(
+        prompt, rewritten, intent, fallback_used, catalog, hits, rows, top_k, semantic_score
+    )
+    remember(catalog, top_k, original_vec, response, similar)
+    return store_result(key, response)
+
+# ================= ASYNC PIPELINE =================
+
+async def recommend_tools_async(prompt: str, top_k: int = 5, debug: bool = False):
+    with request_timings(debug) as timings, deadline():
+        with span("total"):
+            response = await run_pipeline_async(prompt, top_k)
+
+    if timings is not None:
+        response["timings"] = timings
+    return response
+
+async def run_pipeline_async(prompt: str, top_k: int):
+    logger.debug("➡️ User prompt: %s", prompt)
+    # get_snapshot() would block the event loop while the first load runs
+    catalog = current_snapshot() or await asyncio.to_thread(get_snapshot)
+
+    # ---------- MODERATION ----------
+    if not check_safe(prompt):
+        return blocked_response(prompt)
+
+    # ---------- RESULT CACHE ----------
+    key = result_key(catalog, prompt, top_k)
+    cached = cached_result(key, prompt)
+    if cached is not None:
+        return cached
+
+    # ---------- PROMPT REWRITE ----------
+    original_embedding = original_vec = similar = None
+
+    with span("rewrite") as labels:
+        rewritten = quick_rewrite(prompt, labels)
+
+        if rewritten is None:
+            # The original embedding (semantic cache key, and the query
+            # vector if the rewrite falls back to the prompt) and the LLM
+            # rewrite run concurrently; a semantic hit cancels the rewrite
+            original_embedding = asyncio.create_task(embed_prompt_async(prompt))
+            rewrite = asyncio.create_task(llm_rewrite_async(prompt))
+
+            try:
+                # ---------- SEMANTIC CACHE ----------
+                if SEMANTIC_CACHE is not None:
+                    original_vec = await original_embedding
+                    similar = similar_result(catalog, prompt, top_k, original_vec)
+
+                    if similar is not None and not SEMANTIC_CACHE.should_verify():
+                        rewrite.cancel()
+                        labels["path"] = "semantic"
+                        return store_result(key, replay(similar, prompt))
+
+                labels["path"] = "llm"
+                rewritten = await rewrite
+            except BaseException:
+                rewrite.cancel()
+                original_embedding.cancel()
+                raise
+
+    logger.debug("✏️ Rewritten prompt: %s", rewritten)
+
+    # ---------- INTENT ----------
+    intent = classify(rewritten)
+
+    # ---------- TOOL FILTER ----------
+    # Filtering, scoring, ranking and the response build are CPU work: they
+    # run on the default thread pool (context copied, so spans and the
+    # deadline still apply) and the loop keeps serving other requests
+    rows, fallback_used = await asyncio.to_thread(select_rows, catalog, intent)
+
+    # ---------- EMBEDDINGS ----------
+    if original_embedding is not None and rewritten == prompt:
+        query_vec = await original_embedding
+    else:
+        if original_embedding is not None:
+            original_embedding.cancel()
+        query_vec = await embed_prompt_async(rewritten)
+
+    hits, semantic_score = await asyncio.to_thread(
+        search, catalog, query_vec, rewritten, intent, top_k, rows
+    )
+
+    response = await asyncio.to_thread(
+        finish, prompt, rewritten, intent, fallback_used, catalog, hits, rows, top_k, semantic_score
+    )
+    remember(catalog, top_k, original_vec, response, similar)
+    return store_result(key, response)
+
+# ================= BATCH PIPELINE =================
+
+def recommend_tools_batch(prompts, top_k: int = 5):
+    # No batch-wide deadline: later prompts would only get what the earlier
+    # ones left over. Each rewrite and embedding chunk has its own instead.
+    return run_batch(prompts, top_k)
+
+def run_batch(prompts, top_k: int):
+    unique = list(dict.fromkeys(prompts))
+    logger.debug("➡️ Batch of %d prompts (%d unique)", len(prompts), len(unique))
+    catalog = get_snapshot()
+
+    responses = {p: blocked_response(p) for p in unique if not check_safe(p)}
+    pending = [p for p in unique if p not in responses]
+
+    # ---------- PROMPT REWRITE ----------
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        rewrite = propagate(with_deadline(rewrite_prompt, BATCH_ITEM_DEADLINE))
+        rewrites = list(pool.map(rewrite, pending))
+
+    # ---------- INTENT + FILTER ----------
+    intents = [classify(r) for r in rewrites]
+    selections = [select_rows(catalog, intent) for intent in intents]
+
+    # ---------- EMBEDDINGS ----------
+    vectors = embed_prompts(rewrites)
+    embedded = [i for i, vec in enumerate(vectors) if vec is not None]
+
+    ranked = {}
+    if embedded:
+        # One matrix-matrix product scores every embedded prompt at once
+        with span("scoring", mode="batch"):
+            hits = catalog.vectors.search_batch(
+                np.vstack([vectors[i] for i in embedded]),
+                ranking.candidate_depth(top_k),
+                [selections[i][0] for i in embedded]
+            )
+        for i, h in zip(embedded, hits):
+            ranked[i] = fuse(catalog, rewrites[i], intents[i], h, top_k)
+
+    for i in range(len(pending)):
+        if i not in ranked:
+            ranked[i] = search(catalog, None, rewrites[i], intents[i], top_k, selections[i][0])
+
+    for i, prompt in enumerate(pending):
+        rows, fallback_used = selections[i]
+        hits, semantic_score = ranked[i]
+        responses[prompt] = finish(
+            prompt, rewrites[i], intents[i], fallback_used,
+            catalog, hits, rows, top_k, semantic_score
+        )
+
+    return [responses[p] for p in prompts]
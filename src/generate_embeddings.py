@@ -1,12 +1,24 @@
 import os
 import json
+import time
+import hashlib
+import httpx
 import numpy as np
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from src import ollama_client
+from src.tool_index import write_index
 
 # ================= CONFIG =================
+#
+# Run from the repository root:  python -m src.generate_embeddings
+#
+# Builds are incremental: each tool's embed text is hashed together with
+# the model name, and only new or changed tools are sent to Ollama.
 
-OLLAMA_EMBED_URL = "http://localhost:11434/api/embeddings"
-EMBED_MODEL = "nomic-embed-text"
+# Batches go through ollama_client.embed_many_sync (one /api/embed call
+# per batch), so builds share the API's Ollama URL, limiter and breaker
+EMBED_MODEL = ollama_client.EMBED_MODEL
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "..", "data")
@@ -14,58 +26,160 @@ DATA_DIR = os.path.join(BASE_DIR, "..", "data")
 TOOLS_FILE = os.path.join(DATA_DIR, "tools_seed.json")
 EMBED_FILE = os.path.join(DATA_DIR, "tool_embeddings.npy")
 ID_FILE = os.path.join(DATA_DIR, "tool_ids.json")
+INDEX_FILE = os.path.join(DATA_DIR, "tool_index.bin")
+MANIFEST_FILE = os.path.join(DATA_DIR, "tool_embeddings.manifest.json")
+
+BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "16"))
+WORKERS = int(os.getenv("EMBED_WORKERS", "4"))
+REQUEST_TIMEOUT = float(os.getenv("EMBED_REQUEST_TIMEOUT", "120"))
 
-os.makedirs(DATA_DIR, exist_ok=True)
+# Attempts per batch; only transient failures (connection errors,
+# timeouts, 5xx) are retried, with 2, 4, ... seconds between attempts
+MAX_RETRIES = 3
 
 # ================= LOAD TOOLS =================
 
-with open(TOOLS_FILE, "r", encoding="utf-8") as f:
-    tools = json.load(f)
+def load_tools(path=TOOLS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def tool_text(tool):
+    return f"""
+    {tool['name']}.
+    {tool.get('description', '')}.
+    Domain: {tool['domain']}.
+    Actions: {', '.join(tool['actions'])}.
+    Use cases: {', '.join(tool['use_cases'])}.
+    Tags: {', '.join(tool.get('tags', []))}.
+    """
 
-print(f"🔧 Loaded {len(tools)} tools")
+def content_hash(text: str, model: str = EMBED_MODEL):
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
 
 # ================= EMBEDDING FUNCTION =================
 
+def transient(error):
+    if isinstance(error, httpx.TransportError):
+        return True
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code >= 500
+
+def embed_batch(texts):
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            embeddings = ollama_client.embed_many_sync(texts, timeout=REQUEST_TIMEOUT)
+            break
+        except Exception as e:
+            if attempt == MAX_RETRIES or not transient(e):
+                raise
+            print(f"⚠️ Embedding failed (attempt {attempt}/{MAX_RETRIES}):", e)
+            time.sleep(2 ** attempt)
+
+    if len(embeddings) != len(texts):
+        raise ValueError(f"{len(embeddings)} embeddings for {len(texts)} texts")
+    return embeddings
+
 def embed_text(text: str):
-    response = requests.post(
-        OLLAMA_EMBED_URL,
-        json={
-            "model": EMBED_MODEL,
-            "prompt": text
-        },
-        timeout=30
+    return embed_batch([text])[0]
+
+# ================= PREVIOUS BUILD =================
+
+def load_previous():
+    # id -> (hash, vector) from the last build, if it left a manifest
+    if not all(os.path.exists(p) for p in (EMBED_FILE, ID_FILE, MANIFEST_FILE)):
+        return {}
+
+    embeddings = np.load(EMBED_FILE)
+
+    with open(ID_FILE, "r", encoding="utf-8") as f:
+        ids = json.load(f)
+
+    with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+        hashes = json.load(f).get("hashes", {})
+
+    if len(ids) != len(embeddings):
+        print("⚠️ Previous embeddings and ids disagree, rebuilding everything")
+        return {}
+
+    return {
+        tool_id: (hashes[tool_id], embeddings[row])
+        for row, tool_id in enumerate(ids)
+        if tool_id in hashes
+    }
+
+# ================= SAVE =================
+
+def atomic_write(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def save(embeddings, tool_ids, hashes, model=EMBED_MODEL):
+    atomic_write(EMBED_FILE, lambda f: np.save(f, embeddings))
+    atomic_write(
+        ID_FILE,
+        lambda f: f.write(json.dumps(tool_ids, indent=2).encode("utf-8"))
+    )
+    atomic_write(
+        MANIFEST_FILE,
+        lambda f: f.write(json.dumps({"model": model, "hashes": hashes}, indent=2).encode("utf-8"))
     )
-    response.raise_for_status()
-    return response.json()["embedding"]
+
+    # Normalized, memory-mappable copy used by the API at serve time
+    write_index(INDEX_FILE, embeddings, tool_ids, model=model)
 
 # ================= GENERATE =================
 
-embeddings = []
-tool_ids = []
+def build_embeddings(tools, text_fn=tool_text, model=EMBED_MODEL):
+    previous = load_previous()
 
-for tool in tools:
-    text = f"""
-    {tool['name']}.
-    {tool.get('description', '')}.
-    Domain: {tool['domain']}.
-    Actions: {', '.join(tool['actions'])}.
-    Use cases: {', '.join(tool['use_cases'])}.
-    Tags: {', '.join(tool.get('tags', []))}.
-    """
+    tool_ids = [tool["id"] for tool in tools]
+    texts = [text_fn(tool) for tool in tools]
+    hashes = {tid: content_hash(text, model) for tid, text in zip(tool_ids, texts)}
 
-    print(f"🧠 Embedding: {tool['name']}")
+    vectors = {}
+    todo = []
 
-    emb = embed_text(text)
-    embeddings.append(emb)
-    tool_ids.append(tool["id"])
+    for tool_id, text in zip(tool_ids, texts):
+        prev = previous.get(tool_id)
+        if prev is not None and prev[0] == hashes[tool_id]:
+            vectors[tool_id] = prev[1]
+        else:
+            todo.append((tool_id, text))
 
-# ================= SAVE =================
+    removed = len(set(previous) - set(tool_ids))
+    print(
+        f"🔧 {len(tools)} tools: {len(vectors)} unchanged, "
+        f"{len(todo)} to embed, {removed} removed"
+    )
+
+    batches = [todo[i:i + BATCH_SIZE] for i in range(0, len(todo), BATCH_SIZE)]
+
+    def run(batch):
+        return batch, embed_batch([text for _, text in batch])
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        for done, (batch, embedded) in enumerate(pool.map(run, batches), start=1):
+            for (tool_id, _), emb in zip(batch, embedded):
+                vectors[tool_id] = np.asarray(emb, dtype="float32")
+            print(f"🧠 Batch {done}/{len(batches)} embedded")
+
+    embeddings = np.vstack([vectors[tool_id] for tool_id in tool_ids]).astype("float32")
+    save(embeddings, tool_ids, hashes, model)
+    return embeddings, tool_ids
+
+def main():
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    tools = load_tools()
+    print(f"🔧 Loaded {len(tools)} tools")
 
-np.save(EMBED_FILE, np.array(embeddings, dtype="float32"))
+    build_embeddings(tools)
 
-with open(ID_FILE, "w", encoding="utf-8") as f:
-    json.dump(tool_ids, f, indent=2)
+    print("✅ Embeddings generated successfully")
+    print("📁 tool_embeddings.npy updated")
+    print("📁 tool_ids.json updated")
+    print("📁 tool_index.bin updated")
 
-print("✅ Embeddings generated successfully")
-print("📁 tool_embeddings.npy updated")
-print("📁 tool_ids.json updated")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,22 @@
+from src.keywords import (
+    DOMAIN_KEYWORDS, DEFAULT_DOMAIN, DOMAIN_TYPES,
+    ACTION_KEYWORDS, DEFAULT_ACTION,
+    PRICING_KEYWORDS, DEFAULT_PRICING
+)
+from src.keyword_matcher import scan, first_match
+
 def extract_intent(prompt: str):
-    p = prompt.lower()
+    labels = scan(prompt)
 
     # ---------- DOMAIN ----------
-    if any(w in p for w in [
-        "logo", "image", "photo", "design", "art", "poster",
-        "banner", "thumbnail", "illustration", "graphic", "branding"
-    ]):
-        domain = "Image"
-        input_type = "text"
-        output_type = "image"
-
-    elif any(w in p for w in [
-        "video", "reel", "clip", "movie", "animation",
-        "short", "youtube", "instagram"
-    ]):
-        domain = "Video"
-        input_type = "text"
-        output_type = "video"
-
-    elif any(w in p for w in [
-        "audio", "voice", "speech", "song", "music",
-        "podcast", "narration"
-    ]):
-        domain = "Audio"
-        input_type = "text"
-        output_type = "audio"
-
-    elif any(w in p for w in [
-        "code", "coding", "program", "python", "java",
-        "javascript", "website", "app", "software", "api"
-    ]):
-        domain = "Code"
-        input_type = "text"
-        output_type = "code"
-
-    else:
-        domain = "Text"
-        input_type = "text"
-        output_type = "text"
+    domain = first_match(DOMAIN_KEYWORDS, "domain", labels, DEFAULT_DOMAIN)
+    input_type, output_type = DOMAIN_TYPES[domain]
 
     # ---------- ACTION ----------
-    if any(w in p for w in ["summarize", "summary", "shorten"]):
-        action = "summarize"
-    elif any(w in p for w in ["analyze", "analysis", "explain", "review"]):
-        action = "analyze"
-    elif any(w in p for w in ["translate"]):
-        action = "translate"
-    elif any(w in p for w in [
-        "convert", "transcribe", "speech to text", "audio to text"
-    ]):
-        action = "convert"
-    else:
-        action = "generate"
+    action = first_match(ACTION_KEYWORDS, "action", labels, DEFAULT_ACTION)
 
     # ---------- PRICING ----------
-    if "free" in p:
-        pricing = "free"
-    elif "paid" in p or "premium" in p:
-        pricing = "paid"
-    else:
-        pricing = "any"
+    pricing = first_match(PRICING_KEYWORDS, "pricing", labels, DEFAULT_PRICING)
 
     return {
         "domain": domain,
@@ -68,4 +25,4 @@ def extract_intent(prompt: str):
         "output_type": output_type,
         "use_case": prompt,
         "constraints": {"pricing": pricing}
-    }
\ No newline at end of file
+    }
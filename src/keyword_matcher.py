@@ -0,0 +1,151 @@
+import re
+from functools import lru_cache
+
+from src.keywords import (
+    DOMAIN_KEYWORDS,
+    ACTION_KEYWORDS,
+    PRICING_KEYWORDS,
+    BANNED_KEYWORDS,
+    REWRITE_RULES
+)
+
+# ================= LABELS =================
+#
+# Every keyword maps to the labels it switches on:
+#   ("domain", "Image"), ("action", "summarize"), ("pricing", "free"),
+#   ("banned",) and ("rule", rule_index, group_index)
+
+BANNED = ("banned",)
+
+# Per-process bound on the token -> labels memo
+MAX_MEMO_TOKENS = 50000
+
+def keyword_labels():
+    table = {}
+
+    def add(words, label):
+        for word in words:
+            table.setdefault(word, set()).add(label)
+
+    for domain, words in DOMAIN_KEYWORDS:
+        add(words, ("domain", domain))
+    for action, words in ACTION_KEYWORDS:
+        add(words, ("action", action))
+    for pricing, words in PRICING_KEYWORDS:
+        add(words, ("pricing", pricing))
+
+    add(BANNED_KEYWORDS, BANNED)
+
+    for i, (groups, _) in enumerate(REWRITE_RULES):
+        for g, words in enumerate(groups):
+            add(words, ("rule", i, g))
+
+    return table
+
+def trie_pattern(words):
+    # Nested alternation sharing common prefixes; a greedy optional tail
+    # makes the longest keyword at a position win
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node):
+        alts = [re.escape(ch) + render(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+def sequence_pattern(groups):
+    return re.compile(
+        ".*?".join("(" + "|".join(map(re.escape, words)) + ")" for words in groups)
+    )
+
+# ================= MATCHER =================
+
+class KeywordMatcher:
+    # A keyword without whitespace can only occur inside one whitespace
+    # separated token, so the automaton runs once per distinct token and
+    # the result is memoized. Multi-word keywords are checked on the text.
+
+    def __init__(self, table):
+        words = [w for w in table if not any(ch.isspace() for ch in w)]
+        self.phrases = [
+            (w, frozenset(labels)) for w, labels in table.items()
+            if any(ch.isspace() for ch in w)
+        ]
+
+        # The automaton reports the longest keyword at each position; every
+        # other keyword starting there is one of its prefixes
+        self.closure = {
+            w: frozenset().union(*(table[p] for p in words if w.startswith(p)))
+            for w in words
+        }
+        self.pattern = re.compile("(?=(" + trie_pattern(words) + "))")
+        self.memo = {}
+
+    def token_labels(self, token):
+        labels = self.memo.get(token)
+        if labels is None:
+            labels = frozenset().union(
+                *(self.closure[m.group(1)] for m in self.pattern.finditer(token))
+            )
+            if len(self.memo) >= MAX_MEMO_TOKENS:
+                self.memo.clear()
+            self.memo[token] = labels
+        return labels
+
+    def scan(self, text: str):
+        p = text.lower()
+        labels = set()
+
+        for token in set(p.split()):
+            labels |= self.token_labels(token)
+
+        for phrase, phrase_labels in self.phrases:
+            if phrase in p:
+                labels |= phrase_labels
+
+        return frozenset(labels)
+
+MATCHER = KeywordMatcher(keyword_labels())
+
+# Rules with more than one group also need their order checked
+RULE_SEQUENCES = {
+    i: sequence_pattern(groups)
+    for i, (groups, _) in enumerate(REWRITE_RULES)
+    if len(groups) > 1
+}
+
+# ================= CLASSIFIERS =================
+
+@lru_cache(maxsize=1024)
+def scan(text: str):
+    # Moderation, rule rewrite and intent all read the same labels, so a
+    # given text is only scanned once
+    return MATCHER.scan(text)
+
+def first_match(table, kind, labels, default):
+    return next(
+        (name for name, _ in table if (kind, name) in labels),
+        default
+    )
+
+def is_banned(text: str) -> bool:
+    return BANNED in scan(text)
+
+def match_rule(text: str):
+    labels = scan(text)
+
+    for i, (groups, normalized) in enumerate(REWRITE_RULES):
+        if all(("rule", i, g) in labels for g in range(len(groups))):
+            sequence = RULE_SEQUENCES.get(i)
+            if sequence is None or sequence.search(text.lower()):
+                return normalized
+
+    return None
@@ -0,0 +1,105 @@
+# ================= KEYWORD TABLES =================
+#
+# Single source for every substring keyword the pipeline looks for.
+# Tables are ordered: the first entry that matches wins, exactly as the
+# original if/elif chains did. They are compiled once into the matcher
+# in src/keyword_matcher.py.
+
+# ---------- INTENT: DOMAIN ----------
+DOMAIN_KEYWORDS = [
+    ("Image", [
+        "logo", "image", "photo", "design", "art", "poster",
+        "banner", "thumbnail", "illustration", "graphic", "branding"
+    ]),
+    ("Video", [
+        "video", "reel", "clip", "movie", "animation",
+        "short", "youtube", "instagram"
+    ]),
+    ("Audio", [
+        "audio", "voice", "speech", "song", "music",
+        "podcast", "narration"
+    ]),
+    ("Code", [
+        "code", "coding", "program", "python", "java",
+        "javascript", "website", "app", "software", "api"
+    ])
+]
+DEFAULT_DOMAIN = "Text"
+
+# (input_type, output_type) per domain
+DOMAIN_TYPES = {
+    "Image": ("text", "image"),
+    "Video": ("text", "video"),
+    "Audio": ("text", "audio"),
+    "Code": ("text", "code"),
+    "Text": ("text", "text")
+}
+
+# ---------- INTENT: ACTION ----------
+ACTION_KEYWORDS = [
+    ("summarize", ["summarize", "summary", "shorten"]),
+    ("analyze", ["analyze", "analysis", "explain", "review"]),
+    ("translate", ["translate"]),
+    ("convert", [
+        "convert", "transcribe", "speech to text", "audio to text"
+    ])
+]
+DEFAULT_ACTION = "generate"
+
+# ---------- INTENT: PRICING ----------
+PRICING_KEYWORDS = [
+    ("free", ["free"]),
+    ("paid", ["paid", "premium"])
+]
+DEFAULT_PRICING = "any"
+
+# ---------- MODERATION ----------
+BANNED_KEYWORDS = [
+    "hack", "crack", "piracy", "illegal",
+    "porn", "nsfw", "sexual", "violence",
+    "drugs", "weapon", "bomb"
+]
+
+# ---------- RULE-BASED REWRITE ----------
+# Each rule is a sequence of keyword groups that must appear in order on
+# one line (a single group just has to appear), plus its normalized prompt.
+REWRITE_RULES = [
+    # AUDIO / SPEECH → TEXT (English, Hindi, Hinglish)
+    (
+        [
+            ["awaaz", "voice", "audio", "speech", "bol"],
+            ["text", "likh", "likho", "text mein", "words"]
+        ],
+        "Convert my voice recording into text"
+    ),
+
+    # LETTER / EMAIL / WRITING
+    (
+        [["letter", "email", "mail", "application", "resume", "cv"]],
+        "Write a letter or email using AI"
+    ),
+
+    # IMAGE / LOGO / DESIGN
+    (
+        [["logo", "design", "creative", "poster", "image", "photo"]],
+        "Create a professional logo or image"
+    ),
+
+    # CODE
+    (
+        [["code", "coding", "program", "python", "java", "c++"]],
+        "Write code using AI"
+    ),
+
+    # VIDEO / REELS
+    (
+        [["video", "reel", "short", "youtube", "instagram"]],
+        "Create short videos or reels using AI"
+    ),
+
+    # SUMMARIZATION
+    (
+        [["summarize", "summary", "research", "paper", "notes"]],
+        "Summarize a document or research paper"
+    ),
+]
@@ -0,0 +1,200 @@
+import os
+import re
+import numpy as np
+
+# ================= BM25 LEXICAL INDEX =================
+#
+# In-process ranking over the tool text, used when no query embedding is
+# available (Ollama down or not deployed) and optionally blended with the
+# cosine scores. Built once per catalog snapshot; a query only touches the
+# postings of its own terms.
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Term frequency weight of each field; a match in the name counts more
+# than one in the description
+FIELD_WEIGHTS = (
+    ("name", 3.0),
+    ("tags", 2.0),
+    ("use_cases", 2.0),
+    ("description", 1.0)
+)
+
+# Fields matched by the ranking stage's keyword-overlap signal
+KEYWORD_FIELDS = (
+    ("use_cases", 1.0),
+    ("tags", 1.0)
+)
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i",
+    "in", "into", "is", "it", "me", "my", "of", "on", "or", "our", "that",
+    "the", "this", "to", "want", "with", "you", "your", "ai", "tool", "tools"
+})
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+def field_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(map(str, value))
+    return str(value or "")
+
+def weighted_terms(tool, fields=FIELD_WEIGHTS):
+    counts = {}
+    for field, weight in fields:
+        for term in tokenize(field_text(tool.get(field))):
+            counts[term] = counts.get(term, 0.0) + weight
+    return counts
+
+class LexicalIndex:
+    # Postings are stored CSR-style by term: the rows containing term t are
+    # rows[indptr[t]:indptr[t + 1]], with their precomputed BM25 weights in
+    # the same slice of weights. A query score is a scatter-add of a few
+    # posting slices into one dense array.
+
+    def __init__(self, tools, fields=FIELD_WEIGHTS, k1=BM25_K1, b=BM25_B):
+        docs = [weighted_terms(tool, fields) for tool in tools]
+        self.size = len(docs)
+
+        lengths = np.array([sum(d.values()) for d in docs], dtype="float32")
+        avg_length = float(lengths.mean()) if self.size and lengths.sum() else 1.0
+
+        postings = {}
+        for row, doc in enumerate(docs):
+            for term, tf in doc.items():
+                postings.setdefault(term, []).append((row, tf))
+
+        self.vocab = {}
+        indptr = [0]
+        rows = []
+        tfs = []
+        for term, entries in postings.items():
+            self.vocab[term] = len(self.vocab)
+            rows.extend(r for r, _ in entries)
+            tfs.extend(tf for _, tf in entries)
+            indptr.append(len(rows))
+
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.rows = np.array(rows, dtype=np.int64)
+        tfs = np.array(tfs, dtype="float32")
+
+        df = np.diff(self.indptr).astype("float32")
+        idf = np.log1p((self.size - df + 0.5) / (df + 0.5))
+
+        norm = k1 * (1 - b + b * lengths[self.rows] / avg_length)
+        term_of = np.repeat(np.arange(len(df)), np.diff(self.indptr))
+        self.weights = (idf[term_of] * tfs * (k1 + 1) / (tfs + norm)).astype("float32")
+
+        # Best weight per term, used to map scores into [0, 1]
+        self.max_weight = np.zeros(len(df), dtype="float32")
+        if len(self.weights):
+            np.maximum.at(self.max_weight, term_of, self.weights)
+
+    def export(self):
+        # (terms in id order, arrays) as stored in a compiled catalog
+        arrays = {
+            "indptr": self.indptr,
+            "rows": self.rows,
+            "weights": self.weights,
+            "max_weight": self.max_weight
+        }
+        return list(self.vocab), arrays
+
+    @classmethod
+    def from_arrays(cls, size, terms, arrays):
+        index = cls.__new__(cls)
+        index.size = size
+        index.vocab = {term: i for i, term in enumerate(terms)}
+        index.indptr = arrays["indptr"]
+        index.rows = arrays["rows"]
+        index.weights = arrays["weights"]
+        index.max_weight = arrays["max_weight"]
+        return index
+
+    def query_terms(self, text: str):
+        terms = list(dict.fromkeys(tokenize(text)))
+        known = [self.vocab[t] for t in terms if t in self.vocab]
+        return terms, known
+
+    def ceiling(self, terms, known):
+        # Score of a row holding the best weight for every query term;
+        # query terms the catalog never uses lower it proportionally
+        return float(self.max_weight[known].sum()) * len(terms) / len(known)
+
+    def score_all(self, text: str):
+        # BM25 over every row, scaled into [0, 1] by ceiling(); None when
+        # no query term occurs in the catalog
+        terms, known = self.query_terms(text)
+        if not known:
+            return None
+
+        scores = np.zeros(self.size, dtype="float32")
+        for t in known:
+            start, end = self.indptr[t], self.indptr[t + 1]
+            scores[self.rows[start:end]] += self.weights[start:end]
+
+        scores /= self.ceiling(terms, known)
+        return scores
+
+    def postings_at(self, t, rows):
+        # Weights of term t at the given rows (0 where absent); posting
+        # rows are sorted, so this is a binary search per row rather than
+        # a pass over the whole posting list
+        start, end = self.indptr[t], self.indptr[t + 1]
+        posting = self.rows[start:end]
+
+        pos = np.minimum(np.searchsorted(posting, rows), len(posting) - 1)
+        hit = posting[pos] == rows
+        return hit, np.where(hit, self.weights[start + pos], 0.0)
+
+    def score_rows(self, text: str, rows):
+        # score_all() restricted to a small candidate set
+        rows = np.asarray(rows)
+        terms, known = self.query_terms(text)
+        scores = np.zeros(len(rows), dtype="float32")
+        if not known:
+            return scores
+
+        for t in known:
+            scores += self.postings_at(t, rows)[1]
+
+        return scores / self.ceiling(terms, known)
+
+    def overlap(self, text: str, rows):
+        # Fraction of the query terms each row contains
+        rows = np.asarray(rows)
+        terms, known = self.query_terms(text)
+        counts = np.zeros(len(rows), dtype="float32")
+        if not known:
+            return counts
+
+        for t in known:
+            counts += self.postings_at(t, rows)[0]
+
+        return counts / len(terms)
+
+    def search(self, text: str, top_k: int, rows=None):
+        # Same contract as the vector indexes: (row indices, scores) best
+        # first. Rows without any matching term keep catalog order at the
+        # end so the result size matches the unranked fallback.
+        scores = self.score_all(text)
+        if scores is None:
+            return None
+
+        candidates = np.arange(self.size) if rows is None else np.asarray(rows)
+        sub = scores[candidates]
+
+        matched = np.flatnonzero(sub > 0)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-sub[matched], top_k - 1)[:top_k]]
+        matched = matched[np.argsort(-sub[matched], kind="stable")]
+
+        if len(matched) < top_k:
+            unmatched = np.flatnonzero(sub <= 0)[:top_k - len(matched)]
+            matched = np.concatenate([matched, unmatched])
+
+        return candidates[matched], sub[matched]
@@ -0,0 +1,278 @@
+import os
+import queue
+import atexit
+import hashlib
+import logging
+import threading
+import contextlib
+from datetime import datetime
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; rotation then relies on a single writer
+    fcntl = None
+
+from src.cache import normalize_key
+
+logger = logging.getLogger(__name__)
+
+# ================= CONFIG =================
+
+# Lines waiting to be written; when full, new lines are dropped and counted
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Seconds between flushes, and the most lines written in one flush
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+LOG_FLUSH_BATCH = 1000
+
+# Rotate to <file>.1 ... <file>.N once a file would grow past this size
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "3"))
+
+# Distinct prompts remembered for repeat counting (least recently seen go first)
+LOG_REPEAT_WINDOW = int(os.getenv("LOG_REPEAT_WINDOW", "10000"))
+
+_STOP = object()
+
+# ================= SINK =================
+
+class LogSink:
+    # Request handlers only enqueue; one background thread per process owns
+    # the file. Each flush is a single O_APPEND write, so lines from several
+    # workers appending to the same file never interleave mid-line. The
+    # size check, rotation and write run under an flock on <file>.lock, so
+    # workers never rotate the same file twice.
+
+    def __init__(
+        self,
+        path,
+        timestamps=True,
+        count_repeats=False,
+        max_queue=LOG_QUEUE_SIZE,
+        flush_interval=LOG_FLUSH_INTERVAL,
+        max_bytes=LOG_MAX_BYTES,
+        backups=LOG_BACKUPS,
+        repeat_window=LOG_REPEAT_WINDOW
+    ):
+        self.path = path
+        self.timestamps = timestamps
+        self.count_repeats = count_repeats
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.repeat_window = repeat_window
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self._seen = OrderedDict()
+
+        self.written = 0
+        self.repeats = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.errors = 0
+
+    # ---------- PRODUCER ----------
+
+    def write(self, text: str) -> bool:
+        self._ensure_started()
+        entry = (datetime.utcnow().isoformat(), text)
+
+        with self._flushed:
+            self._pending += 1
+
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._flushed:
+                self._pending -= 1
+            self.dropped += 1
+            return False
+
+        return True
+
+    def _ensure_started(self):
+        # Started lazily, and again in a forked worker (threads do not survive fork)
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pending = 0
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"log-sink-{os.path.basename(self.path)}",
+                daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    # ---------- CONSUMER ----------
+
+    def _run(self):
+        q = self._queue
+
+        while True:
+            try:
+                entry = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            stop = entry is _STOP
+            if not stop:
+                batch.append(entry)
+
+            # Drain whatever else is already queued into the same write
+            while not stop and len(batch) < LOG_FLUSH_BATCH:
+                try:
+                    entry = q.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                else:
+                    batch.append(entry)
+
+            if batch:
+                self._flush(batch)
+
+            with self._flushed:
+                self._pending -= len(batch)
+                self._flushed.notify_all()
+
+            if stop:
+                return
+
+    def _flush(self, batch):
+        if self.count_repeats:
+            self.repeats += self._repeats(batch)
+
+        data = "".join(self._format(*entry) for entry in batch).encode("utf-8")
+
+        try:
+            with self._file_lock():
+                self._rotate_if_needed(len(data))
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            self.errors += 1
+            logger.warning("⚠️ Could not write %s: %s", self.path, e)
+            return
+
+        self.written += len(batch)
+
+    def _repeats(self, batch):
+        # Every occurrence is still written as its own line; a prompt seen
+        # among the last repeat_window distinct ones (across flushes, per
+        # process) is only counted, for /stats/logs
+        repeats = 0
+        for _, text in batch:
+            key = hashlib.sha1(normalize_key(text).encode("utf-8")).digest()
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                repeats += 1
+                continue
+
+            self._seen[key] = None
+            if len(self._seen) > self.repeat_window:
+                self._seen.popitem(last=False)
+        return repeats
+
+    def _format(self, ts, text):
+        line = f"{ts} | {text}" if self.timestamps else text
+        return line + "\n"
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+
+        fd = os.open(f"{self.path}.lock", os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _rotate_if_needed(self, incoming):
+        if self.max_bytes <= 0:
+            return
+
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+
+    # ---------- CONTROL ----------
+
+    def flush(self, timeout=5.0) -> bool:
+        # Blocks until everything enqueued so far has been written
+        if self._pid != os.getpid():
+            return True
+
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self._pending <= 0, timeout)
+
+    def close(self, timeout=5.0):
+        if self._pid != os.getpid():
+            return
+
+        with self._lock:
+            thread = self._thread
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            self._pid = None
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize() if self._pid == os.getpid() else 0,
+            "written": self.written,
+            "repeats": self.repeats,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "errors": self.errors
+        }
+
+# ================= SHUTDOWN =================
+
+_sinks = []
+
+def make_sink(path, **kwargs):
+    sink = LogSink(path, **kwargs)
+    _sinks.append(sink)
+    return sink
+
+def close_all(timeout=5.0):
+    for sink in _sinks:
+        sink.close(timeout)
+
+atexit.register(close_all)
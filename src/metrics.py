@@ -0,0 +1,137 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# ================= HISTOGRAMS =================
+
+# Latency buckets in seconds, from cache hits up to slow LLM calls
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+STAGE_METRIC = "pipeline_stage_seconds"
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+_histograms = {}
+_help = {}
+_registry_lock = threading.Lock()
+_collectors = []
+
+def describe(name, help_text):
+    _help[name] = help_text
+
+def histogram(name, buckets=BUCKETS, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    hist = _histograms.get(key)
+
+    if hist is None:
+        with _registry_lock:
+            hist = _histograms.setdefault(key, Histogram(buckets))
+
+    return hist
+
+def observe(name, value, buckets=BUCKETS, **labels):
+    histogram(name, buckets, **labels).observe(value)
+
+def register_collector(collect):
+    # collect() returns extra exposition lines (e.g. cache counters)
+    _collectors.append(collect)
+
+# ================= SPANS =================
+
+# Per-request stage timings, only collected when a caller asked for them
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+@contextmanager
+def request_timings(enabled=True):
+    if not enabled:
+        yield None
+        return
+
+    timings = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+@contextmanager
+def span(stage, **labels):
+    # Labels can be filled in inside the block, once the path is known:
+    #   with span("embed") as labels: labels["cache"] = "hit"
+    start = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        elapsed = time.perf_counter() - start
+        observe(STAGE_METRIC, elapsed, stage=stage, **labels)
+
+        timings = _request_timings.get()
+        if timings is not None:
+            key = stage if not labels else f"{stage}[{','.join(str(v) for v in labels.values())}]"
+            timings[key] = round(timings.get(key, 0.0) + elapsed * 1000, 3)
+
+# ================= PROMETHEUS TEXT FORMAT =================
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+def render_prometheus():
+    lines = []
+
+    by_name = {}
+    with _registry_lock:
+        series_items = sorted(_histograms.items(), key=lambda item: item[0])
+
+    for (name, labels), hist in series_items:
+        by_name.setdefault(name, []).append((labels, hist))
+
+    for name, series in by_name.items():
+        lines.append(f"# HELP {name} {_help.get(name, name)}")
+        lines.append(f"# TYPE {name} histogram")
+
+        for labels, hist in series:
+            counts, count, total = hist.snapshot()
+            cumulative = 0
+            for bound, c in zip(hist.buckets, counts):
+                cumulative += c
+                lines.append(
+                    f"{name}_bucket{format_labels(labels + (('le', repr(bound)),))} {cumulative}"
+                )
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{name}_count{format_labels(labels)} {count}")
+
+    for collect in _collectors:
+        lines.extend(collect())
+
+    return "\n".join(lines) + "\n"
+
+describe(STAGE_METRIC, "Time spent in each recommendation pipeline stage")
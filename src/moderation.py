@@ -1,9 +1,4 @@
-BANNED_KEYWORDS = [
-    "hack", "crack", "piracy", "illegal",
-    "porn", "nsfw", "sexual", "violence",
-    "drugs", "weapon", "bomb"
-]
+from src.keyword_matcher import is_banned
 
 def is_safe(prompt: str) -> bool:
-    p = prompt.lower()
-    return not any(word in p for word in BANNED_KEYWORDS)
\ No newline at end of file
+    return not is_banned(prompt)
@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import asyncio
+import httpx
+
+from src.resilience import Limiter, AsyncLimiter, CircuitBreaker, STATE_VALUES, remaining
+from src.metrics import register_collector
+from src.embed_batcher import AsyncBatcher
+
+# ================= CONFIG =================
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434").rstrip("/")
+
+EMBED_MODEL = "nomic-embed-text"
+CHAT_MODEL = "qwen2:0.5b"
+
+# Upper bound on in-flight Ollama calls per process, and on calls waiting
+# for one of those slots; further calls are shed immediately
+MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "8"))
+MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "32"))
+
+# Consecutive failures that open the circuit, and seconds before a probe
+BREAKER_FAILURES = int(os.getenv("OLLAMA_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("OLLAMA_BREAKER_RESET", "30"))
+
+CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "2"))
+EMBED_TIMEOUT = float(os.getenv("OLLAMA_EMBED_TIMEOUT", "10"))
+REWRITE_TIMEOUT = float(os.getenv("OLLAMA_REWRITE_TIMEOUT", "20"))
+CHAT_TIMEOUT = float(os.getenv("OLLAMA_CHAT_TIMEOUT", "60"))
+
+# Online embeddings: concurrent requests within this window (ms) share one
+# /api/embed call of up to EMBED_BATCH_MAX texts; 0 sends each on its own
+EMBED_BATCH_WINDOW_MS = float(os.getenv("OLLAMA_EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_BATCH_MAX = int(os.getenv("OLLAMA_EMBED_BATCH_MAX", "32"))
+
+# Streaming chat: longest wait for the next chunk (the first one included)
+STREAM_IDLE_TIMEOUT = float(os.getenv("OLLAMA_STREAM_IDLE_TIMEOUT", "15"))
+
+# ================= RESILIENCE =================
+#
+# Every call (async, sync and streaming) checks the request deadline and
+# the circuit breaker before taking a limiter slot. While the circuit is
+# open callers fail fast and take their no-Ollama path (rule rewrite,
+# lexical ranking, chat fallback message) instead of waiting on a dead or
+# saturated server.
+
+BREAKER = CircuitBreaker("ollama", BREAKER_FAILURES, BREAKER_RESET)
+SYNC_LIMITER = Limiter(MAX_CONCURRENCY, MAX_QUEUE)
+
+def upstream_info():
+    return {
+        "url": OLLAMA_URL,
+        "circuit": BREAKER.info(),
+        "limiter": SYNC_LIMITER.stats(),
+        "async_limiter": _semaphore.stats() if _semaphore is not None else None,
+        "embed_batches": EMBED_BATCHER.stats()
+    }
+
+def upstream_metrics():
+    circuit = BREAKER.info()
+    shed = SYNC_LIMITER.shed + (_semaphore.shed if _semaphore is not None else 0)
+    return [
+        "# TYPE ollama_circuit_state gauge",
+        f"ollama_circuit_state {STATE_VALUES[circuit['state']]}",
+        "# TYPE ollama_circuit_rejected_total counter",
+        f"ollama_circuit_rejected_total {circuit['rejected']}",
+        "# TYPE ollama_calls_shed_total counter",
+        f"ollama_calls_shed_total {shed}"
+    ]
+
+register_collector(upstream_metrics)
+
+def call_budget(timeout, probe=True):
+    budget = remaining(timeout)
+    BREAKER.check(probe)
+    return budget
+
+def http_timeout(budget):
+    return httpx.Timeout(budget, connect=min(CONNECT_TIMEOUT, budget))
+
+# ================= SHARED CLIENT =================
+#
+# One pooled client and limiter per event loop. Both are bound to the
+# loop that created them, so they are rebuilt if the loop changes
+# (e.g. a test client spinning up its own loop).
+
+_client = None
+_semaphore = None
+_loop = None
+
+def get_client():
+    global _client, _semaphore, _loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _loop is not loop:
+        _client = httpx.AsyncClient(
+            base_url=OLLAMA_URL,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENCY,
+                max_keepalive_connections=MAX_CONCURRENCY
+            ),
+            timeout=httpx.Timeout(CHAT_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+        _semaphore = AsyncLimiter(MAX_CONCURRENCY, MAX_QUEUE)
+        _loop = loop
+
+    return _client
+
+async def close_client():
+    global _client, _semaphore, _loop
+
+    if _client is not None:
+        await _client.aclose()
+
+    _client = None
+    _semaphore = None
+    _loop = None
+
+# Any exception from the call itself (HTTP error, timeout, bad JSON, an
+# error chunk) counts as a breaker failure; cancellation is a BaseException
+# and does not. The request budget is taken before the call, so running
+# out of it while queued never counts against Ollama.
+
+async def post_json(path: str, payload: dict, timeout: float):
+    client = get_client()
+
+    async with _semaphore.slot(call_budget(timeout)):
+        budget = http_timeout(remaining(timeout))
+        try:
+            response = await client.post(path, json=payload, timeout=budget)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            BREAKER.record_failure(e)
+            raise
+
+        BREAKER.record_success()
+        return data
+
+def post_json_sync(path: str, payload: dict, timeout: float):
+    # For the thread-pool callers (batch endpoint, offline scripts)
+    with SYNC_LIMITER.slot(call_budget(timeout)):
+        budget = http_timeout(remaining(timeout))
+        try:
+            response = httpx.post(f"{OLLAMA_URL}{path}", json=payload, timeout=budget)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            BREAKER.record_failure(e)
+            raise
+
+        BREAKER.record_success()
+        return data
+
+# ================= API CALLS =================
+
+async def embed_many(texts: list, timeout: float = EMBED_TIMEOUT):
+    # Batch endpoint: one call, one vector per input, in order
+    data = await post_json(
+        "/api/embed",
+        {"model": EMBED_MODEL, "input": texts},
+        timeout
+    )
+    return data.get("embeddings") or []
+
+EMBED_BATCHER = AsyncBatcher(
+    "embed", embed_many, EMBED_BATCH_WINDOW_MS / 1000, EMBED_BATCH_MAX
+)
+
+async def embed(text: str, timeout: float = EMBED_TIMEOUT):
+    if EMBED_BATCH_WINDOW_MS <= 0:
+        embeddings = await embed_many([text], timeout)
+        return embeddings[0] if embeddings else None
+
+    # Fail fast here rather than after the batching window
+    call_budget(timeout, probe=False)
+    return await EMBED_BATCHER.submit(text, timeout)
+
+async def chat(messages: list, timeout: float = CHAT_TIMEOUT):
+    data = await post_json(
+        "/api/chat",
+        {"model": CHAT_MODEL, "messages": messages, "stream": False},
+        timeout
+    )
+    return data.get("message", {}).get("content")
+
+def embed_many_sync(texts: list, timeout: float = EMBED_TIMEOUT):
+    data = post_json_sync(
+        "/api/embed",
+        {"model": EMBED_MODEL, "input": texts},
+        timeout
+    )
+    return data.get("embeddings") or []
+
+def embed_sync(text: str, timeout: float = EMBED_TIMEOUT):
+    embeddings = embed_many_sync([text], timeout)
+    return embeddings[0] if embeddings else None
+
+def chat_sync(messages: list, timeout: float = CHAT_TIMEOUT):
+    data = post_json_sync(
+        "/api/chat",
+        {"model": CHAT_MODEL, "messages": messages, "stream": False},
+        timeout
+    )
+    return data.get("message", {}).get("content")
+
+async def chat_stream(messages: list, timeout: float = CHAT_TIMEOUT):
+    # Yields Ollama's NDJSON chunks as dicts. Leaving the loop early (client
+    # gone, caller cancelled) closes the upstream connection, which makes
+    # Ollama stop generating.
+    client = get_client()
+    deadline = time.monotonic() + timeout
+
+    async with _semaphore.slot(call_budget(timeout)):
+        try:
+            async with client.stream(
+                "POST",
+                "/api/chat",
+                json={"model": CHAT_MODEL, "messages": messages, "stream": True},
+                timeout=httpx.Timeout(STREAM_IDLE_TIMEOUT, connect=CONNECT_TIMEOUT)
+            ) as response:
+                response.raise_for_status()
+                healthy = False
+
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise RuntimeError(chunk["error"])
+
+                    # Counted once a real chunk arrives: a 200 followed by an
+                    # error chunk is a failure, not a success and a failure
+                    if not healthy:
+                        BREAKER.record_success()
+                        healthy = True
+
+                    yield chunk
+
+                    if chunk.get("done"):
+                        return
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Chat stream exceeded {timeout}s")
+        except Exception as e:
+            BREAKER.record_failure(e)
+            raise
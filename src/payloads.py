@@ -0,0 +1,148 @@
+import json
+import hashlib
+from collections.abc import Sequence
+
+try:
+    import orjson
+except ImportError:  # optional, ~5x faster encoding when installed
+    orjson = None
+
+# ================= ENCODER =================
+
+if orjson is not None:
+    def dumps(value) -> bytes:
+        return orjson.dumps(value)
+
+    loads = orjson.loads
+else:
+    def dumps(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+# ================= TOOL PAYLOADS =================
+
+def tool_payload(tool):
+    # Public fields of a tool in a recommendation, in response order
+    return {
+        "id": tool["id"],
+        "name": tool["name"],
+        "description": tool.get("description", ""),
+        "domain": tool["domain"],
+        "actions": tool.get("actions", []),
+        "use_cases": tool.get("use_cases", []),
+        "pricing": tool.get("pricing", "N/A"),
+        "api_available": tool.get("api_available", False),
+        "website": tool.get("website"),
+        "tags": tool.get("tags", [])
+    }
+
+SCORE_KEY = b',"score":'
+
+class ToolPayload:
+    # Built once per tool at catalog load: the dict handed to Python callers
+    # and the same object pre-encoded up to the score, ready to splice.
+    __slots__ = ("_fields", "prefix")
+
+    def __init__(self, tool):
+        # A tool dict, or its payload as encoded by the catalog compiler;
+        # those are only decoded when a caller reads the fields
+        if isinstance(tool, bytes):
+            self._fields = None
+            body = tool
+        else:
+            self._fields = tool_payload(tool)
+            body = dumps(self._fields)
+
+        self.prefix = body[:-1] + SCORE_KEY
+
+    @property
+    def fields(self):
+        if self._fields is None:
+            self._fields = loads(self.prefix[:-len(SCORE_KEY)] + b"}")
+        return self._fields
+
+    def result(self, score, rank_score=None):
+        return ToolResult(self, score, rank_score)
+
+class ToolResult(dict):
+    # A plain dict for callers, plus a link to its pre-encoded payload so
+    # the response encoder only has to append the score
+    __slots__ = ("payload",)
+
+    def __init__(self, payload, score, rank_score=None):
+        super().__init__(payload.fields, score=score)
+        if rank_score is not None:
+            self["rank_score"] = rank_score
+        self.payload = payload
+
+    def encode(self) -> bytes:
+        body = self.payload.prefix + dumps(self["score"])
+        if "rank_score" in self:
+            body += b',"rank_score":' + dumps(self["rank_score"])
+        return body + b"}"
+
+class ToolDocument:
+    # The raw catalog entry as served by /tool/{id}
+    __slots__ = ("body", "etag")
+
+    def __init__(self, tool):
+        self.body = tool if isinstance(tool, bytes) else dumps(tool)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+# ================= RESPONSES =================
+
+def encode_tools(tools) -> bytes:
+    return b"[" + b",".join(
+        t.encode() if isinstance(t, ToolResult) else dumps(t) for t in tools
+    ) + b"]"
+
+def encode_response(response) -> bytes:
+    # Everything but the tool list is small and encoded normally; the
+    # tools are spliced in from their pre-encoded fragments
+    if "tools" not in response:
+        return dumps(response)
+
+    head = dumps({k: v for k, v in response.items() if k != "tools"})
+    sep = b"," if len(head) > 2 else b""
+    return head[:-1] + sep + b'"tools":' + encode_tools(response["tools"]) + b"}"
+
+def encode_results(responses) -> bytes:
+    return b'{"results":[' + b",".join(encode_response(r) for r in responses) + b"]}"
+
+# ================= COMPILED CATALOGS =================
+#
+# Rows of a compiled catalog are kept encoded in its memory-mapped string
+# pools and only turned into objects when a request reaches them.
+
+class PayloadTable(Sequence):
+    def __init__(self, pool):
+        self.pool = pool
+        self._payloads = {}
+
+    def __len__(self):
+        return len(self.pool)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+
+        i = range(len(self))[i]
+        payload = self._payloads.get(i)
+        if payload is None:
+            payload = self._payloads[i] = ToolPayload(self.pool[i])
+        return payload
+
+class ToolTable(Sequence):
+    # Tool dicts, decoded on every access (only offline scripts and
+    # reports walk all of them)
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __len__(self):
+        return len(self.pool)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+        return loads(self.pool[range(len(self))[i]])
@@ -1,12 +1,16 @@
-from intent_extractor import extract_intent
-from filter_tools import filter_tools
+from src.intent_extractor import extract_intent
+from src.filter_tools import filter_tools
+from src.catalog import get_snapshot
+
+# Run from the repository root:  python -m src.pipeline_test
 
 prompt = "Create a professional logo for my startup"
 
 intent = extract_intent(prompt)
-tools = filter_tools(intent)
+catalog = get_snapshot()
+tools = filter_tools(intent, catalog.row_tools, catalog.columns)
 
 print("Intent:", intent)
 print("Matched tools:")
 for tool in tools:
-    print("-", tool["name"])
\ No newline at end of file
+    print("-", tool["name"])
@@ -1,57 +1,28 @@
-import requests
-import re
+import logging
 
-OLLAMA_CHAT_URL = "http://localhost:11434/api/chat"
-PROMPT_CACHE = {}
+from src import ollama_client
+from src.cache import make_cache, normalize_key
+from src.singleflight import SingleFlight, AsyncSingleFlight
+from src.keyword_matcher import match_rule
+from src.resilience import UpstreamUnavailable
+
+PROMPT_CACHE = make_cache("rewrite")
+
+# Identical prompts rewritten concurrently share one Ollama call
+REWRITE_FLIGHT = SingleFlight("rewrite")
+REWRITE_FLIGHT_ASYNC = AsyncSingleFlight("rewrite")
+
+logger = logging.getLogger(__name__)
 
 # =========================================================
 # 1️⃣ RULE-BASED NORMALIZATION (FIRST LINE OF DEFENSE)
 # =========================================================
 
-RULES = [
-    # AUDIO / SPEECH → TEXT (English, Hindi, Hinglish)
-    (
-        r"(awaaz|voice|audio|speech|bol).*?(text|likh|likho|text mein|words)",
-        "Convert my voice recording into text"
-    ),
-
-    # LETTER / EMAIL / WRITING
-    (
-        r"(letter|email|mail|application|resume|cv)",
-        "Write a letter or email using AI"
-    ),
-
-    # IMAGE / LOGO / DESIGN
-    (
-        r"(logo|design|creative|poster|image|photo)",
-        "Create a professional logo or image"
-    ),
-
-    # CODE
-    (
-        r"(code|coding|program|python|java|c\+\+)",
-        "Write code using AI"
-    ),
-
-    # VIDEO / REELS
-    (
-        r"(video|reel|short|youtube|instagram)",
-        "Create short videos or reels using AI"
-    ),
-
-    # SUMMARIZATION
-    (
-        r"(summarize|summary|research|paper|notes)",
-        "Summarize a document or research paper"
-    ),
-]
+# Keyword tables live in src/keywords.py (REWRITE_RULES) and are compiled
+# once into the shared single-pass matcher
 
 def rule_based_rewrite(prompt: str) -> str | None:
-    text = prompt.lower()
-    for pattern, normalized in RULES:
-        if re.search(pattern, text):
-            return normalized
-    return None
+    return match_rule(prompt)
 
 
 # =========================================================
@@ -110,46 +81,119 @@ CHAT_PATTERNS = [
 # 3️⃣ MAIN REWRITE FUNCTION
 # =========================================================
 
-def rewrite_prompt(user_prompt: str) -> str:
-    if user_prompt in PROMPT_CACHE:
-        return PROMPT_CACHE[user_prompt]
+def rewrite_messages(user_prompt: str):
+    return [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def accept_rewrite(user_prompt: str, rewritten) -> str:
+    rewritten = (rewritten or "").strip()
+
+    # ---------- HARD REJECTION OF CHAT-LIKE OUTPUT ----------
+    if (
+        not rewritten
+        or len(rewritten.split()) < 3
+        or any(p in rewritten.lower() for p in CHAT_PATTERNS)
+    ):
+        return user_prompt
+
+    return rewritten
+
+def quick_rewrite(user_prompt: str, labels=None) -> str | None:
+    # Cache or rule hit; None means the LLM has to be asked
+    cached = PROMPT_CACHE.get(user_prompt)
+    if cached is not None:
+        if labels is not None:
+            labels["path"] = "cache"
+        return cached
 
-    # ---------- RULE-BASED FIRST ----------
     rule_result = rule_based_rewrite(user_prompt)
     if rule_result:
-        PROMPT_CACHE[user_prompt] = rule_result
+        PROMPT_CACHE.set(user_prompt, rule_result)
+        if labels is not None:
+            labels["path"] = "rule"
         return rule_result
 
-    # ---------- LLM SECOND ----------
+    return None
+
+def fetch_rewrite(user_prompt: str) -> str:
+    # A caller that just lost the race to an identical in-flight rewrite
+    # finds the result already cached
+    cached = PROMPT_CACHE.get(user_prompt)
+    if cached is not None:
+        return cached
+
     try:
-        response = requests.post(
-            OLLAMA_CHAT_URL,
-            json={
-                "model": "qwen2:0.5b",
-                "messages": [
-                    {"role": "system", "content": SYSTEM_MESSAGE},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "stream": False
-            },
-            timeout=None
+        rewritten = accept_rewrite(
+            user_prompt,
+            ollama_client.chat_sync(
+                rewrite_messages(user_prompt),
+                timeout=ollama_client.REWRITE_TIMEOUT
+            )
         )
-        response.raise_for_status()
 
-        rewritten = response.json()["message"]["content"].strip()
+        PROMPT_CACHE.set(user_prompt, rewritten)
+        return rewritten
+
+    except UpstreamUnavailable as e:
+        # Skipped, not failed: don't pin the prompt as its own rewrite
+        logger.debug("⏭️ Rewrite skipped: %s", e)
+        return user_prompt
+
+    except Exception as e:
+        logger.warning("⚠️ Rewrite failed: %s", e)
+        PROMPT_CACHE.set(user_prompt, user_prompt)
+        return user_prompt
+
+async def fetch_rewrite_async(user_prompt: str) -> str:
+    cached = PROMPT_CACHE.get(user_prompt)
+    if cached is not None:
+        return cached
 
-        # ---------- HARD REJECTION OF CHAT-LIKE OUTPUT ----------
-        if (
-            not rewritten
-            or len(rewritten.split()) < 3
-            or any(p in rewritten.lower() for p in CHAT_PATTERNS)
-        ):
-            rewritten = user_prompt
+    try:
+        rewritten = accept_rewrite(
+            user_prompt,
+            await ollama_client.chat(
+                rewrite_messages(user_prompt),
+                timeout=ollama_client.REWRITE_TIMEOUT
+            )
+        )
 
-        PROMPT_CACHE[user_prompt] = rewritten
+        PROMPT_CACHE.set(user_prompt, rewritten)
         return rewritten
 
+    except UpstreamUnavailable as e:
+        logger.debug("⏭️ Rewrite skipped: %s", e)
+        return user_prompt
+
     except Exception as e:
-        print("⚠️ Rewrite failed:", e)
-        PROMPT_CACHE[user_prompt] = user_prompt
-        return user_prompt
\ No newline at end of file
+        logger.warning("⚠️ Rewrite failed: %s", e)
+        PROMPT_CACHE.set(user_prompt, user_prompt)
+        return user_prompt
+
+def llm_rewrite(user_prompt: str) -> str:
+    return REWRITE_FLIGHT.do(
+        normalize_key(user_prompt), lambda: fetch_rewrite(user_prompt)
+    )
+
+async def llm_rewrite_async(user_prompt: str) -> str:
+    return await REWRITE_FLIGHT_ASYNC.do(
+        normalize_key(user_prompt), lambda: fetch_rewrite_async(user_prompt)
+    )
+
+def rewrite_prompt(user_prompt: str) -> str:
+    # ---------- CACHE / RULE-BASED FIRST ----------
+    quick = quick_rewrite(user_prompt)
+    if quick is not None:
+        return quick
+
+    # ---------- LLM SECOND ----------
+    return llm_rewrite(user_prompt)
+
+async def rewrite_prompt_async(user_prompt: str) -> str:
+    quick = quick_rewrite(user_prompt)
+    if quick is not None:
+        return quick
+
+    return await llm_rewrite_async(user_prompt)
@@ -0,0 +1,102 @@
+import os
+import numpy as np
+
+from src.lexical import tokenize
+
+# ================= FUSION =================
+#
+# Re-ranks the best RANK_CANDIDATES semantic matches with more signals,
+# each an array aligned with the candidate rows:
+#
+#   semantic  cosine similarity (BM25 when there is no query embedding)
+#   bm25      BM25 over name / tags / use cases / description
+#   keywords  fraction of prompt terms found in use_cases / tags
+#   action    1.0 exact action, ALIAS_MATCH alias only, 0 no match
+#
+# FUSION=weighted sums the signals with FUSION_WEIGHTS; FUSION=rrf sums
+# weighted reciprocal ranks (RRF_K). Either way the fused score is in
+# [0, 1]; it orders the results and is returned as rank_score, while
+# score keeps the semantic score. FUSION=cosine turns the stage off
+# (semantic order and scores only).
+
+FUSION = os.getenv("FUSION", "weighted").lower()
+RANK_CANDIDATES = int(os.getenv("RANK_CANDIDATES", "50"))
+RRF_K = float(os.getenv("RRF_K", "60"))
+
+DEFAULT_WEIGHTS = "semantic=0.8,keywords=0.1,action=0.1,bm25=0"
+
+def parse_weights(spec):
+    weights = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip():
+            weights[name.strip()] = float(value)
+    return weights
+
+FUSION_WEIGHTS = parse_weights(os.getenv("FUSION_WEIGHTS", DEFAULT_WEIGHTS))
+
+SIGNALS = ("semantic", "bm25", "keywords", "action")
+
+def enabled():
+    return FUSION in ("weighted", "rrf")
+
+def candidate_depth(top_k):
+    return max(top_k, RANK_CANDIDATES) if enabled() else top_k
+
+# ================= SIGNALS =================
+
+def signals(catalog, text, intent, rows, semantic, lexical_semantic=False):
+    weights = {name: FUSION_WEIGHTS.get(name, 0.0) for name in SIGNALS}
+
+    # Without an embedding the semantic signal already is BM25
+    if lexical_semantic:
+        weights["bm25"] = 0.0
+
+    arrays = {"semantic": np.asarray(semantic, dtype="float32")}
+    if weights["bm25"] > 0:
+        arrays["bm25"] = catalog.lexical.score_rows(text, rows)
+    if weights["keywords"] > 0:
+        arrays["keywords"] = catalog.keywords.overlap(text, rows)
+    if weights["action"] > 0:
+        arrays["action"] = catalog.columns.match_levels(intent, rows, tokenize(text))
+
+    return arrays, {name: weights[name] for name in arrays if weights[name] > 0}
+
+def weighted(arrays, weights):
+    total = sum(weights.values())
+    return sum(arrays[name] * (w / total) for name, w in weights.items())
+
+def reciprocal_rank(arrays, weights):
+    # Candidates arrive in semantic order, so a stable sort breaks ties
+    # (e.g. equal action levels) by semantic rank
+    total = sum(weights.values())
+    fused = 0.0
+
+    for name, w in weights.items():
+        ranks = np.empty(len(arrays[name]), dtype="float32")
+        ranks[np.argsort(-arrays[name], kind="stable")] = np.arange(len(ranks))
+        fused = fused + (w / total) / (RRF_K + 1 + ranks)
+
+    # The best possible sum (rank 0 everywhere) maps to 1.0
+    return fused * (RRF_K + 1)
+
+# ================= RANK =================
+
+def rank(catalog, text, intent, hits, top_k, lexical_semantic=False):
+    # hits: (candidate rows, semantic scores) best first, as returned by
+    # the vector or lexical index at candidate_depth(top_k). Returns the
+    # top_k rows in fused order with their semantic and fused scores.
+    if hits is None or not enabled():
+        return hits
+
+    rows, semantic = hits
+    if len(rows) == 0:
+        return hits
+
+    arrays, weights = signals(catalog, text, intent, rows, semantic, lexical_semantic)
+    if not weights:
+        return rows[:top_k], semantic[:top_k]
+
+    fused = (reciprocal_rank if FUSION == "rrf" else weighted)(arrays, weights)
+    order = np.argsort(-fused, kind="stable")[:top_k]
+    return rows[order], semantic[order], fused[order]
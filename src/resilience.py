@@ -0,0 +1,243 @@
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager, asynccontextmanager
+
+# ================= ERRORS =================
+#
+# Raised instead of calling Ollama at all. Callers treat them like any
+# other upstream failure (rule rewrite, no embedding, chat fallback), but
+# they are not counted against the circuit breaker and not cached.
+
+class UpstreamUnavailable(RuntimeError):
+    pass
+
+class DeadlineExceeded(UpstreamUnavailable):
+    pass
+
+class Overloaded(UpstreamUnavailable):
+    pass
+
+class CircuitOpen(UpstreamUnavailable):
+    pass
+
+# ================= DEADLINES =================
+#
+# One end-to-end budget per request, carried in a context variable so it
+# reaches every upstream call (including asyncio tasks the request starts)
+# without being passed through each pipeline function. Each call's own
+# timeout is capped by what is left.
+
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "10"))
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+@contextmanager
+def deadline(seconds=REQUEST_DEADLINE):
+    # Nested deadlines can only shorten the outer one
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining(timeout):
+    at = _deadline.get()
+    if at is None:
+        return timeout
+
+    left = at - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return min(timeout, left)
+
+def with_deadline(fn, seconds):
+    # Batch work: every call gets a deadline of its own, starting when a
+    # worker picks it up, instead of sharing one with the whole batch
+    def run(*args):
+        with deadline(seconds):
+            return fn(*args)
+
+    return run
+
+def propagate(fn):
+    # Thread pool workers don't inherit context variables; run fn in a
+    # copy of the caller's context so they see its deadline
+    ctx = contextvars.copy_context()
+
+    def run(*args):
+        return ctx.copy().run(fn, *args)
+
+    return run
+
+# ================= CONCURRENCY LIMITS =================
+#
+# At most `limit` calls in flight and `max_queue` waiting; callers beyond
+# that are shed at once instead of queueing behind a saturated server.
+# Waiting counts against the request deadline.
+
+class Limiter:
+    def __init__(self, limit, max_queue):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.semaphore = threading.Semaphore(limit)
+        self.waiting = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, timeout):
+        if not self.semaphore.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.max_queue:
+                    self.shed += 1
+                    raise Overloaded(f"{self.waiting} calls already queued")
+                self.waiting += 1
+
+            try:
+                acquired = self.semaphore.acquire(timeout=timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+
+            if not acquired:
+                raise DeadlineExceeded(f"No upstream slot within {timeout:.2f}s")
+
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "shed": self.shed
+        }
+
+class AsyncLimiter:
+    # Same policy for one event loop (asyncio primitives are loop-bound)
+
+    def __init__(self, limit, max_queue):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.shed = 0
+
+    @asynccontextmanager
+    async def slot(self, timeout):
+        if self.semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.shed += 1
+                raise Overloaded(f"{self.waiting} calls already queued")
+
+            self.waiting += 1
+            try:
+                async with asyncio.timeout(timeout):
+                    await self.semaphore.acquire()
+            except TimeoutError:
+                raise DeadlineExceeded(f"No upstream slot within {timeout:.2f}s") from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "shed": self.shed
+        }
+
+# ================= CIRCUIT BREAKER =================
+#
+#   closed     calls go through; `failures` consecutive failures open it
+#   open       calls fail fast with CircuitOpen for `reset_after` seconds
+#   half_open  one probe call goes through; success closes the circuit,
+#              failure opens it again
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitBreaker:
+    def __init__(self, name, failures=5, reset_after=30.0):
+        self.name = name
+        self.threshold = failures
+        self.reset_after = reset_after
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.last_error = None
+
+        self.opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def check(self, probe=True):
+        # probe=False only asks whether a call would be let through, for
+        # callers that fail fast before the call itself checks again; it
+        # never claims the half-open probe, so that call still can
+        now = time.monotonic()
+
+        with self._lock:
+            if self.state == CLOSED:
+                return
+
+            if self.state == OPEN and now - self.opened_at >= self.reset_after:
+                self.state = HALF_OPEN
+
+            # A probe whose caller went away without reporting back would
+            # otherwise keep the circuit half open forever
+            if self.state == HALF_OPEN and now - self.probe_started >= self.reset_after:
+                if probe:
+                    self.probe_started = now
+                return
+
+            self.rejected += 1
+
+        raise CircuitOpen(f"{self.name} circuit is {self.state}")
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def info(self):
+        with self._lock:
+            retry_in = self.opened_at + self.reset_after - time.monotonic()
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in": round(max(retry_in, 0.0), 1) if self.state == OPEN else None,
+                "times_opened": self.opened,
+                "rejected": self.rejected,
+                "last_error": self.last_error
+            }
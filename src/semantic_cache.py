@@ -0,0 +1,144 @@
+import os
+import time
+import random
+import threading
+import numpy as np
+from collections import OrderedDict
+
+from src.tool_index import normalize_vector
+
+# ================= SEMANTIC PROMPT CACHE =================
+#
+# Finished responses keyed by the embedding of the original prompt, so a
+# near-duplicate ("write python code", "Write Python code.", ...) reuses
+# the rewrite, intent and results of an earlier prompt instead of paying
+# for another LLM rewrite. Lookup is one matrix-vector product over the
+# cached vectors (a few thousand at most), which is cheaper than any
+# approximate index at this size.
+#
+# Entries are scoped to a caller key (the pipeline uses catalog version,
+# top_k and the prompt's rule-based intent: domain, action, pricing); only
+# entries in the same scope can match. They expire after
+# SEMANTIC_CACHE_TTL seconds; the least recently hit entry is evicted
+# when the cache is full. A SEMANTIC_CACHE_VERIFY_RATE share of hits is
+# recomputed anyway and compared, to count false hits.
+
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1024"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "600"))
+SEMANTIC_CACHE_VERIFY_RATE = float(os.getenv("SEMANTIC_CACHE_VERIFY_RATE", "0.02"))
+
+class SemanticCache:
+    def __init__(
+        self,
+        capacity=SEMANTIC_CACHE_SIZE,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        ttl=SEMANTIC_CACHE_TTL,
+        verify_rate=SEMANTIC_CACHE_VERIFY_RATE
+    ):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.verify_rate = verify_rate
+
+        # Allocated on the first insert, once the embedding size is known
+        self.vectors = None
+        self.scopes = np.zeros(capacity, dtype=np.int64)
+        self.expires = np.zeros(capacity, dtype="float64")
+        self.values = [None] * capacity
+
+        # slot -> None, least recently used first
+        self.lru = OrderedDict()
+        self.free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.verified = 0
+        self.false_hits = 0
+
+    def lookup(self, scope, vec):
+        # (response, similarity) of the closest live entry in this scope,
+        # or None when nothing is within the threshold
+        query = normalize_vector(np.asarray(vec, dtype="float32"))
+        scope = hash(scope)
+        now = time.monotonic()
+
+        with self._lock:
+            if self.vectors is None or not self.lru or len(query) != self.vectors.shape[1]:
+                self.misses += 1
+                return None
+
+            scores = self.vectors @ query
+            scores[(self.scopes != scope) | (self.expires <= now)] = -np.inf
+
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                self.misses += 1
+                return None
+
+            self.lru.move_to_end(slot)
+            self.hits += 1
+            return self.values[slot], float(scores[slot])
+
+    def store(self, scope, vec, response):
+        query = normalize_vector(np.asarray(vec, dtype="float32"))
+
+        with self._lock:
+            if self.vectors is None:
+                self.vectors = np.zeros((self.capacity, len(query)), dtype="float32")
+            elif len(query) != self.vectors.shape[1]:
+                return
+
+            if self.free:
+                slot = self.free.pop()
+            else:
+                slot, _ = self.lru.popitem(last=False)
+                self.evictions += 1
+
+            self.vectors[slot] = query
+            self.scopes[slot] = hash(scope)
+            self.expires[slot] = time.monotonic() + self.ttl
+            self.values[slot] = response
+            self.lru[slot] = None
+
+    def should_verify(self):
+        return self.verify_rate > 0 and random.random() < self.verify_rate
+
+    def record_verification(self, cached, fresh):
+        # A false hit would have answered with different tools
+        same = [t["id"] for t in cached["tools"]] == [t["id"] for t in fresh["tools"]]
+        with self._lock:
+            self.verified += 1
+            self.false_hits += not same
+        return same
+
+    def clear(self):
+        with self._lock:
+            self.lru.clear()
+            self.free = list(range(self.capacity - 1, -1, -1))
+            self.values = [None] * self.capacity
+            self.expires[:] = 0
+
+    def __len__(self):
+        return len(self.lru)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "semantic",
+            "entries": len(self.lru),
+            "max_entries": self.capacity,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "verified": self.verified,
+            "false_hits": self.false_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "false_hit_rate": round(self.false_hits / self.verified, 4) if self.verified else 0.0
+        }
+
+def make_semantic_cache():
+    return SemanticCache() if SEMANTIC_CACHE_SIZE > 0 else None
@@ -1,6 +1,7 @@
 import numpy as np
 import json
 import requests
+from functools import lru_cache
 
 # ---------- FILES ----------
 EMBED_FILE = "data/tool_embeddings.npy"
@@ -9,10 +10,15 @@ ID_FILE = "data/tool_ids.json"
 OLLAMA_EMBED_URL = "http://localhost:11434/api/embeddings"
 
 # ---------- LOAD TOOL EMBEDDINGS ----------
-tool_embeddings = np.load(EMBED_FILE)
+# Loaded on first search, never at import
+@lru_cache(maxsize=1)
+def load_embeddings():
+    tool_embeddings = np.load(EMBED_FILE)
 
-with open(ID_FILE, "r") as f:
-    tool_ids = json.load(f)
+    with open(ID_FILE, "r") as f:
+        tool_ids = json.load(f)
+
+    return tool_embeddings, tool_ids
 
 # ---------- COSINE SIMILARITY ----------
 def cosine_similarity(a, b):
@@ -35,6 +41,7 @@ def embed_prompt(prompt):
 
 # ---------- SEMANTIC SEARCH ----------
 def semantic_search(prompt, top_k=5):
+    tool_embeddings, tool_ids = load_embeddings()
     query_vec = embed_prompt(prompt)
     scores = cosine_similarity(tool_embeddings, query_vec)
 
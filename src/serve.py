@@ -0,0 +1,82 @@
+import os
+import time
+import logging
+import argparse
+import multiprocessing
+import uvicorn
+
+from src import catalog
+
+logger = logging.getLogger(__name__)
+
+# ================= MULTI-WORKER SERVING =================
+#
+#   python -m src.serve --workers 4 --port 10000
+#
+# With several workers, the catalog is loaded once in a short-lived child
+# process before they start. That builds or validates tool_index.bin, or
+# checks catalog.snap when compiled (and any IVF / int8 / float16 files
+# the configured backend needs) so workers never race to build them, and
+# the supervisor never holds a loaded catalog itself. Each worker then
+# memory-maps the same files: the embedding matrix is held once in the OS
+# page cache and shared zero-copy by all workers. With a compiled catalog
+# the columns and BM25 postings are shared too; each worker still pays for
+# its own interpreter, imports and caches.
+#
+# One worker (the default) is served in-process with no preload: the API
+# startup hook loads the catalog once in the background.
+
+# Render sets WEB_CONCURRENCY; 0 means one worker per CPU. Extra workers
+# only add throughput with spare CPUs, and each costs its own memory.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+def default_workers():
+    return WEB_CONCURRENCY or os.cpu_count() or 1
+
+def preload():
+    started = time.perf_counter()
+    snapshot = catalog.load_snapshot()
+
+    # Touch what the vector index scans once so the workers start on a
+    # warm page cache (a reduced-precision index leaves the float32 cold)
+    snapshot.vectors.warm()
+
+    logger.info(
+        "✅ Catalog %s prepared in %.2fs (%d tools, %s index)",
+        snapshot.version, time.perf_counter() - started,
+        len(snapshot.tool_ids), snapshot.vectors.name
+    )
+    return snapshot.info()
+
+def preload_in_child():
+    # The parent only supervises workers; loading in a child keeps the
+    # catalog's heap out of its memory once loading is done
+    process = multiprocessing.get_context("spawn").Process(target=preload, name="catalog-preload")
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise SystemExit(f"⚠️ Catalog preload failed (exit code {process.exitcode})")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "10000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info").lower())
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+    if args.workers > 1:
+        preload_in_child()
+
+    logger.info("🚀 Starting %d worker(s) on %s:%d", args.workers, args.host, args.port)
+    uvicorn.run(
+        "src.api:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+# ================= THREADS =================
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    # Concurrent callers with the same key share one execution of fn:
+    # the first caller runs it, the others block until it finishes and
+    # receive the same result (or exception).
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "shared": self.shared
+        }
+
+# ================= ASYNCIO =================
+
+class AsyncSingleFlight:
+    # Same idea for coroutines. The shared call runs as its own task; a
+    # waiter that is cancelled only stops waiting, and the task itself is
+    # cancelled once nobody is waiting for it any more.
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, coro_fn):
+        # Tasks belong to one event loop, so keys are scoped per loop
+        key = (id(asyncio.get_running_loop()), key)
+
+        entry = self._calls.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(coro_fn())
+            entry = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and entry[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "shared": self.shared
+        }
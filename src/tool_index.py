@@ -0,0 +1,134 @@
+import os
+import json
+import struct
+import numpy as np
+
+# ================= FORMAT =================
+#
+# [ MAGIC (8 bytes) ][ header length (uint32 LE) ][ JSON header ][ pad ][ matrix ]
+#
+# The JSON header carries the id table and metadata. The matrix holds
+# L2-normalized float32 rows and starts on an ALIGNMENT boundary so it
+# can be opened with np.memmap and shared between worker processes.
+
+MAGIC = b"TOOLIDX1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "..", "data")
+
+INDEX_FILE = os.path.join(DATA_DIR, "tool_index.bin")
+EMBED_FILE = os.path.join(DATA_DIR, "tool_embeddings.npy")
+ID_FILE = os.path.join(DATA_DIR, "tool_ids.json")
+
+# ================= UTILS =================
+
+def normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype="float32")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def normalize_vector(vector):
+    vector = np.asarray(vector, dtype="float32")
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def top_k_indices(scores, k):
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= len(scores):
+        return np.argsort(scores)[::-1]
+    part = np.argpartition(scores, -k)[-k:]
+    return part[np.argsort(scores[part])[::-1]]
+
+# ================= WRITE =================
+
+def write_index(path, embeddings, ids, model="nomic-embed-text"):
+    matrix = normalize_rows(embeddings)
+
+    if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+        raise ValueError(
+            f"Index shape {matrix.shape} does not match {len(ids)} tool ids"
+        )
+
+    header = {
+        "version": FORMAT_VERSION,
+        "count": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]),
+        "dtype": "float32",
+        "model": model,
+        "ids": list(ids)
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    prefix_len = len(MAGIC) + 4 + len(header_bytes)
+    padding = (-prefix_len) % ALIGNMENT
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * padding)
+        f.write(np.ascontiguousarray(matrix).tobytes())
+
+    os.replace(tmp_path, path)
+
+# ================= READ =================
+
+class ToolIndex:
+    def __init__(self, matrix, ids, meta):
+        self.matrix = matrix
+        self.ids = ids
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.ids)
+
+def open_index(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a tool index file")
+
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported tool index version: {header.get('version')}")
+
+    prefix_len = len(MAGIC) + 4 + header_len
+    offset = prefix_len + (-prefix_len) % ALIGNMENT
+
+    matrix = np.memmap(
+        path,
+        dtype=header["dtype"],
+        mode="r",
+        offset=offset,
+        shape=(header["count"], header["dim"])
+    )
+
+    ids = header.pop("ids")
+    return ToolIndex(matrix, ids, header)
+
+def build_index_from_npy(embed_file=EMBED_FILE, id_file=ID_FILE, index_file=INDEX_FILE):
+    embeddings = np.load(embed_file)
+
+    with open(id_file, "r", encoding="utf-8") as f:
+        ids = json.load(f)
+
+    write_index(index_file, embeddings, ids)
+
+def load_index(index_file=INDEX_FILE, embed_file=EMBED_FILE, id_file=ID_FILE):
+    # Rebuild from the raw .npy / id files when the index is missing or stale
+    stale = (
+        not os.path.exists(index_file)
+        or os.path.getmtime(index_file) < os.path.getmtime(embed_file)
+        or os.path.getmtime(index_file) < os.path.getmtime(id_file)
+    )
+
+    if stale:
+        build_index_from_npy(embed_file, id_file, index_file)
+
+    return open_index(index_file)
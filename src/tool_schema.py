@@ -0,0 +1,71 @@
+import os
+import json
+
+# ================= RULES =================
+#
+# The checks behind specs/tools_schema.json and notes/validation.md, shared
+# by python -m src.compile_catalog and the JSON catalog load in
+# src/catalog.py, so both accept exactly the same tools.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_FILE = os.path.join(BASE_DIR, "..", "specs", "tools_schema.json")
+
+# ================= VALIDATION =================
+
+def parse_rule(template):
+    # tools_schema.json is a template rather than a JSON Schema:
+    # "a | b" is an enum, "string" a non-empty string, true a boolean and
+    # [x] a non-empty list of x
+    if isinstance(template, list):
+        return ("list", parse_rule(template[0]))
+    if isinstance(template, bool):
+        return ("bool", None)
+    if "|" in template:
+        return ("enum", {v.strip() for v in template.split("|")})
+    return ("string", None)
+
+def load_schema(path=SCHEMA_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return {field: parse_rule(template) for field, template in json.load(f).items()}
+
+def check_value(rule, value):
+    kind, arg = rule
+
+    if kind == "list":
+        if not isinstance(value, list) or not value:
+            return "must be a non-empty list"
+        for item in value:
+            problem = check_value(arg, item)
+            if problem:
+                return problem
+        if len(set(map(str, value))) != len(value):
+            return "has duplicate entries"
+        return None
+
+    if kind == "bool":
+        return None if isinstance(value, bool) else "must be true or false"
+
+    if kind == "enum":
+        return None if value in arg else f"{value!r} is not one of {', '.join(sorted(arg))}"
+
+    if not isinstance(value, str) or not value.strip():
+        return "must be a non-empty string"
+    return None
+
+def validate_tool(tool, rules):
+    # Every schema field present and valid ("no empty or guessed fields")
+    # and tags lowercase; whether actions fit the domain is left to review
+    problems = []
+    for field, rule in rules.items():
+        if field not in tool:
+            problems.append(f"{field}: missing")
+            continue
+        problem = check_value(rule, tool[field])
+        if problem:
+            problems.append(f"{field}: {problem}")
+
+    for tag in tool.get("tags") or []:
+        if isinstance(tag, str) and tag != tag.strip().lower():
+            problems.append(f"tags: {tag!r} is not lowercase")
+
+    return problems
@@ -0,0 +1,488 @@
+import os
+import json
+import time
+import logging
+import hashlib
+import numpy as np
+from abc import ABC, abstractmethod
+
+from src.tool_index import normalize_rows, normalize_vector, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# ================= CONFIG =================
+
+# "exact" scores every candidate row, "ivf" probes the closest k-means lists
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact")
+
+# 0 picks ~sqrt(rows) lists
+IVF_NLIST = int(os.getenv("IVF_NLIST", "0"))
+
+# Lists scanned per query: higher = better recall, more latency
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+
+# Filtered candidate sets at or below this size are always scored exactly
+IVF_EXACT_THRESHOLD = int(os.getenv("IVF_EXACT_THRESHOLD", "4096"))
+
+# Storage precision of the exact backend's scoring matrix: "float32",
+# "float16" (2x smaller) or "int8" (per-row scale, ~4x smaller)
+INDEX_DTYPE = os.getenv("INDEX_DTYPE", "float32")
+
+# Reduced-precision scores pick this many candidates, which are then
+# re-scored against the float32 index; 0 returns the approximate scores
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "200"))
+
+QUANTIZED_CHUNK = 16384
+
+# Reduced-precision rows are widened to float32 a block at a time; blocks
+# that fit in L2 are scored straight from cache (int8 then beats float32)
+QUANTIZED_BLOCK_BYTES = int(os.getenv("QUANTIZED_BLOCK_BYTES", str(1 << 19)))
+
+IVF_TRAIN_SAMPLE = 50000
+IVF_ITERATIONS = 10
+
+# ================= INTERFACE =================
+
+class VectorIndex(ABC):
+    # Rows are positions in the catalog's embedding matrix. Both methods
+    # return (rows, scores) sorted by descending cosine similarity.
+    # Backends implement search; building and loading differ per backend
+    # (see make_vector_index), so they are not part of this interface.
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, query_vec, k, rows=None):
+        ...
+
+    @abstractmethod
+    def warm(self):
+        # Pages in what search scans, so workers start on a warm page cache
+        ...
+
+    def search_batch(self, query_vecs, k, rows_list=None):
+        return [
+            self.search(q, k, None if rows_list is None else rows_list[i])
+            for i, q in enumerate(query_vecs)
+        ]
+
+# ================= EXACT =================
+
+class ExactIndex(VectorIndex):
+    name = "exact"
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def warm(self):
+        self.matrix.sum()
+
+    def scores(self, query_vec):
+        return self.matrix @ normalize_vector(query_vec)
+
+    def search(self, query_vec, k, rows=None):
+        # Score only the candidate rows when a filter already narrowed them
+        if rows is None:
+            scores = self.scores(query_vec)
+            top = top_k_indices(scores, k)
+            return top, scores[top]
+
+        scores = self.matrix[rows] @ normalize_vector(query_vec)
+        top = top_k_indices(scores, k)
+        return rows[top], scores[top]
+
+    def search_batch(self, query_vecs, k, rows_list=None):
+        # One matrix-matrix product for every query
+        scores = normalize_rows(query_vecs) @ self.matrix.T
+        hits = []
+
+        for i, row_scores in enumerate(scores):
+            rows = None if rows_list is None else rows_list[i]
+
+            if rows is None:
+                top = top_k_indices(row_scores, k)
+                hits.append((top, row_scores[top]))
+            else:
+                row_scores = row_scores[rows]
+                top = top_k_indices(row_scores, k)
+                hits.append((rows[top], row_scores[top]))
+
+        return hits
+
+# ================= REDUCED PRECISION =================
+
+def quantize(matrix, dtype):
+    # Rows are unit vectors. int8 stores round(row / scale) with a per-row
+    # scale of max|row| / 127; float16 needs no scale.
+    matrix = np.asarray(matrix, dtype="float32")
+
+    if dtype == "float16":
+        return matrix.astype("float16"), None
+
+    if dtype == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.empty(matrix.shape, dtype="int8")
+        for start in range(0, len(matrix), QUANTIZED_CHUNK):
+            block = slice(start, start + QUANTIZED_CHUNK)
+            codes[block] = np.rint(matrix[block] / scales[block, None])
+        return codes, scales.astype("float32")
+
+    raise ValueError(f"Unknown INDEX_DTYPE: {dtype}")
+
+class QuantizedIndex(VectorIndex):
+    # Scores with the reduced-precision copy, then re-scores the best
+    # RERANK_CANDIDATES rows with the float32 matrix. The float32 index is
+    # memory-mapped and never warmed, so only the re-ranked rows are paged in.
+
+    def __init__(self, codes, scales, exact_matrix, rerank=RERANK_CANDIDATES):
+        self.codes = codes
+        self.scales = scales
+        self.exact_matrix = exact_matrix
+        self.rerank = rerank
+        self.name = str(codes.dtype)
+        self.block = max(1, QUANTIZED_BLOCK_BYTES // (codes.shape[1] * 4))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def warm(self):
+        self.codes.sum(dtype="float32")
+
+    def approx_scores(self, qs, rows=None):
+        # qs is (queries, dim); returns (queries, rows) scores
+        size = len(self.codes) if rows is None else len(rows)
+        scores = np.empty((size, len(qs)), dtype="float32")
+
+        # numpy has no float16/int8 BLAS: widen one cache-sized block at a
+        # time into a float32 buffer and score every query against it
+        buf = np.empty((min(self.block, size), self.codes.shape[1]), dtype="float32")
+        for start in range(0, size, self.block):
+            block = buf[:min(self.block, size - start)]
+            if rows is None:
+                block[...] = self.codes[start:start + len(block)]
+            else:
+                block[...] = self.codes[rows[start:start + len(block)]]
+            np.dot(block, qs.T, out=scores[start:start + len(block)])
+
+        if self.scales is not None:
+            scores *= (self.scales if rows is None else self.scales[rows])[:, None]
+        return scores.T
+
+    def exact(self, q, k, rows):
+        scores = self.exact_matrix[rows] @ q
+        top = top_k_indices(scores, k)
+        return rows[top], scores[top]
+
+    def search(self, query_vec, k, rows=None):
+        q = normalize_vector(query_vec)
+        size = len(self.codes) if rows is None else len(rows)
+
+        # Small candidate sets: the re-rank would cover all of them anyway
+        if self.rerank and size <= max(k, self.rerank):
+            rows = np.arange(size) if rows is None else rows
+            return self.exact(q, k, rows)
+
+        scores = self.approx_scores(q[None, :], rows)[0]
+        return self.shortlist(q, k, rows, scores)
+
+    def search_batch(self, query_vecs, k, rows_list=None):
+        if rows_list is not None:
+            return super().search_batch(query_vecs, k, rows_list)
+
+        # Every block is widened once for the whole batch
+        qs = normalize_rows(query_vecs)
+        if self.rerank and len(self.codes) <= max(k, self.rerank):
+            rows = np.arange(len(self.codes))
+            return [self.exact(q, k, rows) for q in qs]
+
+        scores = self.approx_scores(qs)
+        return [self.shortlist(q, k, None, s) for q, s in zip(qs, scores)]
+
+    def shortlist(self, q, k, rows, scores):
+        if not self.rerank:
+            top = top_k_indices(scores, k)
+            return (top if rows is None else rows[top]), scores[top]
+
+        cand = top_k_indices(scores, max(k, self.rerank))
+        cand_rows = cand if rows is None else rows[cand]
+
+        # Sorted rows keep the memmap reads sequential
+        return self.exact(q, k, np.sort(cand_rows))
+
+    def save(self, path, source_key):
+        vectors_path = vectors_file(path)
+
+        tmp = f"{vectors_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.codes))
+        os.replace(tmp, vectors_path)
+
+        meta = {"source_key": np.array(source_key)}
+        if self.scales is not None:
+            meta["scales"] = self.scales
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **meta)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, source_key, exact_matrix, rerank=RERANK_CANDIDATES):
+        with np.load(path) as data:
+            if str(data["source_key"]) != source_key:
+                return None
+            scales = data["scales"] if "scales" in data else None
+
+        codes = np.load(vectors_file(path), mmap_mode="r")
+        if len(codes) != len(exact_matrix):
+            return None
+
+        return cls(codes, scales, exact_matrix, rerank)
+
+# ================= IVF (INVERTED FILE) =================
+
+def kmeans(vectors, nlist, iterations=IVF_ITERATIONS, seed=0):
+    # Spherical k-means on unit vectors: assign by dot product, re-normalize
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = assign_lists(vectors, centroids)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=nlist)
+
+        # Re-seed empty lists with random rows
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+def assign_lists(vectors, centroids, chunk=65536):
+    return np.concatenate([
+        np.argmax(vectors[i:i + chunk] @ centroids.T, axis=1)
+        for i in range(0, len(vectors), chunk)
+    ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+def vectors_file(path):
+    return os.path.splitext(path)[0] + ".vectors.npy"
+
+class IVFIndex(VectorIndex):
+    # Vectors are stored reordered so that every list is one contiguous
+    # slice; probing a list is a plain matvec over that slice.
+
+    name = "ivf"
+
+    def __init__(self, centroids, offsets, order, vectors, nprobe=IVF_NPROBE):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.order = order
+        self.vectors = vectors
+        self.nprobe = nprobe
+
+        # Catalog row -> position in the reordered storage
+        self.position = np.empty(len(order), dtype=np.int64)
+        self.position[order] = np.arange(len(order))
+
+    def __len__(self):
+        return len(self.order)
+
+    def warm(self):
+        self.vectors.sum()
+
+    @classmethod
+    def build(cls, matrix, nlist=IVF_NLIST, nprobe=IVF_NPROBE, seed=0):
+        matrix = np.asarray(matrix, dtype="float32")
+        n = len(matrix)
+        nlist = nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+
+        rng = np.random.default_rng(seed)
+        sample = matrix
+        if n > IVF_TRAIN_SAMPLE:
+            sample = matrix[np.sort(rng.choice(n, IVF_TRAIN_SAMPLE, replace=False))]
+
+        centroids = kmeans(sample, nlist, seed=seed)
+        assign = assign_lists(matrix, centroids)
+
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(centroids, offsets, order, matrix[order], nprobe)
+
+    def probe(self, query_vec):
+        cent_scores = self.centroids @ query_vec
+        nprobe = min(self.nprobe, len(self.centroids))
+        return top_k_indices(cent_scores, nprobe)
+
+    def search(self, query_vec, k, rows=None):
+        q = normalize_vector(query_vec)
+
+        # Small filtered sets: exact scoring is both cheaper and exact
+        if rows is not None and len(rows) <= IVF_EXACT_THRESHOLD:
+            return self.exact(q, k, rows)
+
+        allowed = None
+        if rows is not None:
+            allowed = np.zeros(len(self.order), dtype=bool)
+            allowed[rows] = True
+
+        cand_rows = []
+        cand_scores = []
+        for lst in self.probe(q):
+            start, end = self.offsets[lst], self.offsets[lst + 1]
+            if start == end:
+                continue
+
+            list_rows = self.order[start:end]
+            scores = self.vectors[start:end] @ q
+
+            if allowed is not None:
+                keep = allowed[list_rows]
+                list_rows, scores = list_rows[keep], scores[keep]
+
+            cand_rows.append(list_rows)
+            cand_scores.append(scores)
+
+        if not cand_rows or sum(len(r) for r in cand_rows) < k:
+            # Probed lists were too thin for this filter, answer exactly
+            return self.exact(q, k, rows)
+
+        cand_rows = np.concatenate(cand_rows)
+        cand_scores = np.concatenate(cand_scores)
+        top = top_k_indices(cand_scores, k)
+        return cand_rows[top], cand_scores[top]
+
+    def exact(self, q, k, rows):
+        rows = np.arange(len(self.order)) if rows is None else np.asarray(rows)
+        scores = self.vectors[self.position[rows]] @ q
+        top = top_k_indices(scores, k)
+        return rows[top], scores[top]
+
+    # ---------- PERSISTENCE ----------
+
+    def save(self, path, source_key):
+        vectors_path = vectors_file(path)
+
+        tmp = f"{vectors_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.vectors))
+        os.replace(tmp, vectors_path)
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                offsets=self.offsets,
+                order=self.order,
+                source_key=np.array(source_key)
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, source_key, nprobe=IVF_NPROBE):
+        with np.load(path) as data:
+            if str(data["source_key"]) != source_key:
+                return None
+            centroids = data["centroids"]
+            offsets = data["offsets"]
+            order = data["order"]
+
+        # The reordered vectors stay on disk and are shared via the page cache
+        vectors = np.load(vectors_file(path), mmap_mode="r")
+        if len(vectors) != len(order):
+            return None
+
+        return cls(centroids, offsets, order, vectors, nprobe)
+
+# ================= FACTORY =================
+
+def source_key(tool_index):
+    # Identifies the embedding matrix an IVF or quantized file was built
+    # from. Every row counts: re-embedding a single tool must invalidate
+    # the sidecar files. A compiled catalog already checksums its body.
+    if "checksum" in tool_index.meta:
+        return f"{len(tool_index)}:{tool_index.meta['dim']}:{tool_index.meta['checksum']}"
+
+    digest = hashlib.sha1(json.dumps(tool_index.ids).encode("utf-8"))
+    matrix = tool_index.matrix
+    for start in range(0, len(matrix), QUANTIZED_CHUNK):
+        digest.update(np.ascontiguousarray(matrix[start:start + QUANTIZED_CHUNK]).tobytes())
+    return f"{len(tool_index)}:{tool_index.meta['dim']}:{digest.hexdigest()}"
+
+def ivf_path(index_file):
+    return os.path.splitext(index_file)[0] + ".ivf.npz"
+
+def load_or_build_ivf(tool_index, index_file):
+    path = ivf_path(index_file)
+    key = source_key(tool_index)
+
+    if os.path.exists(path):
+        ivf = IVFIndex.load(path, key)
+        if ivf is not None:
+            return ivf
+
+    logger.info("🔧 Building IVF index for %d tools", len(tool_index))
+    started = time.perf_counter()
+    ivf = IVFIndex.build(tool_index.matrix)
+    ivf.save(path, key)
+    logger.info(
+        "✅ IVF index built in %.1fs (%d lists)",
+        time.perf_counter() - started, len(ivf.centroids)
+    )
+    return ivf
+
+def quantized_path(index_file, dtype):
+    return os.path.splitext(index_file)[0] + f".{dtype}.npz"
+
+def load_or_build_quantized(tool_index, index_file, dtype):
+    path = quantized_path(index_file, dtype)
+    key = source_key(tool_index)
+
+    if os.path.exists(path):
+        index = QuantizedIndex.load(path, key, tool_index.matrix)
+        if index is not None:
+            return index
+
+    logger.info("🔧 Building %s index for %d tools", dtype, len(tool_index))
+    codes, scales = quantize(tool_index.matrix, dtype)
+    index = QuantizedIndex(codes, scales, tool_index.matrix)
+    index.save(path, key)
+    return index
+
+def make_vector_index(tool_index, index_file, backend=None, dtype=None):
+    backend = backend or VECTOR_INDEX
+    dtype = dtype or INDEX_DTYPE
+
+    if backend == "exact":
+        if dtype == "float32":
+            return ExactIndex(tool_index.matrix)
+        return load_or_build_quantized(tool_index, index_file, dtype)
+
+    if backend == "ivf":
+        if dtype != "float32":
+            logger.warning("⚠️ INDEX_DTYPE=%s is ignored by the ivf backend", dtype)
+        return load_or_build_ivf(tool_index, index_file)
+
+    raise ValueError(f"Unknown VECTOR_INDEX: {backend}")
+
+# ================= RECALL =================
+
+def recall_at_k(exact, approx, queries, k, rows_list=None):
+    hits = 0
+    for i, q in enumerate(queries):
+        rows = None if rows_list is None else rows_list[i]
+        truth = set(exact.search(q, k, rows)[0].tolist())
+        found = set(approx.search(q, k, rows)[0].tolist())
+        hits += len(truth & found)
+    return hits / (k * len(queries)) if len(queries) else 1.0
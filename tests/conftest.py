@@ -0,0 +1,47 @@
+import os
+import uuid
+import asyncio
+import pytest
+
+from benchmarks.servers import fake_ollama as start_fake_ollama
+from src import ollama_client
+from src import final_pipeline_numpy as pipeline
+from src.catalog import get_snapshot
+from src.resilience import CircuitBreaker
+
+# ================= FIXTURES =================
+#
+# One fake Ollama (benchmarks/fake_ollama.py) per test session with a
+# fixed model latency per call, and a fresh breaker and bad-prompt log
+# per test.
+
+OLLAMA_DELAY_MS = 300
+
+@pytest.fixture(scope="session")
+def fake_ollama():
+    env = dict(os.environ, FAKE_OLLAMA_DELAY_MS=str(OLLAMA_DELAY_MS))
+    with start_fake_ollama(env) as url:
+        yield url
+
+@pytest.fixture(autouse=True)
+def upstream(fake_ollama, monkeypatch, tmp_path):
+    monkeypatch.setattr(ollama_client, "OLLAMA_URL", fake_ollama)
+    monkeypatch.setattr(ollama_client, "BREAKER", CircuitBreaker("ollama"))
+    monkeypatch.setattr(pipeline.BAD_PROMPTS, "path", str(tmp_path / "bad_prompts.log"))
+    get_snapshot()
+
+# ================= HELPERS =================
+
+def run(coro):
+    # One event loop per call; the pooled client is bound to it
+    async def main():
+        try:
+            return await coro
+        finally:
+            await ollama_client.close_client()
+
+    return asyncio.run(main())
+
+def fresh_prompt():
+    # Misses every cache and rule, so each request calls the model
+    return f"zorbly quandle {uuid.uuid4().hex}"
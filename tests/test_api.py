@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+from src import api
+
+# ================= ADMIN =================
+
+def test_admin_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", None)
+    client = TestClient(api.app)
+
+    assert client.get("/admin/catalog").status_code == 403
+    assert client.post("/admin/reload").status_code == 403
+
+def test_admin_requires_token(monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "s3cret")
+    client = TestClient(api.app)
+
+    assert client.get("/admin/catalog").status_code == 403
+    assert client.get("/admin/catalog", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/admin/catalog", headers={"X-Admin-Token": "s3cret"}).status_code == 200
@@ -0,0 +1,73 @@
+import time
+import asyncio
+
+from tests.conftest import OLLAMA_DELAY_MS, run, fresh_prompt
+from src import ollama_client
+from src import final_pipeline_numpy as pipeline
+from src.resilience import deadline
+
+# ================= ASYNC PIPELINE =================
+#
+#   python -m pytest -q tests
+#
+# Runs the async pipeline against the fake Ollama from tests/conftest.py.
+
+# ================= TESTS =================
+
+def test_concurrent_requests_overlap():
+    started = time.perf_counter()
+    run(pipeline.run_pipeline_async(fresh_prompt(), 5))
+    single = time.perf_counter() - started
+
+    async def burst(count):
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(pipeline.run_pipeline_async(fresh_prompt(), 5) for _ in range(count))
+        )
+        return responses, time.perf_counter() - started
+
+    responses, elapsed = run(burst(4))
+
+    assert all(r["tools"] for r in responses)
+    # Serial would take about 4 x single; overlapping requests share the wait
+    assert elapsed < 2 * single
+
+def test_cpu_stages_leave_the_loop_free(monkeypatch):
+    search = pipeline.search
+
+    def slow_search(*args):
+        time.sleep(0.5)
+        return search(*args)
+
+    monkeypatch.setattr(pipeline, "search", slow_search)
+
+    async def probe():
+        request = asyncio.create_task(pipeline.run_pipeline_async(fresh_prompt(), 5))
+        lag = 0.0
+        while not request.done():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - before - 0.01)
+        return await request, lag
+
+    response, lag = run(probe())
+
+    assert response["tools"]
+    assert lag < 0.25
+
+def test_timeout_falls_back():
+    prompt = fresh_prompt()
+
+    async def with_deadline():
+        with deadline(OLLAMA_DELAY_MS / 1000 / 3):
+            return await pipeline.run_pipeline_async(prompt, 5)
+
+    started = time.perf_counter()
+    response = run(with_deadline())
+    elapsed = time.perf_counter() - started
+
+    # Neither the rewrite nor the embedding made it: the original prompt is
+    # ranked with BM25 instead of failing the request
+    assert response["rewritten_prompt"] == prompt
+    assert response["confidence_breakdown"]["semantic_similarity"] == 0.0
+    assert elapsed < OLLAMA_DELAY_MS / 1000 * 2
@@ -0,0 +1,28 @@
+import time
+
+from tests.conftest import OLLAMA_DELAY_MS, fresh_prompt
+from src import final_pipeline_numpy as pipeline
+
+# ================= BATCH PIPELINE =================
+#
+#   python -m pytest -q tests
+#
+# Runs recommend_tools_batch against the fake Ollama from tests/conftest.py.
+
+# ================= TESTS =================
+
+def test_batch_longer_than_one_deadline(monkeypatch):
+    monkeypatch.setattr(pipeline, "BATCH_WORKERS", 2)
+    monkeypatch.setattr(pipeline, "BATCH_ITEM_DEADLINE", OLLAMA_DELAY_MS / 1000 * 3)
+    prompts = [fresh_prompt() for _ in range(12)]
+
+    started = time.perf_counter()
+    responses = pipeline.recommend_tools_batch(prompts)
+    elapsed = time.perf_counter() - started
+
+    # Two workers need six rounds of rewrites alone, well past one deadline
+    assert elapsed > pipeline.BATCH_ITEM_DEADLINE
+    # ...yet no prompt fell back: every one was rewritten and embedded
+    for prompt, response in zip(prompts, responses):
+        assert response["rewritten_prompt"] != prompt
+        assert pipeline.EMBED_CACHE.get(response["rewritten_prompt"]) is not None
@@ -0,0 +1,50 @@
+import os
+import json
+import shutil
+
+import pytest
+
+from src import catalog
+from src.catalog import CatalogError
+from src.compile_catalog import compile_catalog
+
+# ================= JSON FALLBACK =================
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    for name in ("tools_seed.json", "tool_ids.json", "tool_embeddings.npy"):
+        shutil.copy(os.path.join(catalog.DATA_DIR, name), tmp_path / name)
+
+    paths = {
+        "TOOLS_FILE": str(tmp_path / "tools_seed.json"),
+        "ID_FILE": str(tmp_path / "tool_ids.json"),
+        "EMBED_FILE": str(tmp_path / "tool_embeddings.npy"),
+        "INDEX_FILE": str(tmp_path / "tool_index.bin"),
+        "SNAPSHOT_FILE": str(tmp_path / "catalog.snap")
+    }
+    for name, path in paths.items():
+        monkeypatch.setattr(catalog, name, path)
+    monkeypatch.setattr(
+        catalog, "SOURCE_FILES", (paths["TOOLS_FILE"], paths["EMBED_FILE"], paths["ID_FILE"])
+    )
+    return paths
+
+def test_json_fallback_rejects_invalid_tools(data_dir):
+    compile_catalog(
+        data_dir["TOOLS_FILE"], data_dir["EMBED_FILE"], data_dir["ID_FILE"],
+        data_dir["SNAPSHOT_FILE"]
+    )
+
+    with open(data_dir["TOOLS_FILE"], "r", encoding="utf-8") as f:
+        tools = json.load(f)
+    tools[0]["pricing"] = "cheap"
+    with open(data_dir["TOOLS_FILE"], "w", encoding="utf-8") as f:
+        json.dump(tools, f)
+
+    # Edited after the compile: the snapshot is stale, so the JSON is loaded
+    compiled_at = os.path.getmtime(data_dir["SNAPSHOT_FILE"])
+    os.utime(data_dir["TOOLS_FILE"], (compiled_at + 10, compiled_at + 10))
+    assert not catalog.use_compiled()
+
+    with pytest.raises(CatalogError, match="invalid tools"):
+        catalog.load_snapshot()
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+# ================= IMPORT-TIME BUDGET =================
+#
+#   python -m pytest -q tests/test_import_time.py
+#   IMPORT_BUDGET_MS=800 python -m pytest -q tests/test_import_time.py
+#
+# Imports each module in a fresh interpreter under python -X importtime and
+# fails if the import is over budget, opens anything under data/, connects
+# to a socket, or (for the API) loads the catalog or pulls in `requests`.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+# Import time is noisy on a cold page cache: the fastest run counts
+RUNS = 3
+
+MODULES = (
+    "src.api",
+    "src.semantic_search_numpy",
+    "src.embed_tools",
+    "src.generate_embeddings"
+)
+
+PROBE = """
+import os, sys, json
+
+data_dir = os.path.realpath(os.path.join(os.getcwd(), "data"))
+events = {"data_opens": [], "connects": []}
+
+def audit(event, args):
+    if event == "open" and isinstance(args[0], str):
+        if os.path.realpath(args[0]).startswith(data_dir):
+            events["data_opens"].append(args[0])
+    elif event == "socket.connect":
+        events["connects"].append(repr(args[1]))
+
+sys.addaudithook(audit)
+__import__(sys.argv[1])
+
+catalog = sys.modules.get("src.catalog")
+print(json.dumps(events | {
+    "catalog_loaded": bool(catalog and catalog._current is not None),
+    "requests_loaded": "requests" in sys.modules
+}))
+"""
+
+def cumulative_ms(importtime, module):
+    # "import time: self [us] | cumulative | imported package" per module
+    for line in importtime.splitlines():
+        parts = [p.strip() for p in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    return None
+
+def probe(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE, module],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, result.stderr.strip().splitlines()[-1:]
+    return json.loads(result.stdout.strip().splitlines()[-1]) | {
+        "import_ms": cumulative_ms(result.stderr, module)
+    }
+
+# ================= TESTS =================
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import_is_cheap_and_side_effect_free(module):
+    results = [probe(module) for _ in range(RUNS)]
+    result = min(results, key=lambda r: r["import_ms"])
+
+    assert result["import_ms"] <= IMPORT_BUDGET_MS
+    assert not result["data_opens"]
+    assert not result["connects"]
+    assert not result["catalog_loaded"]
+    if module == "src.api":
+        assert not result["requests_loaded"]
@@ -0,0 +1,46 @@
+import glob
+import multiprocessing
+
+from src.log_sink import LogSink
+
+# ================= LOG SINK =================
+
+def test_repeats_counted_across_flushes(tmp_path):
+    sink = LogSink(str(tmp_path / "bad.log"), count_repeats=True, flush_interval=0.01)
+
+    for text in ("first prompt", "second prompt", "First Prompt  "):
+        sink.write(text)
+        # One flush per line: repeats are no longer only seen within a batch
+        assert sink.flush()
+
+    sink.close()
+    assert sink.written == 3
+    assert sink.repeats == 1
+
+def write_lines(path, worker, count):
+    sink = LogSink(path, timestamps=False, flush_interval=0.001, max_bytes=2000, backups=1000)
+    for i in range(count):
+        sink.write(f"worker {worker} line {i:04d}")
+        if i % 5 == 0:
+            sink.flush()
+    sink.close()
+
+def test_workers_share_rotation(tmp_path):
+    path = str(tmp_path / "bad.log")
+    workers = [
+        multiprocessing.get_context("fork").Process(target=write_lines, args=(path, w, 300))
+        for w in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    lines = []
+    for name in glob.glob(f"{path}*"):
+        if not name.endswith(".lock"):
+            with open(name, "r", encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+
+    # No rotation overwrote another worker's backup
+    assert sorted(lines) == sorted(f"worker {w} line {i:04d}" for w in range(4) for i in range(300))
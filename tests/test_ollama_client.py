@@ -0,0 +1,20 @@
+import time
+
+from tests.conftest import run
+from src import ollama_client
+from src.resilience import CircuitBreaker
+
+# ================= CIRCUIT BREAKER =================
+
+def test_embed_probe_closes_the_circuit(monkeypatch):
+    breaker = CircuitBreaker("ollama", failures=1, reset_after=0.2)
+    monkeypatch.setattr(ollama_client, "BREAKER", breaker)
+
+    breaker.record_failure(RuntimeError("outage"))
+    assert breaker.info()["state"] == "open"
+
+    time.sleep(0.25)
+    # Goes through the micro-batcher, which checks the breaker once up
+    # front and again for the batched call
+    assert run(ollama_client.embed("probe text"))
+    assert breaker.info()["state"] == "closed"
@@ -0,0 +1,27 @@
+import numpy as np
+
+from src import ranking
+from src import final_pipeline_numpy as pipeline
+from src.catalog import get_snapshot
+
+# ================= FUSION =================
+
+def test_confidence_reads_the_best_candidate(monkeypatch):
+    monkeypatch.setattr(ranking, "FUSION", "weighted")
+    monkeypatch.setattr(ranking, "FUSION_WEIGHTS", {"semantic": 0.2, "action": 0.8})
+    catalog = get_snapshot()
+    intent = {"action": "transcribe", "domain": None}
+
+    # Semantic order puts a non-transcribe tool first; fusion promotes the
+    # only transcribe tool over it and cuts the list to top_k
+    rows = np.arange(len(catalog.tool_ids))
+    transcribe = next(i for i in rows if "transcribe" in catalog.row_tools[i]["actions"])
+    rows = np.concatenate([rows[rows != transcribe][:1], [transcribe], rows[rows != transcribe][1:]])
+    semantic = np.linspace(0.9, 0.1, len(rows)).astype("float32")
+
+    hits, best = pipeline.fuse(catalog, "transcribe this", intent, (rows, semantic), 1)
+    response = pipeline.finish("p", "p", intent, False, catalog, hits, None, 1, best)
+
+    assert response["tools"][0]["id"] == catalog.tool_ids[transcribe]
+    assert response["tools"][0]["score"] < 0.9
+    assert response["confidence_breakdown"]["semantic_similarity"] == 90.0
@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.tool_index import ToolIndex, normalize_rows
+from src.vector_index import IVFIndex, load_or_build_ivf, ivf_path
+
+# ================= SIDECAR FILES =================
+
+def small_index(rows=1000, dim=16):
+    matrix = normalize_rows(np.random.default_rng(0).standard_normal((rows, dim)).astype("float32"))
+    return ToolIndex(matrix, [f"tool-{i}" for i in range(rows)], {"dim": dim})
+
+def test_edited_row_rebuilds_ivf(tmp_path):
+    index_file = str(tmp_path / "tool_index.bin")
+    tool_index = small_index()
+    load_or_build_ivf(tool_index, index_file)
+
+    # Re-embed one tool; the ids and every other row are unchanged
+    tool_index.matrix[1] = -tool_index.matrix[1]
+    ivf = load_or_build_ivf(tool_index, index_file)
+
+    stored = ivf.vectors[ivf.position[1]]
+    assert np.array_equal(stored, tool_index.matrix[1])
+    assert IVFIndex.load(ivf_path(index_file), "stale") is None